@@ -9,8 +9,10 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+# Serve recipe reads from async views, see app/asgi_urls.py.
+os.environ.setdefault('ROOT_URLCONF', 'app.asgi_urls')
 
 application = get_asgi_application()
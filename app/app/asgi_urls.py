@@ -0,0 +1,15 @@
+"""
+URL configuration for ASGI serving
+
+Same API as app.urls, with the recipe read endpoints served by the
+async views in recipe.async_views. Those routes are unnamed and come
+first, so reverse() keeps using the names in app.urls.
+"""
+from django.urls import path, include
+
+from recipe import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/recipe/', include(async_views.urlpatterns)),
+] + sync_urlpatterns
@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework.authtoken',
@@ -47,7 +48,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.QueryGuardMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -56,7 +60,26 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'app.urls'
+# RequestMetricsMiddleware sends each request's costs back in a
+# Server-Timing header unless SERVER_TIMING=0, and aggregates them per
+# view for /api/metrics/. Each process keeps its own aggregates.
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') == '1'
+
+# QueryGuardMiddleware flags a statement shape run more than MAX_REPEATS
+# times in one request, and queries slower than SLOW_MS. ACTION 'warn'
+# logs them, 'raise' fails the request. The test runner turns it on with
+# 'raise', so query regressions fail the tests.
+QUERY_GUARD = {
+    'ENABLED': os.environ.get('QUERY_GUARD', '0') == '1',
+    'MAX_REPEATS': int(os.environ.get('QUERY_GUARD_MAX_REPEATS', 5)),
+    'SLOW_MS': float(os.environ.get('QUERY_GUARD_SLOW_MS', 250)),
+    'ACTION': os.environ.get('QUERY_GUARD_ACTION', 'warn'),
+}
+
+TEST_RUNNER = 'core.test_runner.QueryGuardTestRunner'
+
+# app/asgi.py switches to app.asgi_urls, which serves reads async.
+ROOT_URLCONF = os.environ.get('ROOT_URLCONF', 'app.urls')
 
 TEMPLATES = [
     {
@@ -80,16 +103,100 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Set DB_CONN_MAX_AGE to keep connections open between requests for that
+# many seconds, checked before each reuse. Leave it at 0 for runserver,
+# whose thread per request can't reuse them. With DB_POOL=1 each process
+# keeps a pool instead and requests hand their connection back when they
+# finish. Compare the modes with benchmark_connections.
+
+DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'core.backends.postgresql_pool' if DB_POOL
+            else 'django.db.backends.postgresql'
+        ),
         'HOST': os.environ.get("DB_HOST"),
         'NAME': os.environ.get("DB_NAME"),
         'USER': os.environ.get("DB_USER"),
-        'PASSWORD': os.environ.get('DB_PASS')
+        'PASSWORD': os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': (
+            0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 0))
+        ),
+        'CONN_HEALTH_CHECKS': (
+            os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1'
+        ),
+        'POOL': {
+            'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 20)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+}
+
+# Read replicas, as comma separated DB_REPLICA_HOSTS sharing the primary's
+# name and credentials. GET, HEAD and OPTIONS requests read from one at
+# random, except from a client that wrote in the last REPLICA_PIN_SECONDS.
+# Pins are kept in REPLICA_PIN_CACHE, so with several processes it must be
+# a shared cache. Tests run the replicas as mirrors of the test database,
+# and the test runner adds a 'replica' mirror for the routing tests.
+
+REPLICA_DATABASES = []
+for index, host in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')),
+    start=1,
+):
+    REPLICA_DATABASES.append(f'replica{index}')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+REPLICA_PIN_CACHE = 'default'
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Local memory by default. Point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend such as memcached to share cached data between processes.
+# Recipe list versions and replica pins must be seen by every process, so
+# with WEB_CONCURRENCY over 1, the worker count gunicorn and uvicorn read,
+# a process-local cache for them fails the core.E001 system check.
+
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
+RECIPE_LIST_CACHE = 'default'
+RECIPE_LIST_CACHE_TIMEOUT = int(
+    os.environ.get('RECIPE_LIST_CACHE_TIMEOUT', 300)
+)
+
+# Token authentication keeps recent tokens in a per-process LRU. Set
+# AUTH_TOKEN_CACHE to a shared cache alias to also cache them there.
+# Without one, other processes may accept a deleted token or deactivated
+# user for up to the local timeout.
+AUTH_TOKEN_CACHE = os.environ.get('AUTH_TOKEN_CACHE') or None
+AUTH_TOKEN_CACHE_TIMEOUT = int(
+    os.environ.get('AUTH_TOKEN_CACHE_TIMEOUT', 300)
+)
+AUTH_TOKEN_LOCAL_SIZE = int(os.environ.get('AUTH_TOKEN_LOCAL_SIZE', 1024))
+AUTH_TOKEN_LOCAL_TIMEOUT = int(
+    os.environ.get('AUTH_TOKEN_LOCAL_TIMEOUT', 10)
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -109,6 +216,44 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
+# New and re-hashed passwords use Argon2id. Older PBKDF2 hashes still
+# verify and are upgraded on the next login, as are hashes made with
+# costs other than those below. Size these with benchmark_login.
+
+PASSWORD_HASHERS = [
+    'core.hashers.Argon2PasswordHasher',
+    'core.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', 2))
+# KiB per hash, so this much memory per concurrent login.
+ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', 19456))
+ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', 1))
+PBKDF2_ITERATIONS = int(os.environ.get('PBKDF2_ITERATIONS', 260000))
+
+# Thread pools for blocking work awaited by async views. Calls beyond
+# MAX_PENDING are answered 503 instead of queueing.
+
+EXECUTORS = {
+    'hashing': {
+        'WORKERS': int(os.environ.get('HASHING_WORKERS', 4)),
+        'MAX_PENDING': int(os.environ.get('HASHING_MAX_PENDING', 64)),
+    },
+    'api': {
+        'WORKERS': int(os.environ.get('API_WORKERS', 8)),
+        'MAX_PENDING': int(os.environ.get('API_MAX_PENDING', 256)),
+    },
+}
+
+# Delta sync keeps tombstones of deleted rows for clients to catch up on.
+# prune_tombstones drops those older than this many days, and clients
+# whose cursor predates them are told to sync again from scratch.
+
+SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', 30))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
@@ -136,6 +281,21 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "core.User"
 
+# The JSON renderer and parser use orjson when installed, the json module
+# otherwise.
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-}
\ No newline at end of file
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 100)),
+}
+
+# Pagination classes are set per viewset, PAGE_SIZE is their default.
+SILENCED_SYSTEM_CHECKS = ['rest_framework.W001']
@@ -20,10 +20,13 @@ from drf_spectacular.views import (
     SpectacularSwaggerView
 )
 
+from core.views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name="api-schema"), name='api-docs'),
     path('api/user/', include('user.urls')),
-    path('api/recipe/', include('recipe.urls'))
+    path('api/recipe/', include('recipe.urls')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
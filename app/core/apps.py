@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from . import checks  # noqa: F401 registers the system checks
+        from .db import check_connections
+
+        request_started.connect(check_connections)
@@ -0,0 +1,80 @@
+"""
+ASGI handler streaming responses from a sync thread
+"""
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+# Bytes of streamed content gathered per trip to the sync thread.
+STREAM_BATCH_SIZE = 64 * 1024
+
+
+def _next_batch(iterator):
+    """Return the next parts of a streaming response, [] when done."""
+    parts = []
+    size = 0
+    for part in iterator:
+        parts.append(part)
+        size += len(part)
+        if size >= STREAM_BATCH_SIZE:
+            break
+    return parts
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    ASGIHandler that iterates streaming responses off the event loop
+
+    Django 3.2 iterates StreamingHttpResponse on the event loop, where a
+    generator running queries, such as recipe export's, raises
+    SynchronousOnlyOperation after the headers have gone out. Parts are
+    produced in batches on the thread sync views run on instead, which
+    holds the connection the view opened its cursor on.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': self.response_headers(response),
+        })
+        next_batch = sync_to_async(_next_batch, thread_sensitive=True)
+        # Access __iter__ and not streaming_content, as Django does.
+        iterator = iter(response)
+        while True:
+            parts = await next_batch(iterator)
+            if not parts:
+                break
+            for part in parts:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+    @staticmethod
+    def response_headers(response):
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append((
+                b'Set-Cookie',
+                cookie.output(header='').encode('ascii').strip(),
+            ))
+        return headers
+
+
+def get_asgi_application():
+    """Set up Django and return a StreamingASGIHandler."""
+    django.setup(set_prefix=False)
+    return StreamingASGIHandler()
@@ -0,0 +1,123 @@
+"""
+PostgreSQL backend whose connections come from a per-process pool
+"""
+import threading
+
+import psycopg2
+import psycopg2.extras
+from psycopg2 import pool
+from django.db.backends.postgresql import base, creation
+
+from core.db import is_healthy
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    Thread safe psycopg2 pool that waits for a free connection
+
+    Keeps up to min_size idle connections open and at most max_size
+    open in all. Checking out blocks for up to timeout seconds when all
+    max_size are in use, rather than failing at once.
+    """
+
+    def __init__(self, min_size, max_size, timeout, **conn_params):
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._pool = pool.ThreadedConnectionPool(
+            min_size,
+            max_size,
+            **conn_params,
+        )
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise psycopg2.OperationalError(
+                f'No pooled connection free within {self.timeout}s'
+            )
+        try:
+            return self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        try:
+            self._pool.putconn(connection, close=close)
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        self._pool.closeall()
+
+
+def get_pool(settings_dict, conn_params):
+    """Return the pool for a database's connection parameters."""
+    key = repr(sorted(conn_params.items()))
+    with _pools_lock:
+        if key not in _pools:
+            options = settings_dict.get('POOL', {})
+            _pools[key] = ConnectionPool(
+                options.get('MIN_SIZE', 1),
+                options.get('MAX_SIZE', 10),
+                options.get('TIMEOUT', 10),
+                **conn_params,
+            )
+        return _pools[key]
+
+
+def close_pools():
+    """Close every pooled connection in this process."""
+    with _pools_lock:
+        for connection_pool in _pools.values():
+            connection_pool.closeall()
+        _pools.clear()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would block dropping the database.
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The postgresql backend, with connect and close backed by a pool
+
+    Use with CONN_MAX_AGE = 0 so each request hands its connection back.
+    With CONN_HEALTH_CHECKS, a checked out connection that no longer
+    works is discarded and another taken.
+    """
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.settings_dict, conn_params)
+        connection = self.pool.getconn()
+        while (self.settings_dict.get('CONN_HEALTH_CHECKS') and
+                not is_healthy(connection)):
+            self.pool.putconn(connection, close=True)
+            connection = self.pool.getconn()
+
+        # As base.DatabaseWrapper.get_new_connection does for a new
+        # connection.
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level',
+            connection.isolation_level,
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection,
+            loads=lambda x: x,
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
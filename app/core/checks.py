@@ -0,0 +1,45 @@
+"""
+System checks for settings that only work in a single process
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def shared_cache_aliases():
+    """Return the cache aliases, and what for, every process must share."""
+    aliases = {settings.RECIPE_LIST_CACHE: 'RECIPE_LIST_CACHE'}
+    if settings.REPLICA_DATABASES:
+        aliases.setdefault(settings.REPLICA_PIN_CACHE, 'REPLICA_PIN_CACHE')
+    if settings.AUTH_TOKEN_CACHE:
+        aliases.setdefault(settings.AUTH_TOKEN_CACHE, 'AUTH_TOKEN_CACHE')
+    return aliases
+
+
+@register('caches')
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Fail when several processes would keep cross-request state apart.
+
+    A write on one process bumps the recipe list version, or pins the
+    client to the primary, only in its own memory, so the others go on
+    serving stale lists and 304s and routing its reads to replicas.
+    """
+    if settings.WEB_CONCURRENCY <= 1:
+        return []
+    errors = []
+    for alias, setting in shared_cache_aliases().items():
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend in PROCESS_LOCAL_BACKENDS:
+            errors.append(Error(
+                f'{setting} uses the {alias!r} cache, which is local to '
+                f'each of the {settings.WEB_CONCURRENCY} processes.',
+                hint='Set CACHE_BACKEND and CACHE_LOCATION to a shared '
+                     'cache such as memcached, or run one process.',
+                id='core.E001',
+            ))
+    return errors
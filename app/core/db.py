@@ -0,0 +1,36 @@
+"""
+Health checks for persistent database connections
+"""
+import psycopg2
+from django.db import connections
+
+
+def is_healthy(connection):
+    """Return whether a psycopg2 connection can still run a query."""
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            # Leave it idle, as the query opened a transaction.
+            connection.rollback()
+    except psycopg2.Error:
+        return False
+    return True
+
+
+def check_connections(**kwargs):
+    """
+    Close persistent connections that stopped working since last used
+
+    Django 3.2 only drops a broken connection after a query on it fails,
+    failing that request, so with CONN_HEALTH_CHECKS set each request
+    checks its connections before use.
+    """
+    for connection in connections.all():
+        if (connection.settings_dict.get('CONN_HEALTH_CHECKS') and
+                connection.connection is not None and
+                not connection.in_atomic_block and
+                not is_healthy(connection.connection)):
+            connection.close()
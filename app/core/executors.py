@@ -0,0 +1,81 @@
+"""
+Bounded thread pools for blocking work awaited by async views
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+
+from . import metrics, query_guard
+from .db import check_connections
+
+_executors = {}
+_pending = {}
+_lock = threading.Lock()
+
+
+class ExecutorBusy(Exception):
+    """Raised when a pool already has its maximum of pending calls."""
+
+
+def busy_response():
+    """Return the 503 for a request shed because its pool is full."""
+    response = JsonResponse(
+        {'detail': 'Too many requests in progress, retry shortly.'},
+        status=503,
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+def get_executor(name):
+    """Return the pool configured as settings.EXECUTORS[name]."""
+    with _lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=settings.EXECUTORS[name]['WORKERS'],
+                thread_name_prefix=f'executor-{name}',
+            )
+        return _executors[name]
+
+
+def _call(func, args, kwargs):
+    # Pool threads outlive requests, so manage connections as
+    # request_started and request_finished would.
+    close_old_connections()
+    check_connections()
+    try:
+        with metrics.track_queries(), query_guard.track_queries():
+            return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_executor(name, func, *args, **kwargs):
+    """
+    Await func(*args, **kwargs) run in the named pool.
+
+    Raises ExecutorBusy rather than queueing beyond MAX_PENDING calls,
+    so a burst is shed instead of piling up behind the workers.
+    """
+    executor = get_executor(name)
+    with _lock:
+        if _pending.get(name, 0) >= settings.EXECUTORS[name]['MAX_PENDING']:
+            raise ExecutorBusy(name)
+        _pending[name] = _pending.get(name, 0) + 1
+    # Run in a copy of this context, as asyncio.to_thread does, so the
+    # call sees the request's context variables such as its DB routing.
+    context = contextvars.copy_context()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor,
+            functools.partial(context.run, _call, func, args, kwargs),
+        )
+    finally:
+        with _lock:
+            _pending[name] -= 1
@@ -0,0 +1,33 @@
+"""
+Password hashers with costs set from settings
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2id with time, memory and parallelism costs from settings
+
+    Hashes made with other costs are updated on the user's next login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the iteration count from settings"""
+
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
@@ -0,0 +1,118 @@
+"""
+Helpers for benchmarks and load tests against a running server
+"""
+import json
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+
+def percentile(timings, fraction):
+    """Return the value below which fraction of the sorted timings fall."""
+    return timings[round(fraction * (len(timings) - 1))]
+
+
+def http_request(url, data=None, headers=None, timeout=30, method=None):
+    """
+    Send a GET, or a JSON POST if data is given, and return the status.
+
+    Give method for others, such as PATCH.
+    """
+    headers = dict(headers or {})
+    body = None
+    if data is not None:
+        body = json.dumps(data).encode()
+        headers['Content-Type'] = 'application/json'
+    request = Request(url, body, headers, method=method)
+    try:
+        with urlopen(request, timeout=timeout) as res:
+            res.read()
+            return res.status
+    except HTTPError as error:
+        return error.code
+
+
+def probe(func, duration):
+    """Call func back to back for duration seconds, return each latency."""
+    timings = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def load(func, concurrency, duration):
+    """
+    Call func back to back from concurrency threads for duration seconds.
+
+    Return every call's latency and the seconds the run took. The first
+    exception raised by func in any thread is re-raised.
+    """
+    timings = []
+    errors = []
+    lock = threading.Lock()
+
+    def run():
+        try:
+            thread_timings = probe(func, duration)
+        except Exception as error:
+            errors.append(error)
+            return
+        with lock:
+            timings.extend(thread_timings)
+
+    threads = [threading.Thread(target=run) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return timings, time.perf_counter() - start
+
+
+class Flood:
+    """
+    Call func from several threads in a loop while in the with block
+
+    Counts completed calls, and each status func returns.
+    """
+
+    def __init__(self, func, threads):
+        self.func = func
+        self.statuses = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, daemon=True)
+            for _ in range(threads)
+        ]
+
+    def _run(self):
+        while not self._stop.is_set():
+            status = self.func()
+            with self._lock:
+                self.calls += 1
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        """Calls completed per second"""
+        return self.calls / self.elapsed
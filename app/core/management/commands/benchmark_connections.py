@@ -0,0 +1,100 @@
+"""
+Command to benchmark database connection overhead per request
+"""
+import time
+
+from django.core.management import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+from core.backends.postgresql_pool.base import close_pools
+from core.db import is_healthy
+from core.loadtest import percentile
+
+MODES = {
+    'per-request': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+    },
+    'persistent': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'CONN_MAX_AGE': None,
+        'CONN_HEALTH_CHECKS': False,
+    },
+    'persistent+checks': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'CONN_MAX_AGE': None,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    'pool': {
+        'ENGINE': 'core.backends.postgresql_pool',
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+
+
+class Command(BaseCommand):
+    """
+    Time a one query request's connection handling in each mode
+
+    """
+    help = ('Run simulated one query requests against the default '
+            'database with a new connection each, a persistent one with '
+            'and without health checks, and a pooled one, and report '
+            'per request latency and server connections opened.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--mode',
+            action='append',
+            choices=MODES,
+            help='Mode to measure, repeat for several, defaults to all.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"mode":<20}{"p50 ms":>9}{"p99 ms":>9}{"connections":>13}'
+        )
+        for mode in options['mode'] or list(MODES):
+            timings, backends = self.run(mode, options['requests'])
+            timings.sort()
+            self.stdout.write(
+                f'{mode:<20}'
+                f'{percentile(timings, 0.5) * 1000:>9.2f}'
+                f'{percentile(timings, 0.99) * 1000:>9.2f}'
+                f'{backends:>13}'
+            )
+
+    def run(self, mode, requests):
+        """Return per-request seconds and server connections opened."""
+        settings_dict = {
+            **connections['default'].settings_dict,
+            **MODES[mode],
+        }
+        backend = load_backend(settings_dict['ENGINE'])
+        # A separate wrapper, but contrib.postgres looks its alias up.
+        connection = backend.DatabaseWrapper(settings_dict, 'default')
+        timings = []
+        pids = set()
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                # What request_started and request_finished do around a
+                # request, here for this connection alone.
+                connection.close_if_unusable_or_obsolete()
+                if (settings_dict['CONN_HEALTH_CHECKS'] and
+                        connection.connection is not None and
+                        not is_healthy(connection.connection)):
+                    connection.close()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_backend_pid()')
+                    pids.add(cursor.fetchone()[0])
+                connection.close_if_unusable_or_obsolete()
+                timings.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+            close_pools()
+        return timings, len(pids)
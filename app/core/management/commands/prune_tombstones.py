@@ -0,0 +1,75 @@
+"""
+Command to drop tombstones delta sync clients no longer need
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Subquery
+from django.utils import timezone
+
+from core.models import Tombstone, TombstoneHorizon
+
+
+class Command(BaseCommand):
+    """
+    Delete tombstones of deleted users and old ones of everyone else
+
+    A user's pruned tombstones are recorded as their horizon, and sync
+    cursors below it are refused, so those clients sync again from 0.
+    """
+    help = ('Delete sync tombstones of deleted users and those older '
+            'than --days, SYNC_TOMBSTONE_DAYS by default.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.SYNC_TOMBSTONE_DAYS,
+            help='Keep tombstones of live users for this many days.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        with transaction.atomic():
+            orphaned, _ = Tombstone.objects.filter(
+                ~Exists(get_user_model().objects.filter(
+                    pk=OuterRef('user'),
+                )),
+            ).delete()
+            horizons = self.advance_horizons(cutoff)
+            expired, _ = Tombstone.objects.filter(
+                deleted_at__lt=cutoff,
+                change_seq__lte=Subquery(
+                    TombstoneHorizon.objects.filter(
+                        user=OuterRef('user'),
+                    ).values('change_seq')
+                ),
+            ).delete()
+        self.stdout.write(
+            f'Deleted {orphaned} tombstones of deleted users and '
+            f'{expired} expired ones of {horizons} users'
+        )
+
+    def advance_horizons(self, cutoff):
+        rows = Tombstone.objects.filter(
+            deleted_at__lt=cutoff,
+        ).order_by().values('user').annotate(change_seq=Max('change_seq'))
+        horizons = {row['user']: row['change_seq'] for row in rows}
+        existing = TombstoneHorizon.objects.select_for_update().in_bulk(
+            list(horizons),
+        )
+        for user_id, horizon in existing.items():
+            horizon.change_seq = max(horizon.change_seq, horizons[user_id])
+        TombstoneHorizon.objects.bulk_update(
+            existing.values(),
+            ['change_seq'],
+        )
+        TombstoneHorizon.objects.bulk_create(
+            TombstoneHorizon(user_id=user_id, change_seq=change_seq)
+            for user_id, change_seq in horizons.items()
+            if user_id not in existing
+        )
+        return len(horizons)
@@ -0,0 +1,84 @@
+"""
+Command to recompute the counters kept by database triggers
+"""
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from core.models import Ingredient, Recipie, RecipeStats, Tag
+
+
+class Command(BaseCommand):
+    """
+    Rebuild recipe stats and usage counts from the recipies themselves
+
+    Triggers keep them up to date as recipies change. Run this to
+    backfill after loading data with the triggers disabled, or to repair
+    drift. Writes to recipies wait while it runs.
+    """
+    help = ('Recompute every user\'s recipe stats and every tag\'s and '
+            'ingredient\'s recipe count from the recipes.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'LOCK TABLE core_recipie, core_recipie_tags, '
+                    'core_recipie_ingredients IN SHARE MODE'
+                )
+                # Lets the counts be written, see core_keep_recipe_count.
+                cursor.execute("SET LOCAL core.rebuilding_stats = 'on'")
+            users = self.rebuild_recipe_stats()
+            tags = self.rebuild_recipe_counts(Tag, 'tags')
+            ingredients = self.rebuild_recipe_counts(
+                Ingredient,
+                'ingredients',
+            )
+        self.stdout.write(
+            f'Rebuilt stats for {users} users, corrected {tags} tag and '
+            f'{ingredients} ingredient counts'
+        )
+
+    def rebuild_recipe_stats(self):
+        bounds = (None, *RecipeStats.PRICE_BOUNDS, None)
+        buckets = {
+            f'bucket_{i}': Count('id', filter=Q(
+                Q(price__gte=low) if low is not None else Q(),
+                Q(price__lt=high) if high is not None else Q(),
+            ))
+            for i, (low, high) in enumerate(zip(bounds, bounds[1:]))
+        }
+        rows = Recipie.objects.order_by().values('user').annotate(
+            recipe_count=Count('id'),
+            time_minutes_total=Sum('time_minutes'),
+            **buckets,
+        )
+        RecipeStats.objects.all().delete()
+        stats = RecipeStats.objects.bulk_create(
+            RecipeStats(
+                user_id=row['user'],
+                recipe_count=row['recipe_count'],
+                time_minutes_total=row['time_minutes_total'],
+                price_buckets=[row[name] for name in buckets],
+            )
+            for row in rows
+        )
+        return len(stats)
+
+    def rebuild_recipe_counts(self, model, field_name):
+        field = Recipie._meta.get_field(field_name)
+        column = field.m2m_reverse_name()
+        counts = Coalesce(
+            Subquery(
+                field.remote_field.through.objects.filter(**{
+                    column: OuterRef('pk'),
+                }).order_by().values(column).annotate(
+                    count=Count('*'),
+                ).values('count')
+            ),
+            0,
+        )
+        return model.objects.exclude(recipe_count=counts).update(
+            recipe_count=counts,
+        )
@@ -0,0 +1,168 @@
+"""
+Per request cost accounting, aggregated per view and action
+"""
+import contextlib
+import contextvars
+import threading
+import time
+
+from django.db import connections
+
+# Upper bounds of the wall time histogram buckets, in milliseconds.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+_stats = {}
+_lock = threading.Lock()
+
+
+class RequestMetrics:
+    """Costs of the request being served, in seconds and bytes."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.timings = {'serialize': 0.0, 'render': 0.0}
+        self._timing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # As a connection's execute wrapper.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+
+def begin_request():
+    """Start recording costs for a request, return the token to end it."""
+    return _current.set(RequestMetrics())
+
+
+def end_request(token):
+    """Stop recording for a request, return its RequestMetrics."""
+    metrics = _current.get()
+    _current.reset(token)
+    return metrics
+
+
+@contextlib.contextmanager
+def track_queries():
+    """Count the current request's queries made from this thread."""
+    metrics = _current.get()
+    with contextlib.ExitStack() as stack:
+        if metrics is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+        yield
+
+
+@contextlib.contextmanager
+def timer(name):
+    """Add the time spent in the block to the current request's name."""
+    metrics = _current.get()
+    if metrics is None or metrics._timing:
+        # Nested serializers are already counted by the outer one.
+        yield
+        return
+    metrics._timing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[name] += time.perf_counter() - start
+        metrics._timing = False
+
+
+class TimedSerializerMixin:
+    """Count time spent in to_representation as serialize time."""
+
+    def to_representation(self, instance):
+        with timer('serialize'):
+            return super().to_representation(instance)
+
+
+class ViewStats:
+    """Totals and a wall time histogram of one view's requests."""
+
+    def __init__(self):
+        self.count = 0
+        self.totals = {
+            'wall': 0.0,
+            'db': 0.0,
+            'queries': 0,
+            'serialize': 0.0,
+            'render': 0.0,
+            'bytes': 0,
+        }
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, values):
+        self.count += 1
+        for name, value in values.items():
+            self.totals[name] += value
+        wall_ms = values['wall'] * 1000
+        index = next(
+            (i for i, bound in enumerate(BUCKETS_MS) if wall_ms <= bound),
+            len(BUCKETS_MS),
+        )
+        self.buckets[index] += 1
+
+    def percentile(self, fraction):
+        """
+        Return the upper bound of the bucket holding the fraction.
+
+        None means beyond the last bucket.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def as_dict(self):
+        means = {
+            name: total / self.count for name, total in self.totals.items()
+        }
+        return {
+            'count': self.count,
+            'mean_ms': {
+                name: round(means[name] * 1000, 3)
+                for name in ('wall', 'db', 'serialize', 'render')
+            },
+            'mean_queries': round(means['queries'], 2),
+            'mean_bytes': round(means['bytes']),
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'histogram_ms': {
+                **{
+                    f'<={bound}': count
+                    for bound, count in zip(BUCKETS_MS, self.buckets)
+                },
+                f'>{BUCKETS_MS[-1]}': self.buckets[-1],
+            },
+        }
+
+
+def record(view, values):
+    """Add one request's values to view's stats in this process."""
+    with _lock:
+        _stats.setdefault(view, ViewStats()).add(values)
+
+
+def get_stats():
+    """Return every view's aggregated stats in this process."""
+    with _lock:
+        return {
+            view: stats.as_dict() for view, stats in sorted(_stats.items())
+        }
+
+
+def reset_stats():
+    """Clear the aggregated stats."""
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,131 @@
+"""
+Middleware shared by the API apps
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .query_guard import QueryGuard, guard
+from .routers import begin_request, end_request
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _pin_key(request):
+    """Return the cache key pinning this client to the primary, if any."""
+    credentials = (
+        request.META.get('HTTP_AUTHORIZATION') or
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credentials:
+        return None
+    return 'replica:pin:' + hashlib.sha256(credentials.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests read from replicas, keeping read-your-writes
+
+    A client that wrote, identified by its token or session, is pinned
+    to the primary for REPLICA_PIN_SECONDS, longer than replicas lag,
+    so its next reads see its own changes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+
+        cache = caches[settings.REPLICA_PIN_CACHE]
+        key = _pin_key(request)
+        safe = request.method in SAFE_METHODS
+        token = begin_request(safe and not (key and cache.get(key)))
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = end_request(token)
+        if key and (wrote or not safe):
+            cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+
+def _view_name(request):
+    """Return the view and action that served request, if resolved."""
+    match = request.resolver_match
+    if match is None:
+        return None
+    cls = getattr(match.func, 'cls', None)
+    if cls is None:
+        return match.view_name
+    method = request.method.lower()
+    actions = getattr(match.func, 'actions', None) or {}
+    return f'{cls.__name__}.{actions.get(method, method)}'
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure where each request's time goes
+
+    Records wall time, DB queries and their time, serializer and
+    renderer time and response bytes. They are sent back in a
+    Server-Timing header when settings.SERVER_TIMING is set, and
+    aggregated per view and action for the metrics endpoint. Queries
+    serializers make count in both their DB and serialize time.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        token = metrics.begin_request()
+        try:
+            with metrics.track_queries():
+                response = self.get_response(request)
+        finally:
+            costs = metrics.end_request(token)
+        wall = time.perf_counter() - start
+
+        view = _view_name(request)
+        if view is not None:
+            metrics.record(view, {
+                'wall': wall,
+                'db': costs.db,
+                'queries': costs.queries,
+                **costs.timings,
+                'bytes': 0 if response.streaming else len(response.content),
+            })
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={costs.db * 1000:.2f};desc="{costs.queries} queries"',
+                *(
+                    f'{name};dur={value * 1000:.2f}'
+                    for name, value in costs.timings.items()
+                ),
+                f'total;dur={wall * 1000:.2f}',
+            ])
+        return response
+
+
+class QueryGuardMiddleware:
+    """
+    Check each request's queries against settings.QUERY_GUARD
+
+    Flags a statement shape repeated more than MAX_REPEATS times in one
+    request, as an N+1 would, and any query slower than SLOW_MS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_guard = QueryGuard.from_settings()
+        if query_guard is None:
+            return self.get_response(request)
+        with guard(query_guard):
+            return self.get_response(request)
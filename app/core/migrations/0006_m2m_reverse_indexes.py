@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 05:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_composite_user_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX core_recipie_tags_tag_recipie_idx '
+            'ON core_recipie_tags (tag_id, recipie_id);',
+            'DROP INDEX core_recipie_tags_tag_recipie_idx;',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX core_recipie_ingredients_ingredient_recipie_idx '
+            'ON core_recipie_ingredients (ingredient_id, recipie_id);',
+            'DROP INDEX core_recipie_ingredients_ingredient_recipie_idx;',
+        ),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 3.2.25 on 2026-10-18 05:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+CHANGE_SEQ_SQL = """
+CREATE SEQUENCE core_change_seq;
+
+CREATE FUNCTION core_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := nextval('core_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION core_record_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO core_tombstone (user_id, kind, object_id, change_seq,
+                                deleted_at)
+    VALUES (OLD.user_id, TG_ARGV[0], OLD.id, nextval('core_change_seq'),
+            now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION core_touch_linked_recipies() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_recipie SET updated_at = now()
+    WHERE id IN (SELECT recipie_id FROM changed_links);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CHANGE_SEQ_TABLE_SQL = """
+UPDATE {table} SET change_seq = nextval('core_change_seq');
+CREATE TRIGGER {table}_change_seq
+    BEFORE INSERT OR UPDATE ON {table}
+    FOR EACH ROW EXECUTE PROCEDURE core_set_change_seq();
+CREATE TRIGGER {table}_tombstone
+    AFTER DELETE ON {table}
+    FOR EACH ROW EXECUTE PROCEDURE core_record_tombstone('{kind}');
+"""
+
+LINK_TABLE_SQL = """
+CREATE TRIGGER {table}_insert_touch
+    AFTER INSERT ON {table}
+    REFERENCING NEW TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE PROCEDURE core_touch_linked_recipies();
+CREATE TRIGGER {table}_delete_touch
+    AFTER DELETE ON {table}
+    REFERENCING OLD TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE PROCEDURE core_touch_linked_recipies();
+"""
+
+REVERSE_SQL = """
+DROP TRIGGER core_recipie_tags_insert_touch ON core_recipie_tags;
+DROP TRIGGER core_recipie_tags_delete_touch ON core_recipie_tags;
+DROP TRIGGER core_recipie_ingredients_insert_touch
+    ON core_recipie_ingredients;
+DROP TRIGGER core_recipie_ingredients_delete_touch
+    ON core_recipie_ingredients;
+DROP TRIGGER core_recipie_change_seq ON core_recipie;
+DROP TRIGGER core_recipie_tombstone ON core_recipie;
+DROP TRIGGER core_tag_change_seq ON core_tag;
+DROP TRIGGER core_tag_tombstone ON core_tag;
+DROP TRIGGER core_ingredient_change_seq ON core_ingredient;
+DROP TRIGGER core_ingredient_tombstone ON core_ingredient;
+DROP FUNCTION core_touch_linked_recipies();
+DROP FUNCTION core_record_tombstone();
+DROP FUNCTION core_set_change_seq();
+DROP SEQUENCE core_change_seq;
+"""
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('recipe', 'Recipe'), ('tag', 'Tag'), ('ingredient', 'Ingredient')], max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipie',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', 'change_seq'], name='core_ingredient_user_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipie',
+            index=models.Index(fields=['user', 'change_seq'], name='core_recipie_user_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'change_seq'], name='core_tag_user_seq_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'change_seq'], name='core_tombstone_user_seq_idx'),
+        ),
+        migrations.RunSQL(
+            CHANGE_SEQ_SQL +
+            CHANGE_SEQ_TABLE_SQL.format(table='core_recipie', kind='recipe') +
+            CHANGE_SEQ_TABLE_SQL.format(table='core_tag', kind='tag') +
+            CHANGE_SEQ_TABLE_SQL.format(
+                table='core_ingredient',
+                kind='ingredient',
+            ) +
+            LINK_TABLE_SQL.format(table='core_recipie_tags') +
+            LINK_TABLE_SQL.format(table='core_recipie_ingredients'),
+            REVERSE_SQL,
+        ),
+    ]
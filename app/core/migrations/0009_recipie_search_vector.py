@@ -0,0 +1,62 @@
+# Generated by Django 3.2.25 on 2026-10-18 05:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}description, '')), 'B')
+"""
+
+SEARCH_VECTOR_SQL = """
+CREATE FUNCTION core_recipie_set_search_vector() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT'
+            OR NEW.title IS DISTINCT FROM OLD.title
+            OR NEW.description IS DISTINCT FROM OLD.description THEN
+        NEW.search_vector := {vector};
+    ELSE
+        NEW.search_vector := OLD.search_vector;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill without marking every recipe as changed for delta sync.
+ALTER TABLE core_recipie DISABLE TRIGGER core_recipie_change_seq;
+UPDATE core_recipie SET search_vector = {backfill};
+ALTER TABLE core_recipie ENABLE TRIGGER core_recipie_change_seq;
+
+CREATE TRIGGER core_recipie_search_vector
+    BEFORE INSERT OR UPDATE ON core_recipie
+    FOR EACH ROW EXECUTE PROCEDURE core_recipie_set_search_vector();
+""".format(
+    vector=SEARCH_VECTOR.format(row='NEW.'),
+    backfill=SEARCH_VECTOR.format(row=''),
+)
+
+REVERSE_SQL = """
+DROP TRIGGER core_recipie_search_vector ON core_recipie;
+DROP FUNCTION core_recipie_set_search_vector();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_change_seq_and_tombstones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipie',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recipie',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='core_recipie_search_idx'),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, REVERSE_SQL),
+    ]
@@ -0,0 +1,196 @@
+# Generated by Django 3.2.25 on 2026-10-18 06:42
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+PRICE_BUCKETS = ', '.join(
+    f'coalesce(sum(sign) FILTER (WHERE bucket = {bucket}), 0)::integer'
+    for bucket in range(5)
+)
+
+# Totals per user of the sign weighted rows of changes. Prices fall in
+# buckets 0 to 4, split at 5, 10, 20 and 50.
+RECIPE_DELTA = """
+SELECT user_id,
+       sum(sign) AS recipe_count,
+       sum(sign * time_minutes) AS time_minutes_total,
+       ARRAY[{buckets}] AS price_buckets
+FROM (
+    SELECT *, width_bucket(price, ARRAY[5, 10, 20, 50]::numeric[]) AS bucket
+    FROM ({{changes}}) AS changes
+) AS changes
+GROUP BY user_id
+""".format(buckets=PRICE_BUCKETS)
+
+UPDATED_RECIPIES = """
+SELECT change.*
+FROM old_recipies AS o
+    JOIN new_recipies AS n USING (id),
+    LATERAL (VALUES (-1, o.user_id, o.time_minutes, o.price),
+                    (1, n.user_id, n.time_minutes, n.price))
+        AS change (sign, user_id, time_minutes, price)
+WHERE (o.user_id, o.time_minutes, o.price)
+    IS DISTINCT FROM (n.user_id, n.time_minutes, n.price)
+"""
+
+APPLY_DELTA = """
+UPDATE core_recipestats AS stats SET
+    recipe_count = stats.recipe_count + delta.recipe_count,
+    time_minutes_total = stats.time_minutes_total + delta.time_minutes_total,
+    price_buckets = core_add_arrays(stats.price_buckets, delta.price_buckets)
+FROM ({delta}) AS delta
+WHERE stats.user_id = delta.user_id;
+"""
+
+STATS_SQL = """
+CREATE FUNCTION core_add_arrays(a integer[], b integer[])
+RETURNS integer[] AS $$
+    SELECT coalesce(array_agg(coalesce(x, 0) + coalesce(y, 0) ORDER BY n),
+                    ARRAY[]::integer[])
+    FROM unnest(a, b) WITH ORDINALITY AS t (x, y, n)
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE FUNCTION core_count_recipie_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO core_recipestats AS stats
+            (user_id, recipe_count, time_minutes_total, price_buckets)
+        {inserted}
+        ON CONFLICT (user_id) DO UPDATE SET
+            recipe_count = stats.recipe_count + EXCLUDED.recipe_count,
+            time_minutes_total =
+                stats.time_minutes_total + EXCLUDED.time_minutes_total,
+            price_buckets = core_add_arrays(
+                stats.price_buckets,
+                EXCLUDED.price_buckets
+            );
+    -- Deletes only update, as the user may itself be being deleted.
+    ELSIF TG_OP = 'DELETE' THEN
+        {deleted}
+    ELSE
+        {updated}
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION core_count_tag_links() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_tag SET recipe_count = recipe_count + CASE TG_OP
+        WHEN 'INSERT' THEN links.count ELSE -links.count END
+    FROM (
+        SELECT tag_id, count(*) AS count FROM changed_links GROUP BY tag_id
+    ) AS links
+    WHERE core_tag.id = links.tag_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the triggers counting links, or rebuild_stats, change counts.
+CREATE FUNCTION core_keep_recipe_count() RETURNS trigger AS $$
+BEGIN
+    IF pg_trigger_depth() = 1 AND current_setting(
+            'core.rebuilding_stats', true) IS DISTINCT FROM 'on' THEN
+        NEW.recipe_count := OLD.recipe_count;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+INSERT INTO core_recipestats
+    (user_id, recipe_count, time_minutes_total, price_buckets)
+{backfill};
+
+-- Backfill without marking every tag as changed for delta sync.
+ALTER TABLE core_tag DISABLE TRIGGER core_tag_change_seq;
+UPDATE core_tag SET recipe_count = links.count
+FROM (
+    SELECT tag_id, count(*) AS count FROM core_recipie_tags GROUP BY tag_id
+) AS links
+WHERE core_tag.id = links.tag_id;
+ALTER TABLE core_tag ENABLE TRIGGER core_tag_change_seq;
+
+CREATE TRIGGER core_recipie_stats_insert
+    AFTER INSERT ON core_recipie
+    REFERENCING NEW TABLE AS new_recipies
+    FOR EACH STATEMENT EXECUTE PROCEDURE core_count_recipie_stats();
+CREATE TRIGGER core_recipie_stats_update
+    AFTER UPDATE ON core_recipie
+    REFERENCING OLD TABLE AS old_recipies NEW TABLE AS new_recipies
+    FOR EACH STATEMENT EXECUTE PROCEDURE core_count_recipie_stats();
+CREATE TRIGGER core_recipie_stats_delete
+    AFTER DELETE ON core_recipie
+    REFERENCING OLD TABLE AS old_recipies
+    FOR EACH STATEMENT EXECUTE PROCEDURE core_count_recipie_stats();
+CREATE TRIGGER core_recipie_tags_insert_count
+    AFTER INSERT ON core_recipie_tags
+    REFERENCING NEW TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE PROCEDURE core_count_tag_links();
+CREATE TRIGGER core_recipie_tags_delete_count
+    AFTER DELETE ON core_recipie_tags
+    REFERENCING OLD TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE PROCEDURE core_count_tag_links();
+CREATE TRIGGER core_tag_keep_recipe_count
+    BEFORE UPDATE ON core_tag
+    FOR EACH ROW EXECUTE PROCEDURE core_keep_recipe_count();
+""".format(
+    inserted=RECIPE_DELTA.format(
+        changes='SELECT 1 AS sign, user_id, time_minutes, price '
+                'FROM new_recipies',
+    ),
+    deleted=APPLY_DELTA.format(delta=RECIPE_DELTA.format(
+        changes='SELECT -1 AS sign, user_id, time_minutes, price '
+                'FROM old_recipies',
+    )),
+    updated=APPLY_DELTA.format(
+        delta=RECIPE_DELTA.format(changes=UPDATED_RECIPIES),
+    ),
+    backfill=RECIPE_DELTA.format(
+        changes='SELECT 1 AS sign, user_id, time_minutes, price '
+                'FROM core_recipie',
+    ),
+)
+
+REVERSE_SQL = """
+DROP TRIGGER core_recipie_stats_insert ON core_recipie;
+DROP TRIGGER core_recipie_stats_update ON core_recipie;
+DROP TRIGGER core_recipie_stats_delete ON core_recipie;
+DROP TRIGGER core_recipie_tags_insert_count ON core_recipie_tags;
+DROP TRIGGER core_recipie_tags_delete_count ON core_recipie_tags;
+DROP TRIGGER core_tag_keep_recipe_count ON core_tag;
+DROP FUNCTION core_keep_recipe_count();
+DROP FUNCTION core_count_tag_links();
+DROP FUNCTION core_count_recipie_stats();
+DROP FUNCTION core_add_arrays(integer[], integer[]);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_name_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recipe_stats', serialize=False, to='core.user')),
+                ('recipe_count', models.IntegerField(default=0)),
+                ('time_minutes_total', models.BigIntegerField(default=0)),
+                ('price_buckets', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', '-recipe_count', 'id'], name='core_tag_user_count_idx'),
+        ),
+        migrations.RunSQL(STATS_SQL, REVERSE_SQL),
+    ]
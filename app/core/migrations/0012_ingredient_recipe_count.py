@@ -0,0 +1,71 @@
+# Generated by Django 3.2.25 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+COUNT_SQL = """
+CREATE FUNCTION core_count_ingredient_links() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_ingredient SET recipe_count = recipe_count + CASE TG_OP
+        WHEN 'INSERT' THEN links.count ELSE -links.count END
+    FROM (
+        SELECT ingredient_id, count(*) AS count
+        FROM changed_links
+        GROUP BY ingredient_id
+    ) AS links
+    WHERE core_ingredient.id = links.ingredient_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill without marking every ingredient as changed for delta sync.
+ALTER TABLE core_ingredient DISABLE TRIGGER core_ingredient_change_seq;
+UPDATE core_ingredient SET recipe_count = links.count
+FROM (
+    SELECT ingredient_id, count(*) AS count
+    FROM core_recipie_ingredients
+    GROUP BY ingredient_id
+) AS links
+WHERE core_ingredient.id = links.ingredient_id;
+ALTER TABLE core_ingredient ENABLE TRIGGER core_ingredient_change_seq;
+
+CREATE TRIGGER core_recipie_ingredients_insert_count
+    AFTER INSERT ON core_recipie_ingredients
+    REFERENCING NEW TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE PROCEDURE core_count_ingredient_links();
+CREATE TRIGGER core_recipie_ingredients_delete_count
+    AFTER DELETE ON core_recipie_ingredients
+    REFERENCING OLD TABLE AS changed_links
+    FOR EACH STATEMENT EXECUTE PROCEDURE core_count_ingredient_links();
+CREATE TRIGGER core_ingredient_keep_recipe_count
+    BEFORE UPDATE ON core_ingredient
+    FOR EACH ROW EXECUTE PROCEDURE core_keep_recipe_count();
+"""
+
+REVERSE_SQL = """
+DROP TRIGGER core_recipie_ingredients_insert_count
+    ON core_recipie_ingredients;
+DROP TRIGGER core_recipie_ingredients_delete_count
+    ON core_recipie_ingredients;
+DROP TRIGGER core_ingredient_keep_recipe_count ON core_ingredient;
+DROP FUNCTION core_count_ingredient_links();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_recipe_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipe_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', '-recipe_count', 'id'], name='core_ingredient_user_count_idx'),
+        ),
+        migrations.RunSQL(COUNT_SQL, REVERSE_SQL),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# Each user's writes wait for the previous writer of their rows to
+# commit before taking a change_seq, so a sync cursor past a seq can't
+# skip a row committed later with a lower one.
+LOCK_SQL = """
+CREATE FUNCTION core_lock_user_changes(user_id bigint) RETURNS void AS $$
+    SELECT pg_advisory_xact_lock(
+        hashtext('core_change_seq'),
+        (user_id % 2147483647)::integer
+    )
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION core_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    PERFORM core_lock_user_changes(NEW.user_id);
+    NEW.change_seq := nextval('core_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION core_record_tombstone() RETURNS trigger AS $$
+BEGIN
+    PERFORM core_lock_user_changes(OLD.user_id);
+    INSERT INTO core_tombstone (user_id, kind, object_id, change_seq,
+                                deleted_at)
+    VALUES (OLD.user_id, TG_ARGV[0], OLD.id, nextval('core_change_seq'),
+            now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+REVERSE_SQL = """
+CREATE OR REPLACE FUNCTION core_set_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := nextval('core_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION core_record_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO core_tombstone (user_id, kind, object_id, change_seq,
+                                deleted_at)
+    VALUES (OLD.user_id, TG_ARGV[0], OLD.id, nextval('core_change_seq'),
+            now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP FUNCTION core_lock_user_changes(bigint);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_ingredient_recipe_count'),
+    ]
+
+    operations = [
+        migrations.RunSQL(LOCK_SQL, REVERSE_SQL),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:16
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_tombstone_horizon'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recipie',
+            name='core_recipie_search_idx',
+        ),
+        migrations.AddIndex(
+            model_name='recipie',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['user', 'search_vector'], name='core_recipie_user_search_idx', opclasses=['int8_ops', 'tsvector_ops']),
+        ),
+    ]
@@ -2,6 +2,9 @@
 Database models
 """
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import (
     BaseUserManager,
@@ -43,6 +46,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     objects = UserManager()
 
 
+class RecipieManager(models.Manager):
+    """Manager for recipies"""
+
+    def get_queryset(self):
+        """Leave the search vector, maintained by the database, unloaded"""
+        return super().get_queryset().defer('search_vector')
+
+
 class Recipie(models.Model):
     """Recipe object."""
     user = models.ForeignKey(
@@ -56,6 +67,29 @@ class Recipie(models.Model):
     link = models.CharField(max_length=255, blank=True)
     tags = models.ManyToManyField('Tag')
     ingredients = models.ManyToManyField('Ingredient')
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = RecipieManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-id'],
+                name='core_recipie_user_id_idx',
+            ),
+            models.Index(
+                fields=['user', 'change_seq'],
+                name='core_recipie_user_seq_idx',
+            ),
+            GinIndex(
+                fields=['user', 'search_vector'],
+                opclasses=['int8_ops', 'tsvector_ops'],
+                name='core_recipie_user_search_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -67,6 +101,31 @@ class Tag(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+    # Maintained by database triggers, saving a tag leaves it as is.
+    recipe_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-name', 'id'],
+                name='core_tag_user_name_idx',
+            ),
+            models.Index(
+                fields=['user', '-recipe_count', 'id'],
+                name='core_tag_user_count_idx',
+            ),
+            models.Index(
+                fields=['user', 'change_seq'],
+                name='core_tag_user_seq_idx',
+            ),
+            GinIndex(
+                fields=['user', 'name'],
+                opclasses=['int8_ops', 'gin_trgm_ops'],
+                name='core_tag_name_trgm_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -79,6 +138,99 @@ class Ingredient(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+    # Maintained by database triggers, saving an ingredient leaves it as is.
+    recipe_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-name', 'id'],
+                name='core_ingredient_user_name_idx',
+            ),
+            models.Index(
+                fields=['user', '-recipe_count', 'id'],
+                name='core_ingredient_user_count_idx',
+            ),
+            models.Index(
+                fields=['user', 'change_seq'],
+                name='core_ingredient_user_seq_idx',
+            ),
+            GinIndex(
+                fields=['user', 'name'],
+                opclasses=['int8_ops', 'gin_trgm_ops'],
+                name='core_ingredient_name_trgm_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class Tombstone(models.Model):
+    """Record of a deleted recipie, tag or ingredient for delta sync."""
+    RECIPE = 'recipe'
+    TAG = 'tag'
+    INGREDIENT = 'ingredient'
+    KIND_CHOICES = [
+        (RECIPE, 'Recipe'),
+        (TAG, 'Tag'),
+        (INGREDIENT, 'Ingredient'),
+    ]
+
+    # Written by a database trigger while the user may itself be being
+    # deleted, so there is no FK constraint to trip over.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'change_seq'],
+                name='core_tombstone_user_seq_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}'
+
+
+class TombstoneHorizon(models.Model):
+    """Highest change_seq of a user's tombstones that have been pruned."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='tombstone_horizon',
+    )
+    change_seq = models.BigIntegerField()
+
+    def __str__(self):
+        return f'Pruned through {self.change_seq}'
+
+
+class RecipeStats(models.Model):
+    """Totals over a user's recipies, maintained by database triggers."""
+    # Upper bounds of each price bucket but the last, which is open.
+    PRICE_BOUNDS = (5, 10, 20, 50)
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recipe_stats',
+    )
+    recipe_count = models.IntegerField(default=0)
+    time_minutes_total = models.BigIntegerField(default=0)
+    price_buckets = ArrayField(models.IntegerField(), default=list)
+
+    def __str__(self):
+        return f'{self.recipe_count} recipies'
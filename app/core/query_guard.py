@@ -0,0 +1,116 @@
+"""
+Guard against repeated and slow SQL within a request
+"""
+import contextlib
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('query_guard', default=None)
+
+# Applied in order, so literals become ? before lists of them collapse.
+_NORMALIZE = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%s|\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+class QueryGuardError(AssertionError):
+    """Raised for a repeated or slow query when the action is raise."""
+
+
+def fingerprint(sql):
+    """
+    Return the shape of a statement, without its values.
+
+    Statements differing only in literals, parameters, or the length
+    of IN lists and VALUES rows share a shape.
+    """
+    for pattern, replacement in _NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryGuard:
+    """
+    Execute wrapper reporting repeated statement shapes and slow queries
+
+    Reports the statement the first time its shape runs more than
+    max_repeats times, and any query taking over slow_ms. Either check
+    is off when its limit is None. Reports are logged as warnings, or
+    raised as QueryGuardError when action is 'raise'.
+    """
+
+    def __init__(self, max_repeats=None, slow_ms=None, action='warn'):
+        self.max_repeats = max_repeats
+        self.slow_ms = slow_ms
+        self.action = action
+        self.counts = Counter()
+
+    @classmethod
+    def from_settings(cls):
+        """Return a guard configured by settings.QUERY_GUARD, if enabled."""
+        options = settings.QUERY_GUARD
+        if not options['ENABLED']:
+            return None
+        return cls(
+            options['MAX_REPEATS'],
+            options['SLOW_MS'],
+            options['ACTION'],
+        )
+
+    def report(self, message):
+        if self.action == 'raise':
+            raise QueryGuardError(message)
+        logger.warning(message)
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = fingerprint(sql)
+        self.counts[shape] += 1
+        count = self.counts[shape]
+        if self.max_repeats is not None and count == self.max_repeats + 1:
+            self.report(
+                f'Query shape ran over {self.max_repeats} times, likely '
+                f'an N+1: {shape}'
+            )
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if self.slow_ms is not None and elapsed_ms > self.slow_ms:
+            self.report(
+                f'Query took {elapsed_ms:.1f} ms, over the '
+                f'{self.slow_ms} ms budget: {shape}'
+            )
+        return result
+
+
+@contextlib.contextmanager
+def guard(query_guard):
+    """Check every query made in the block with query_guard."""
+    token = _current.set(query_guard)
+    try:
+        with track_queries():
+            yield query_guard
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def track_queries():
+    """Check the current guard's queries made from this thread."""
+    query_guard = _current.get()
+    with contextlib.ExitStack() as stack:
+        if query_guard is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_guard))
+        yield
@@ -0,0 +1,75 @@
+"""
+Renderers shared by the API apps
+"""
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+from .metrics import timer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed
+
+    Gives the bytes JSONRenderer would. Dates, times, Decimals and other
+    types orjson doesn't encode the same way go through the renderer's
+    encoder class. Indented or ASCII-only output, and anything orjson
+    can't encode such as integers beyond 64 bits, use JSONRenderer.
+    Float values, unlike Decimals, may differ in exponent notation.
+    """
+
+    def get_default(self):
+        """Return orjson's default callback, using the encoder class."""
+        encoder = self.encoder_class()
+
+        def default(obj):
+            value = encoder.default(obj)
+            if isinstance(value, float):
+                # Decimals are encoded as floats, which orjson writes its
+                # own way, e.g. 1e-6 rather than 1e-06.
+                return orjson.Fragment(
+                    json.dumps(value, allow_nan=not self.strict)
+                )
+            return value
+
+        return default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timer('render'):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if (orjson is None or data is None or self.ensure_ascii or
+                not self.compact or
+                self.get_indent(accepted_media_type, renderer_context or {})
+                is not None):
+            return super().render(
+                data,
+                accepted_media_type,
+                renderer_context,
+            )
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.get_default(),
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data,
+                accepted_media_type,
+                renderer_context,
+            )
+        # As JSONRenderer does, escape the line separators JSON allows
+        # in strings but JavaScript doesn't.
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
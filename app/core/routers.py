@@ -0,0 +1,82 @@
+"""
+Database router sending request reads to read replicas
+"""
+import contextvars
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# The routing state of the request being served, if any. A context
+# variable, so that pool threads and async views see their own request's.
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+
+
+class RequestState:
+    """Whether the current request may read from a replica."""
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def begin_request(use_replica):
+    """Start routing for a request, return the token to end it with."""
+    return _request_state.set(RequestState(use_replica))
+
+
+def end_request(token):
+    """Stop routing for a request, return whether it wrote anything."""
+    state = _request_state.get()
+    _request_state.reset(token)
+    return state.wrote
+
+
+def _primary_models():
+    """
+    Models authentication reads, which always come from the primary.
+
+    A token or user is often used straight after the unauthenticated
+    request creating it, which pins nothing, so a lagging replica
+    wouldn't know it yet.
+    """
+    return {
+        'authtoken.token',
+        'sessions.session',
+        settings.AUTH_USER_MODEL.lower(),
+    }
+
+
+class ReplicaRouter:
+    """
+    Read from settings.REPLICA_DATABASES while serving safe requests
+
+    Reads go to a random replica only during a request the middleware
+    allowed to, until that request writes. Everything else, including
+    all writes and authentication lookups, uses the primary so it never
+    sees stale rows.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if (state is not None and state.use_replica and not state.wrote and
+                settings.REPLICA_DATABASES and
+                model._meta.label_lower not in _primary_models()):
+            return random.choice(settings.REPLICA_DATABASES)
+        # Explicitly, or Django would follow a replica loaded instance.
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold copies of the primary's rows.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
@@ -0,0 +1,40 @@
+"""
+Test runner failing tests on query regressions
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner
+
+# A mirror of the test database for the replica routing tests, which
+# opt into reading from it with override_settings(REPLICA_DATABASES=...).
+REPLICA_ALIAS = 'replica'
+
+
+class QueryGuardTestRunner(DiscoverRunner):
+    """
+    DiscoverRunner with the query guard raising for every request
+
+    A test whose request repeats a statement shape, as an N+1 does, or
+    runs a query over budget fails with a QueryGuardError. The test
+    databases include a REPLICA_ALIAS mirror of the default one.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._query_guard = settings.QUERY_GUARD
+        settings.QUERY_GUARD = {
+            **settings.QUERY_GUARD,
+            'ENABLED': True,
+            'ACTION': 'raise',
+        }
+
+    def teardown_test_environment(self, **kwargs):
+        settings.QUERY_GUARD = self._query_guard
+        super().teardown_test_environment(**kwargs)
+
+    def setup_databases(self, **kwargs):
+        connections.databases.setdefault(REPLICA_ALIAS, {
+            **connections.databases[DEFAULT_DB_ALIAS],
+            'TEST': {'MIRROR': DEFAULT_DB_ALIAS},
+        })
+        return super().setup_databases(**kwargs)
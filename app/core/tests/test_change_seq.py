@@ -0,0 +1,125 @@
+"""
+Tests for the change sequence and tombstones kept for delta sync
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from core.models import Tag, Tombstone, TombstoneHorizon
+
+
+class ChangeSeqLockTests(TransactionTestCase):
+    """Test writes take the per-user change lock until they commit"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.other_user = get_user_model().objects.create_user(
+            'other@example.com',
+            'testpass123',
+        )
+        self.other = connections.create_connection('default')
+        self.addCleanup(self.other.close)
+
+    def locked(self, user):
+        """Whether another transaction holds the user's change lock."""
+        with self.other.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_try_advisory_xact_lock("
+                "hashtext('core_change_seq'), %s)",
+                [user.id],
+            )
+            return not cursor.fetchone()[0]
+
+    def test_write_locks_user_until_commit(self):
+        """Test a change_seq write blocks the user's other writers."""
+        with transaction.atomic():
+            Tag.objects.create(user=self.user, name='Vegan')
+
+            self.assertTrue(self.locked(self.user))
+            self.assertFalse(self.locked(self.other_user))
+
+        self.assertFalse(self.locked(self.user))
+
+    def test_delete_locks_user_until_commit(self):
+        """Test recording a tombstone blocks the user's other writers."""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+
+        with transaction.atomic():
+            tag.delete()
+
+            self.assertTrue(self.locked(self.user))
+
+        self.assertFalse(self.locked(self.user))
+        self.assertFalse(connection.in_atomic_block)
+
+
+class PruneTombstonesTests(TestCase):
+    """Test the prune_tombstones command"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+
+    def delete_tag(self, name, days_ago=0, user=None):
+        tag = Tag.objects.create(user=user or self.user, name=name)
+        tag.delete()
+        tombstone = Tombstone.objects.latest('change_seq')
+        tombstone.deleted_at = timezone.now() - timedelta(days=days_ago)
+        tombstone.save()
+        return tombstone
+
+    def prune(self, *args):
+        out = StringIO()
+        call_command('prune_tombstones', *args, stdout=out)
+        return out.getvalue()
+
+    def test_prunes_deleted_users(self):
+        """Test tombstones of deleted users are all deleted."""
+        other = get_user_model().objects.create_user(
+            'other@example.com',
+            'testpass123',
+        )
+        self.delete_tag('Recent', user=other)
+        other.delete()
+        kept = self.delete_tag('Mine')
+
+        out = self.prune()
+
+        self.assertEqual(list(Tombstone.objects.all()), [kept])
+        self.assertFalse(TombstoneHorizon.objects.exists())
+        self.assertIn('Deleted 1 tombstones of deleted users', out)
+
+    def test_prunes_expired(self):
+        """Test expired tombstones are pruned, however old the user's
+        rows are."""
+        Tag.objects.create(user=self.user, name='Kept')
+        first = self.delete_tag('First', days_ago=40)
+        second = self.delete_tag('Second', days_ago=40)
+        recent = self.delete_tag('Recent', days_ago=1)
+
+        self.prune()
+
+        self.assertEqual(list(Tombstone.objects.all()), [recent])
+        horizon = TombstoneHorizon.objects.get(user=self.user)
+        self.assertEqual(horizon.change_seq, second.change_seq)
+        self.assertGreater(horizon.change_seq, first.change_seq)
+
+    def test_prune_days_option(self):
+        """Test --days sets how long tombstones are kept."""
+        self.delete_tag('Old', days_ago=5)
+
+        self.prune('--days', '10')
+        self.assertEqual(Tombstone.objects.count(), 1)
+
+        self.prune('--days', '2')
+        self.assertEqual(Tombstone.objects.count(), 0)
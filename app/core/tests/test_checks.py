@@ -0,0 +1,47 @@
+"""
+Tests for the system checks
+"""
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_shared_caches
+
+LOCMEM = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+MEMCACHED = {
+    'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'LOCATION': 'memcached:11211',
+}
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    """Test process-local caches are refused with several processes"""
+
+    @override_settings(WEB_CONCURRENCY=1, CACHES={'default': LOCMEM})
+    def test_single_process(self):
+        """Test one process may keep its cache in memory"""
+        self.assertEqual(check_shared_caches(None), [])
+
+    @override_settings(WEB_CONCURRENCY=2, CACHES={'default': LOCMEM})
+    def test_several_processes_local_cache(self):
+        """Test several processes with a local cache fail the check"""
+        errors = check_shared_caches(None)
+
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+        self.assertIn('RECIPE_LIST_CACHE', errors[0].msg)
+
+    @override_settings(
+        WEB_CONCURRENCY=2,
+        CACHES={'default': MEMCACHED, 'local': LOCMEM},
+        REPLICA_DATABASES=['replica1'],
+        REPLICA_PIN_CACHE='local',
+    )
+    def test_replica_pin_cache(self):
+        """Test replica pins must be kept in a shared cache too"""
+        errors = check_shared_caches(None)
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn('REPLICA_PIN_CACHE', errors[0].msg)
+
+    @override_settings(WEB_CONCURRENCY=2, CACHES={'default': MEMCACHED})
+    def test_several_processes_shared_cache(self):
+        """Test several processes sharing memcached pass"""
+        self.assertEqual(check_shared_caches(None), [])
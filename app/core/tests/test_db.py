@@ -0,0 +1,103 @@
+"""
+Tests for connection health checks and the pooled backend
+"""
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connections
+from django.db.utils import load_backend
+from django.test import TestCase
+
+from core.backends.postgresql_pool.base import close_pools
+from core.db import check_connections, is_healthy
+
+
+def backend_pid(connection):
+    """Return the server process id behind a connection wrapper."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_backend_pid()')
+        return cursor.fetchone()[0]
+
+
+class DatabaseConnectionTests(TestCase):
+    """Test connection reuse helpers against the test database"""
+
+    def make_connection(self, **settings):
+        """Return a standalone connection wrapper, closed on cleanup."""
+        settings_dict = {**connections['default'].settings_dict, **settings}
+        backend = load_backend(settings_dict['ENGINE'])
+        connection = backend.DatabaseWrapper(settings_dict, 'default')
+        self.addCleanup(close_pools)
+        self.addCleanup(connection.close)
+        return connection
+
+    def test_is_healthy(self):
+        """Test a working connection is healthy and a closed one not"""
+        connection = self.make_connection()
+        connection.ensure_connection()
+        self.assertTrue(is_healthy(connection.connection))
+
+        connection.connection.close()
+
+        self.assertFalse(is_healthy(connection.connection))
+
+    def test_check_connections_closes_broken(self):
+        """Test a connection that stopped working is closed before use"""
+        healthy = self.make_connection(CONN_HEALTH_CHECKS=True)
+        healthy.ensure_connection()
+        broken = self.make_connection(CONN_HEALTH_CHECKS=True)
+        broken.ensure_connection()
+        broken.connection.close()
+
+        with patch.object(connections, 'all', return_value=[
+            healthy,
+            broken,
+        ]):
+            check_connections()
+
+        self.assertIsNotNone(healthy.connection)
+        self.assertIsNone(broken.connection)
+
+    def test_pool_reuses_connections(self):
+        """Test the pooled backend hands back the same server connection"""
+        connection = self.make_connection(
+            ENGINE='core.backends.postgresql_pool',
+            POOL={'MIN_SIZE': 1, 'MAX_SIZE': 2, 'TIMEOUT': 1},
+        )
+        first = backend_pid(connection)
+        connection.close()
+
+        self.assertEqual(backend_pid(connection), first)
+
+    def test_pool_replaces_broken_connection(self):
+        """Test a pooled connection that stopped working is not handed out"""
+        connection = self.make_connection(
+            ENGINE='core.backends.postgresql_pool',
+            CONN_HEALTH_CHECKS=True,
+            POOL={'MIN_SIZE': 1, 'MAX_SIZE': 2, 'TIMEOUT': 1},
+        )
+        first = backend_pid(connection)
+        raw = connection.connection
+        connection.close()
+        raw.close()
+
+        self.assertNotEqual(backend_pid(connection), first)
+
+    def test_benchmark_connections(self):
+        """Test the benchmark reports each mode's connections opened"""
+        out = StringIO()
+
+        call_command(
+            'benchmark_connections',
+            '--requests=5',
+            '--mode=per-request',
+            '--mode=pool',
+            stdout=out,
+        )
+
+        rows = [line.split() for line in out.getvalue().splitlines()[1:]]
+        self.assertEqual(
+            [(row[0], row[-1]) for row in rows],
+            [('per-request', '5'), ('pool', '1')],
+        )
@@ -0,0 +1,128 @@
+"""
+Tests for the orjson backed renderer and parser
+"""
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import parsers, renderers
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+PAYLOAD = {
+    'price': Decimal('5.50'),
+    'tiny': Decimal('0.000001'),
+    'updated_at': datetime.datetime(
+        2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc,
+    ),
+    'naive': datetime.datetime(2024, 5, 1, 12, 30),
+    'day': datetime.date(2024, 5, 1),
+    'time': datetime.time(9, 15, 30, 250000),
+    'duration': datetime.timedelta(minutes=90),
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'label': gettext_lazy('Vegan'),
+    'text': 'Crème brûlée \u2028 line \u2029 "quoted"',
+    'tags': [{'id': 1, 'name': 'Vegan'}, {'id': 2, 'name': 'Dessert'}],
+    'ids': (1, 2, 3),
+    'empty': None,
+}
+
+
+@skipIf(renderers.orjson is None, 'orjson is not installed')
+class FastJSONRendererTests(SimpleTestCase):
+    """Test FastJSONRenderer renders what JSONRenderer does"""
+
+    def assertSameAsJSONRenderer(self, data, media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type),
+        )
+
+    def test_same_bytes(self):
+        """Test Decimals, dates and nested data render identically"""
+        self.assertSameAsJSONRenderer(PAYLOAD)
+
+    def test_fallback_without_orjson(self):
+        """Test the renderer works without orjson installed"""
+        with patch.object(renderers, 'orjson', None):
+            self.assertSameAsJSONRenderer(PAYLOAD)
+
+    def test_indent(self):
+        """Test indentation asked for by the client is kept"""
+        self.assertSameAsJSONRenderer(
+            PAYLOAD,
+            'application/json; indent=4',
+        )
+
+    def test_decimal_not_a_number(self):
+        """Test a NaN Decimal is refused as JSONRenderer refuses it"""
+        with self.assertRaises(ValueError):
+            FastJSONRenderer().render({'price': Decimal('NaN')})
+
+    def test_unsupported_values(self):
+        """Test values orjson can't encode still render"""
+        self.assertSameAsJSONRenderer({'big': 2 ** 70, 1: 'int key'})
+
+    def test_none(self):
+        """Test no data renders an empty body"""
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+@skipIf(parsers.orjson is None, 'orjson is not installed')
+class FastJSONParserTests(SimpleTestCase):
+    """Test FastJSONParser parses what JSONParser does"""
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(
+            io.BytesIO(body),
+            'application/json',
+            {'encoding': encoding},
+        )
+
+    def assertSameAsJSONParser(self, body, encoding='utf-8'):
+        self.assertEqual(
+            self.parse(FastJSONParser(), body, encoding),
+            self.parse(JSONParser(), body, encoding),
+        )
+
+    def test_same_data(self):
+        """Test JSON bodies parse identically"""
+        self.assertSameAsJSONParser(
+            '{"title": "Crème", "price": "5.50", "time_minutes": 5, '
+            '"ratio": 0.1, "tags": [{"name": "Vegan"}], "link": null}'
+            .encode()
+        )
+
+    def test_big_int(self):
+        """Test integers beyond 64 bits parse"""
+        self.assertSameAsJSONParser(b'{"id": 1180591620717411303424}')
+
+    def test_other_encoding(self):
+        """Test bodies in another charset parse"""
+        self.assertSameAsJSONParser(
+            '{"title": "Crème"}'.encode('latin-1'),
+            'latin-1',
+        )
+
+    def test_errors(self):
+        """Test invalid bodies raise JSONParser's errors"""
+        for body in (b'{"title": ', b'{"price": NaN}', b''):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as fast:
+                    self.parse(FastJSONParser(), body)
+                with self.assertRaises(ParseError) as stdlib:
+                    self.parse(JSONParser(), body)
+                self.assertEqual(
+                    str(fast.exception.detail),
+                    str(stdlib.exception.detail),
+                )
@@ -0,0 +1,154 @@
+"""
+Tests for request cost accounting
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.models import Recipie, Tag
+from user import authentication
+
+METRICS_URL = reverse('metrics')
+RECIPES_URL = reverse('recipe:recipie-list')
+
+
+def server_timing(response):
+    """Return a response's Server-Timing metrics as name: (ms, desc)."""
+    timings = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        params = dict(param.split('=', 1) for param in params)
+        timings[name] = (float(params['dur']), params.get('desc'))
+    return timings
+
+
+class RequestMetricsTests(TestCase):
+    """Test the costs recorded for API requests"""
+
+    def setUp(self):
+        metrics.reset_stats()
+        self.addCleanup(metrics.reset_stats)
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        recipe = Recipie.objects.create(
+            user=self.user,
+            title='Soup',
+            time_minutes=5,
+            price=5,
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+    @override_settings(RECIPE_LIST_CACHE_TIMEOUT=0)
+    def test_server_timing_header(self):
+        """Test responses carry their query, serializer and render costs"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL)
+
+        timings = server_timing(res)
+        self.assertEqual(
+            set(timings),
+            {'db', 'serialize', 'render', 'total'},
+        )
+        self.assertEqual(timings['db'][1], f'"{len(queries)} queries"')
+        self.assertGreater(timings['serialize'][0], 0)
+        self.assertGreater(timings['render'][0], 0)
+        self.assertGreaterEqual(timings['total'][0], timings['db'][0])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        """Test the header can be turned off"""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertNotIn('Server-Timing', res)
+
+    def test_aggregated_per_view_and_action(self):
+        """Test requests are aggregated under their viewset and action"""
+        self.client.get(RECIPES_URL)
+        res = self.client.get(RECIPES_URL)
+        self.client.get(reverse('recipe:tag-list'))
+
+        stats = metrics.get_stats()
+        self.assertEqual(
+            set(stats),
+            {'RecipeiViewSet.list', 'TagViewSet.list'},
+        )
+        recipes = stats['RecipeiViewSet.list']
+        self.assertEqual(recipes['count'], 2)
+        self.assertEqual(sum(recipes['histogram_ms'].values()), 2)
+        self.assertEqual(recipes['mean_bytes'], len(res.content))
+        self.assertGreater(recipes['mean_queries'], 0)
+
+    def test_metrics_endpoint(self):
+        """Test admins can read and reset the aggregates"""
+        self.client.get(RECIPES_URL)
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['views']['RecipeiViewSet.list']['count'], 1)
+
+        res = self.client.delete(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertNotIn('RecipeiViewSet.list', metrics.get_stats())
+
+    def test_metrics_endpoint_token_cache(self):
+        """Test the token cache hits and misses are reported and reset"""
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com',
+            'testpass123',
+        )
+        token = Token.objects.create(user=admin)
+        authentication.local_cache.clear()
+        authentication.reset_stats()
+        self.addCleanup(authentication.reset_stats)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        client.get(METRICS_URL)
+        res = client.get(METRICS_URL)
+
+        self.assertEqual(
+            res.data['token_cache'],
+            {'local_hits': 1, 'shared_hits': 0, 'misses': 1},
+        )
+
+        client.delete(METRICS_URL)
+
+        self.assertEqual(authentication.get_stats()['misses'], 0)
+
+    def test_metrics_endpoint_admin_only(self):
+        """Test other users can't read the aggregates"""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ViewStatsTests(SimpleTestCase):
+    """Test the per view histogram"""
+
+    def test_percentiles(self):
+        """Test percentiles are the upper bounds of their buckets"""
+        stats = metrics.ViewStats()
+        for wall_ms in [0.5] * 90 + [30] * 9 + [6000]:
+            stats.add({'wall': wall_ms / 1000})
+
+        self.assertEqual(stats.percentile(0.5), 1)
+        self.assertEqual(stats.percentile(0.95), 50)
+        self.assertIsNone(stats.percentile(1))
+        self.assertEqual(stats.as_dict()['histogram_ms']['>5000'], 1)
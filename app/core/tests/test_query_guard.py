@@ -0,0 +1,136 @@
+"""
+Tests for the repeated and slow query guard
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+
+from core.middleware import QueryGuardMiddleware
+from core.models import Recipie, Tag
+from core.query_guard import (
+    QueryGuard,
+    QueryGuardError,
+    fingerprint,
+    guard,
+)
+from recipe.serializers import RecipeSerializer
+
+
+class FingerprintTests(SimpleTestCase):
+    """Test statements are reduced to their shape"""
+
+    def test_values_removed(self):
+        """Test literals and parameters don't change the shape"""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = %s AND name = 'it''s'"),
+            fingerprint('SELECT * FROM t WHERE id = 42 AND name = %s'),
+        )
+
+    def test_lists_collapsed(self):
+        """Test IN lists and VALUES rows of any length share a shape"""
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            'SELECT * FROM t WHERE id IN (...)',
+        )
+        self.assertEqual(
+            fingerprint('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)'),
+            fingerprint('INSERT INTO t (a, b) VALUES (%s, %s)'),
+        )
+
+    def test_identifiers_kept(self):
+        """Test names holding digits are left alone"""
+        self.assertIn('T3."id"', fingerprint('SELECT T3."id" FROM t T3'))
+
+
+class QueryGuardTests(TestCase):
+    """Test repeated and slow queries are reported"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+
+    def create_recipes(self, count):
+        for i in range(count):
+            recipe = Recipie.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                time_minutes=5,
+                price=5,
+            )
+            recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+    def test_catches_n_plus_one(self):
+        """Test serializing without prefetching tags is caught"""
+        self.create_recipes(6)
+
+        with self.assertRaisesMessage(QueryGuardError, 'core_tag'):
+            with guard(QueryGuard(max_repeats=5, action='raise')):
+                RecipeSerializer(
+                    Recipie.objects.filter(user=self.user),
+                    many=True,
+                ).data
+
+    def test_prefetched_passes(self):
+        """Test prefetching keeps each shape to one run"""
+        self.create_recipes(6)
+
+        with guard(QueryGuard(max_repeats=1, action='raise')):
+            RecipeSerializer(
+                Recipie.objects.filter(user=self.user).prefetch_related(
+                    'tags',
+                    'ingredients',
+                ),
+                many=True,
+            ).data
+
+    def test_warn_logs(self):
+        """Test the warn action logs and lets the query run"""
+        with self.assertLogs('core.query_guard', 'WARNING') as logs:
+            with guard(QueryGuard(max_repeats=1)):
+                for _ in range(3):
+                    self.assertFalse(Tag.objects.filter(name='x').exists())
+
+        self.assertEqual(len(logs.output), 1)
+
+    def test_slow_query(self):
+        """Test a query over the latency budget is reported"""
+        with self.assertRaisesMessage(QueryGuardError, 'budget'):
+            with guard(QueryGuard(slow_ms=10, action='raise')):
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_sleep(0.05)')
+
+    def test_enabled_in_tests(self):
+        """Test the test runner makes every request raise on regressions"""
+        self.assertTrue(settings.QUERY_GUARD['ENABLED'])
+        self.assertEqual(settings.QUERY_GUARD['ACTION'], 'raise')
+
+    def test_middleware(self):
+        """Test the middleware guards requests as configured"""
+        def view(request):
+            for _ in range(3):
+                Tag.objects.filter(name='x').exists()
+            return HttpResponse()
+
+        middleware = QueryGuardMiddleware(view)
+        request = RequestFactory().get('/')
+        options = {
+            'ENABLED': True,
+            'MAX_REPEATS': 2,
+            'SLOW_MS': None,
+            'ACTION': 'raise',
+        }
+
+        with override_settings(QUERY_GUARD=options):
+            with self.assertRaises(QueryGuardError):
+                middleware(request)
+        with override_settings(QUERY_GUARD={**options, 'ENABLED': False}):
+            self.assertEqual(middleware(request).status_code, 200)
@@ -0,0 +1,194 @@
+"""
+Tests for routing request reads to read replicas
+"""
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import executors
+from core.middleware import ReplicaRoutingMiddleware, _pin_key
+from core.models import Recipie, Tag
+from core.test_runner import REPLICA_ALIAS
+
+REPLICAS = ['replica1', 'replica2']
+
+
+@override_settings(REPLICA_DATABASES=REPLICAS)
+class ReplicaRouterTests(SimpleTestCase):
+    """Test which database the router picks in and out of requests"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def serve(self, method, token='abc', write=False, model=Tag):
+        """Serve a request, return the database it read model from."""
+        def view(request):
+            if write:
+                router.db_for_write(Tag)
+            view.read_from = router.db_for_read(model)
+            return HttpResponse()
+
+        request = self.factory.generic(
+            method,
+            '/api/recipe/tags/',
+            HTTP_AUTHORIZATION=f'Token {token}',
+        )
+        ReplicaRoutingMiddleware(view)(request)
+        return view.read_from
+
+    def test_reads_outside_requests_use_primary(self):
+        """Test reads outside a request go to the primary"""
+        self.assertEqual(router.db_for_read(Tag), 'default')
+
+    def test_safe_requests_read_from_replica(self):
+        """Test GET requests read from a replica"""
+        self.assertIn(self.serve('GET'), REPLICAS)
+
+    def test_auth_reads_use_primary(self):
+        """Test tokens and users are read from the primary"""
+        self.assertEqual(self.serve('GET', model=Token), 'default')
+        self.assertEqual(
+            self.serve('GET', model=get_user_model()),
+            'default',
+        )
+
+    def test_unsafe_requests_use_primary(self):
+        """Test POST requests read from the primary"""
+        self.assertEqual(self.serve('POST'), 'default')
+
+    def test_pinned_after_write(self):
+        """Test a client reads from the primary after its own write"""
+        self.serve('PATCH')
+
+        self.assertEqual(self.serve('GET'), 'default')
+        self.assertIn(self.serve('GET', token='other'), REPLICAS)
+
+    def test_pin_expires(self):
+        """Test the pin only lasts REPLICA_PIN_SECONDS"""
+        with self.settings(REPLICA_PIN_SECONDS=0):
+            self.serve('POST')
+
+        self.assertIn(self.serve('GET'), REPLICAS)
+
+    def test_write_in_safe_request(self):
+        """Test reads after a write in a GET request use the primary"""
+        self.assertEqual(self.serve('GET', write=True), 'default')
+        self.assertEqual(self.serve('GET'), 'default')
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas(self):
+        """Test requests use the primary when no replica is configured"""
+        self.assertEqual(self.serve('GET'), 'default')
+
+    def test_writes_use_primary(self):
+        """Test writes go to the primary, even for replica rows"""
+        tag = Tag(name='Vegan')
+        tag._state.db = 'replica1'
+
+        self.assertEqual(router.db_for_write(Tag, instance=tag), 'default')
+
+    def test_no_migrations_on_replicas(self):
+        """Test replicas are never migrated"""
+        self.assertFalse(router.allow_migrate('replica1', 'core'))
+        self.assertTrue(router.allow_migrate('default', 'core'))
+
+    def test_executor_calls_share_routing(self):
+        """Test pool threads route as the request awaiting them"""
+        def view(request):
+            view.read_from = async_to_sync(executors.run_in_executor)(
+                'api',
+                router.db_for_read,
+                Tag,
+            )
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(self.factory.get('/api/recipe/tags/'))
+
+        self.assertIn(view.read_from, REPLICAS)
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA_ALIAS])
+class ReplicaReadTests(TransactionTestCase):
+    """
+    Test API reads against the test runner's replica
+
+    A mirror of the default database, so reads routed to it see the rows
+    these tests commit.
+    """
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        # The pin is keyed on the credentials the client sends.
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_list_reads_from_replica(self):
+        """Test listing recipes queries a replica, tokens the primary"""
+        Recipie.objects.create(user=self.user, title='Soup', time_minutes=5,
+                               price=5)
+
+        with CaptureQueriesContext(connections['default']) as primary:
+            res = self.client.get(reverse('recipe:recipie-list'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(len(primary), 1)
+        self.assertIn('authtoken_token', primary[0]['sql'])
+
+    def test_reads_own_writes(self):
+        """Test a client's reads after its write see the write"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        res = self.client.patch(
+            reverse('recipe:tag-detail', args=[tag.id]),
+            {'name': 'Vegetarian'},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connections['default']) as primary:
+            res = self.client.get(reverse('recipe:tag-list'))
+
+        self.assertEqual(res.data['results'][0]['name'], 'Vegetarian')
+        self.assertGreater(len(primary), 0)
+
+    def test_list_not_cached_from_replica_after_change(self):
+        """Test an unpinned replica read just after a write isn't cached
+        or ETagged under the new version"""
+        recipe = Recipie.objects.create(user=self.user, title='Soup',
+                                        time_minutes=5, price=5)
+        res = self.client.get(reverse('recipe:recipie-list'))
+        self.assertIn('ETag', res)
+
+        self.client.patch(
+            reverse('recipe:recipie-detail', args=[recipe.id]),
+            {'title': 'Stew'},
+        )
+        # As from another of the user's devices, which isn't pinned.
+        cache.delete(_pin_key(RequestFactory().get(
+            '/',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}',
+        )))
+        res = self.client.get(reverse('recipe:recipie-list'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', res)
+        self.assertEqual(res.data['results'][0]['title'], 'Stew')
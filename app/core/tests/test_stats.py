@@ -0,0 +1,115 @@
+"""
+Tests for the counters kept by database triggers
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from core.models import Recipie, RecipeStats, Tag
+
+
+class RecipeStatsTests(TestCase):
+    """Test recipe stats follow changes to recipies"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+
+    def create_recipe(self, **params):
+        defaults = {'title': 'Soup', 'time_minutes': 10, 'price': 5}
+        defaults.update(params)
+        return Recipie.objects.create(user=self.user, **defaults)
+
+    def assertStats(self, recipe_count, time_minutes_total, price_buckets):
+        stats = RecipeStats.objects.get(user=self.user)
+        self.assertEqual(
+            (stats.recipe_count, stats.time_minutes_total,
+             stats.price_buckets),
+            (recipe_count, time_minutes_total, price_buckets),
+        )
+
+    def test_create(self):
+        """Test created recipies are counted in their price bucket"""
+        self.create_recipe(price=Decimal('4.99'))
+        Recipie.objects.bulk_create([
+            Recipie(user=self.user, title='Pie', time_minutes=30, price=50),
+            Recipie(user=self.user, title='Tart', time_minutes=20, price=5),
+        ])
+
+        self.assertStats(3, 60, [1, 1, 0, 0, 1])
+
+    def test_update_and_delete(self):
+        """Test changed and deleted recipies move out of the totals"""
+        recipe = self.create_recipe()
+        self.create_recipe(time_minutes=20, price=12)
+
+        recipe.price = 25
+        recipe.time_minutes = 15
+        recipe.save()
+
+        self.assertStats(2, 35, [0, 0, 1, 1, 0])
+
+        Recipie.objects.filter(user=self.user).update(price=1)
+
+        self.assertStats(2, 35, [2, 0, 0, 0, 0])
+
+        recipe.delete()
+
+        self.assertStats(1, 20, [1, 0, 0, 0, 0])
+
+    def test_user_delete(self):
+        """Test deleting a user with recipies leaves no stats behind"""
+        self.create_recipe()
+
+        self.user.delete()
+
+        self.assertFalse(RecipeStats.objects.exists())
+
+    def test_tag_counts(self):
+        """Test tag counts follow links and survive saving the tag"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        other = Tag.objects.create(user=self.user, name='Quick')
+        recipe = self.create_recipe()
+        self.create_recipe().tags.add(tag)
+        recipe.tags.add(tag, other)
+        stale = Tag.objects.get(pk=tag.pk)
+        recipe.tags.remove(other)
+
+        tag.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((tag.recipe_count, other.recipe_count), (2, 0))
+
+        recipe.tags.remove(tag)
+        stale.name = 'Plant based'
+        stale.save()
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.recipe_count, 1)
+
+    def test_rebuild_stats(self):
+        """Test the rebuild command repairs drifted counters"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.create_recipe(price=7).tags.add(tag)
+        self.create_recipe(time_minutes=5, price=70)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE core_recipestats SET recipe_count = 0, '
+                "price_buckets = '{}'"
+            )
+            cursor.execute("SET LOCAL core.rebuilding_stats = 'on'")
+            cursor.execute('UPDATE core_tag SET recipe_count = 5')
+            cursor.execute("SET LOCAL core.rebuilding_stats = 'off'")
+        out = StringIO()
+
+        call_command('rebuild_stats', stdout=out)
+
+        self.assertStats(2, 15, [0, 1, 0, 0, 1])
+        tag.refresh_from_db()
+        self.assertEqual(tag.recipe_count, 1)
+        self.assertIn('corrected 1 tag and 0 ingredient', out.getvalue())
@@ -0,0 +1,32 @@
+"""
+Helpers shared by the API test suites
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(func):
+    """Call func and return the number of queries it ran."""
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return len(context.captured_queries)
+
+
+class QueryCountMixin:
+    """Assertions on how many queries a request runs."""
+
+    def assertConstantQueries(self, request, grow):
+        """
+        Assert request() runs the same number of queries after grow().
+
+        Catches N+1 regressions: a nested field that isn't prefetched
+        adds queries as more rows are returned.
+        """
+        before = count_queries(request)
+        grow()
+        after = count_queries(request)
+        self.assertEqual(
+            before,
+            after,
+            f'Query count grew from {before} to {after}'
+        )
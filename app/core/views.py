@@ -0,0 +1,35 @@
+"""
+Views for operating the API
+"""
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from user import authentication
+from user.authentication import CachedTokenAuthentication
+from . import metrics
+
+
+class MetricsView(APIView):
+    """Request costs per view and token cache use, for this process"""
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SessionAuthentication,
+    ]
+    permission_classes = [IsAdminUser, ]
+
+    def get(self, request):
+        """Return per view costs and token lookup hits and misses"""
+        return Response({
+            'buckets_ms': metrics.BUCKETS_MS,
+            'views': metrics.get_stats(),
+            'token_cache': authentication.get_stats(),
+        })
+
+    def delete(self, request):
+        """Start aggregating afresh"""
+        metrics.reset_stats()
+        authentication.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
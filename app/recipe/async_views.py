@@ -0,0 +1,66 @@
+"""
+Async read views for the Recipie APIs, served under ASGI
+"""
+from asgiref.sync import sync_to_async
+from django.urls import path
+
+from core.executors import ExecutorBusy, busy_response, run_in_executor
+from .views import RecipeiViewSet, TagViewSet, IngredientViewSet
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def _render(view, request, args, kwargs):
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def async_read_view(view):
+    """
+    Wrap a DRF view so GET and HEAD requests run in the "api" pool
+
+    Under ASGI, Django 3.2 runs every sync view on one thread per
+    process, so reads would queue behind each other and behind writes.
+    It has no async ORM either, so the wrapped view, its queries and
+    rendering run on a pool thread while the event loop moves on.
+    Other methods take Django's usual sync path.
+    """
+    render_sync = sync_to_async(_render, thread_sensitive=True)
+
+    async def async_view(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return await render_sync(view, request, args, kwargs)
+        try:
+            return await run_in_executor(
+                'api', _render, view, request, args, kwargs,
+            )
+        except ExecutorBusy:
+            return busy_response()
+
+    async_view.csrf_exempt = True
+    # Name the viewset and its actions, as for the sync view.
+    async_view.cls = view.cls
+    async_view.actions = view.actions
+    return async_view
+
+
+urlpatterns = [
+    path('recipes/', async_read_view(RecipeiViewSet.as_view({
+        'get': 'list',
+        'post': 'create',
+    }))),
+    # int, so the viewset's extra actions such as recipes/export/ fall
+    # through to the sync routes.
+    path('recipes/<int:pk>/', async_read_view(RecipeiViewSet.as_view({
+        'get': 'retrieve',
+        'put': 'update',
+        'patch': 'partial_update',
+        'delete': 'destroy',
+    }))),
+    path('tags/', async_read_view(TagViewSet.as_view({'get': 'list'}))),
+    path('ingredient/', async_read_view(IngredientViewSet.as_view({
+        'get': 'list',
+    }))),
+]
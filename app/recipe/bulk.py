@@ -0,0 +1,72 @@
+"""
+Helpers for bulk import and export of recipies
+"""
+import csv
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.models import Recipie
+
+EXPORT_FIELDS = ('id', 'title', 'description', 'time_minutes', 'price',
+                 'link')
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def related_names(field_name, recipie_ids):
+    """Map each recipie id to the names of its tags or ingredients."""
+    field = Recipie._meta.get_field(field_name)
+    rows = field.remote_field.through.objects.filter(
+        **{f'{field.m2m_column_name()}__in': recipie_ids}
+    ).order_by(
+        field.m2m_reverse_name()
+    ).values_list(
+        field.m2m_column_name(),
+        f'{field.m2m_reverse_field_name()}__name',
+    )
+    names = {}
+    for recipie_id, name in rows:
+        names.setdefault(recipie_id, []).append(name)
+    return names
+
+
+class Echo:
+    """File-like object that returns what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def write_ndjson(rows):
+    """Encode export rows as newline delimited JSON."""
+    for row in rows:
+        row['tags'] = [{'name': name} for name in row['tags']]
+        row['ingredients'] = [{'name': name} for name in row['ingredients']]
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def write_csv(rows):
+    """Encode export rows as CSV with ; separated tags and ingredients."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS + ('tags', 'ingredients'))
+    for row in rows:
+        yield writer.writerow(
+            [row[field] for field in EXPORT_FIELDS] +
+            [';'.join(row['tags']), ';'.join(row['ingredients'])]
+        )
+
+
+EXPORT_WRITERS = {
+    'ndjson': (write_ndjson, 'application/x-ndjson'),
+    'csv': (write_csv, 'text/csv'),
+}
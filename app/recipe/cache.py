@@ -0,0 +1,101 @@
+"""
+Per-user caching of recipie list responses
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+
+from core.models import Recipie
+
+
+def get_cache():
+    return caches[settings.RECIPE_LIST_CACHE]
+
+
+def _version_key(user_id):
+    return f'recipe:version:{user_id}'
+
+
+def get_version(user_id):
+    """Return the version of the user's recipe data."""
+    cache = get_cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so a version lost to eviction can't be
+        # reused while list entries cached under it are still around.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _changed_key(user_id):
+    return f'recipe:changed:{user_id}'
+
+
+def _bump_version(user_id):
+    cache = get_cache()
+    if settings.REPLICA_DATABASES:
+        # Before the bump, so no read sees the new version without it.
+        cache.set(_changed_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.add(_version_key(user_id), time.time_ns(), timeout=None)
+
+
+def invalidate(user):
+    """
+    Invalidate the user's cached recipe lists.
+
+    Bump now so later reads in this request miss, and again after
+    commit so a list cached from pre-commit data isn't kept.
+    """
+    _bump_version(user.id)
+    transaction.on_commit(lambda: _bump_version(user.id))
+
+
+def is_settled(user_id):
+    """
+    Whether a list read now may be cached under the current version.
+
+    Not if it is read from a replica within REPLICA_PIN_SECONDS of the
+    user's last change, as the replica may not have that change yet. The
+    user's other clients aren't pinned to the primary.
+    """
+    if router.db_for_read(Recipie) == DEFAULT_DB_ALIAS:
+        return True
+    return not get_cache().get(_changed_key(user_id))
+
+
+def params_hash(request):
+    """Return a hash of the request's query parameters."""
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    return hashlib.md5(params.encode()).hexdigest()
+
+
+def list_etag(user_id, version, request):
+    """Return the ETag of a list response at a given version."""
+    return f'"{user_id}-{version}-{params_hash(request)}"'
+
+
+def _list_key(user_id, version, request):
+    return f'recipe:list:{user_id}:{version}:{params_hash(request)}'
+
+
+def get_list(user_id, version, request):
+    """Return cached list data or None."""
+    return get_cache().get(_list_key(user_id, version, request))
+
+
+def set_list(user_id, version, request, data):
+    """Cache list data for the user at a given version."""
+    get_cache().set(
+        _list_key(user_id, version, request),
+        data,
+        settings.RECIPE_LIST_CACHE_TIMEOUT,
+    )
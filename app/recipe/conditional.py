@@ -0,0 +1,45 @@
+"""
+Conditional GET support for recipie APIs
+"""
+import hashlib
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Return a quoted ETag for the given state."""
+    state = ':'.join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(state.encode()).hexdigest())
+
+
+def latest(*timestamps):
+    """Return the latest of the datetimes given, ignoring None."""
+    return max((ts for ts in timestamps if ts is not None), default=None)
+
+
+def conditional_response(request, respond, etag, last_modified=None):
+    """
+    Return 304 if the client's copy is current, else call respond().
+
+    last_modified is a datetime. Either way the response carries the
+    validators and is marked private to the requesting user.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=timestamp,
+    )
+    if response is None:
+        response = respond()
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
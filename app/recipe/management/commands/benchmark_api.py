@@ -0,0 +1,200 @@
+"""
+Command to load test the recipe API with data from seed_data
+"""
+import json
+import random
+import subprocess
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core.loadtest import http_request, load, percentile
+from core.models import Recipie
+
+CASES = ('list', 'detail', 'create', 'update', 'token')
+CREATED_TITLE = 'Benchmark recipe'
+
+
+def git_commit():
+    """Return the short hash of the checked out commit, if known."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def case_request(case, user, recipe, password):
+    """Return the method, path, body and expected status of a case."""
+    recipe_id, title = recipe
+    if case == 'list':
+        return 'GET', reverse('recipe:recipie-list'), None, 200
+    if case == 'detail':
+        path = reverse('recipe:recipie-detail', args=[recipe_id])
+        return 'GET', path, None, 200
+    if case == 'create':
+        data = {'title': CREATED_TITLE, 'time_minutes': 5, 'price': '5.00'}
+        return 'POST', reverse('recipe:recipie-list'), data, 201
+    if case == 'update':
+        path = reverse('recipe:recipie-detail', args=[recipe_id])
+        return 'PATCH', path, {'title': title}, 200
+    data = {'email': user.email, 'password': password}
+    return 'POST', reverse('user:token'), data, 200
+
+
+class Command(BaseCommand):
+    """
+    Drive the main recipe API endpoints and report their throughput
+
+    Each request is made as a random seeded user, picked with --seed,
+    so runs against the same seeded data are comparable. Updates write
+    back the title a recipe already has and created recipes are deleted
+    afterwards, leaving the data as it was for the next run.
+    """
+    help = ('Against a running server sharing this database and seeded '
+            'by seed_data, report requests/s and p50/p95/p99 latency of '
+            'the recipe list, detail, create, update and token endpoints.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            required=True,
+            help='Base URL of the server, e.g. http://localhost:8000',
+        )
+        parser.add_argument('--email-prefix', default='seed')
+        parser.add_argument('--password', default='seed-pass-123')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10.0,
+            help='Seconds to load each case for.',
+        )
+        parser.add_argument(
+            '--case',
+            action='append',
+            choices=CASES,
+            help='Case to run, may be repeated. Defaults to all.',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON results of an earlier run to compare against.',
+        )
+
+    def handle(self, *args, **options):
+        users = list(get_user_model().objects.filter(
+            email__startswith=f'{options["email_prefix"]}-',
+            email__endswith='@example.com',
+        ).order_by('id'))
+        if not users:
+            raise CommandError('No seeded users, run seed_data first.')
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(file)['results']
+
+        clients = []
+        for user in users:
+            token, _ = Token.objects.get_or_create(user=user)
+            recipes = list(
+                Recipie.objects.filter(user=user).values_list('id', 'title')
+            )
+            if not recipes:
+                raise CommandError(f'{user.email} has no recipes.')
+            clients.append((user, token.key, recipes))
+
+        rng = random.Random(options['seed'])
+        lock = threading.Lock()
+        base_url = options['url'].rstrip('/')
+
+        def pick():
+            with lock:
+                user, key, recipes = rng.choice(clients)
+                return user, key, rng.choice(recipes)
+
+        results = {}
+        self.stdout.write(
+            f'{"case":<8}{"requests":>10}{"req/s":>10}'
+            f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+            + ('  vs baseline' if baseline else '')
+        )
+        try:
+            for case in options['case'] or CASES:
+                def call(case=case):
+                    user, key, recipe = pick()
+                    method, path, data, expected = case_request(
+                        case, user, recipe, options['password'],
+                    )
+                    status = http_request(
+                        base_url + path,
+                        data,
+                        headers={'Authorization': f'Token {key}'},
+                        method=method,
+                    )
+                    if status != expected:
+                        raise CommandError(
+                            f'{method} {path} returned {status}, '
+                            f'expected {expected}'
+                        )
+
+                timings, elapsed = load(
+                    call,
+                    options['concurrency'],
+                    options['duration'],
+                )
+                timings.sort()
+                results[case] = result = {
+                    'requests': len(timings),
+                    'rps': round(len(timings) / elapsed, 1),
+                    'p50_ms': round(percentile(timings, 0.5) * 1000, 2),
+                    'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+                    'p99_ms': round(percentile(timings, 0.99) * 1000, 2),
+                }
+                self.stdout.write(
+                    f'{case:<8}{result["requests"]:>10}{result["rps"]:>10.1f}'
+                    f'{result["p50_ms"]:>9.1f}{result["p95_ms"]:>9.1f}'
+                    f'{result["p99_ms"]:>9.1f}'
+                    + self.compare(result, (baseline or {}).get(case))
+                )
+        finally:
+            Recipie.objects.filter(
+                user__in=users,
+                title=CREATED_TITLE,
+            ).delete()
+
+        if options['output']:
+            report = {
+                'meta': {
+                    'commit': git_commit(),
+                    'url': base_url,
+                    'concurrency': options['concurrency'],
+                    'duration': options['duration'],
+                    'seed': options['seed'],
+                    'users': len(users),
+                    'recipes': sum(len(recipes) for *_, recipes in clients),
+                },
+                'results': results,
+            }
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+
+    def compare(self, result, baseline):
+        """Return result's throughput and p95 relative to baseline."""
+        if not baseline:
+            return ''
+        return (
+            f'  {result["rps"] / baseline["rps"]:.2f}x req/s, '
+            f'{result["p95_ms"] / baseline["p95_ms"]:.2f}x p95'
+        )
@@ -0,0 +1,94 @@
+"""
+Command to benchmark filtered recipie list queries as data grows
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+
+from core.models import Tag, Ingredient
+from recipe.seeding import Rollback, seed_recipes
+from recipe.views import RecipeiViewSet, TagViewSet
+from .explain_queries import get_list_queryset
+
+
+class Command(BaseCommand):
+    """
+    Time one page of filtered lists at growing recipie counts
+
+    """
+    help = ('Seed a throwaway user at growing sizes and time one page '
+            'of the filtered recipe and tag lists.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000,50000',
+            help='Comma separated recipe counts to measure at.',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        try:
+            with transaction.atomic():
+                self.run(sizes, options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, sizes, options):
+        rng = random.Random(options['seed'])
+        user = get_user_model().objects.create_user(
+            email='benchmark-filters@example.com'
+        )
+        tags = Tag.objects.bulk_create(
+            Tag(user=user, name=f'Tag {i}') for i in range(50)
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(user=user, name=f'Ingredient {i}') for i in range(200)
+        )
+        cases = [
+            ('recipes ?tags=1', RecipeiViewSet,
+             {'tags': str(tags[0].id)}),
+            ('recipes ?tags=1,2&ingredients=3', RecipeiViewSet,
+             {'tags': f'{tags[0].id},{tags[1].id}',
+              'ingredients': str(ingredients[0].id)}),
+            ('tags ?assigned_only=1', TagViewSet, {'assigned_only': '1'}),
+            ('tags ?ordering=-recipe_count', TagViewSet,
+             {'ordering': '-recipe_count'}),
+        ]
+
+        self.stdout.write(
+            f'{"case":<34}{"recipes":>10}{"ms/page":>10}{"x base":>8}'
+        )
+        baselines = {}
+        seeded = 0
+        for size in sizes:
+            seed_recipes(user, tags, ingredients, size - seeded, rng)
+            seeded = size
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            for name, viewset, params in cases:
+                elapsed = self.time_page(
+                    viewset, user, params, options['repeat']
+                )
+                baselines.setdefault(name, elapsed)
+                self.stdout.write(
+                    f'{name:<34}{size:>10}{elapsed * 1000:>10.2f}'
+                    f'{elapsed / baselines[name]:>8.2f}'
+                )
+
+    def time_page(self, viewset, user, params, repeat):
+        """Return the median seconds to load one page with params."""
+        timings = []
+        for _ in range(repeat):
+            queryset = get_list_queryset(viewset, user, params)
+            start = time.perf_counter()
+            list(queryset)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        return timings[len(timings) // 2]
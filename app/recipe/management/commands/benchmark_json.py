@@ -0,0 +1,122 @@
+"""
+Command to benchmark JSON rendering and parsing of recipie payloads
+"""
+import io
+import random
+import time
+from decimal import Decimal
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+def recipe_page(count, rng, raw=False):
+    """
+    Return a list page shaped like the recipe list's response data.
+
+    With raw, prices are Decimals and each recipie has its update time,
+    as in rows that skip the serializer's string conversion.
+    """
+    now = timezone.now()
+    results = []
+    for i in range(count):
+        price = Decimal(rng.randint(100, 9999)) / 100
+        recipe = {
+            'id': i + 1,
+            'title': f'Recipe {i} with crème fraîche',
+            'time_minutes': rng.randint(1, 180),
+            'price': price if raw else str(price),
+            'link': f'https://example.com/recipes/{i}',
+            'tags': [
+                {'id': tag, 'name': f'Tag {tag}'}
+                for tag in rng.sample(range(1, 21), 3)
+            ],
+            'ingredients': [
+                {'id': ingredient, 'name': f'Ingredient {ingredient}'}
+                for ingredient in rng.sample(range(1, 51), 5)
+            ],
+        }
+        if raw:
+            recipe['updated_at'] = now
+        results.append(recipe)
+    return {'next': None, 'previous': None, 'results': results}
+
+
+class Command(BaseCommand):
+    """
+    Compare the stdlib and orjson JSON renderer and parser
+
+    """
+    help = ('Time rendering and parsing recipe list payloads with '
+            "DRF's JSONRenderer and JSONParser against FastJSONRenderer "
+            'and FastJSONParser.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes',
+            default='100,500',
+            help='Comma separated recipes per payload to measure with.',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        repeat = options['repeat']
+        self.stdout.write(
+            f'{"case":<22}{"KB":>8}{"json ms":>10}{"fast ms":>10}'
+            f'{"x faster":>10}'
+        )
+        for count in options['recipes'].split(','):
+            count = int(count)
+            for raw in (False, True):
+                data = recipe_page(count, rng, raw)
+                body = JSONRenderer().render(data)
+                name = f'{count} {"raw " if raw else ""}'
+                self.report(
+                    name + 'render',
+                    len(body),
+                    self.time(lambda: JSONRenderer().render(data), repeat),
+                    self.time(
+                        lambda: FastJSONRenderer().render(data), repeat,
+                    ),
+                )
+                if raw:
+                    # Request bodies hold no Decimal or datetime objects.
+                    continue
+                self.report(
+                    name + 'parse',
+                    len(body),
+                    self.time(lambda: self.parse(JSONParser, body), repeat),
+                    self.time(
+                        lambda: self.parse(FastJSONParser, body), repeat,
+                    ),
+                )
+
+    def parse(self, parser_class, body):
+        return parser_class().parse(
+            io.BytesIO(body),
+            'application/json',
+            {'encoding': 'utf-8'},
+        )
+
+    def report(self, name, size, baseline, elapsed):
+        self.stdout.write(
+            f'{name:<22}{size / 1024:>8.1f}{baseline * 1000:>10.2f}'
+            f'{elapsed * 1000:>10.2f}{baseline / elapsed:>10.2f}'
+        )
+
+    def time(self, func, repeat):
+        """Return the median seconds func takes."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        return timings[len(timings) // 2]
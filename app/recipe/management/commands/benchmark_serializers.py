@@ -0,0 +1,92 @@
+"""
+Command to benchmark recipie list serialization
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from core.models import Recipie, Tag, Ingredient
+from recipe.serializers import RecipeRowSerializer, RecipeSerializer
+from recipe.seeding import Rollback, seed_recipes
+
+
+def serialize_instances(queryset, count):
+    """Serialize count recipies as the list did with RecipeSerializer."""
+    recipes = queryset.prefetch_related('tags', 'ingredients')[:count]
+    return RecipeSerializer(recipes, many=True).data
+
+
+def serialize_rows(queryset, count, fields=None):
+    """Serialize count recipies from .values() rows."""
+    serializer = RecipeRowSerializer(fields)
+    return serializer.serialize(list(serializer.get_rows(queryset)[:count]))
+
+
+class Command(BaseCommand):
+    """
+    Compare objects per second of the list serializers
+
+    """
+    help = ('Seed a throwaway user and time loading and serializing their '
+            'recipies with RecipeSerializer, the .values() row serializer, '
+            'and the row serializer limited to a few fields.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        user = get_user_model().objects.create_user(
+            email='benchmark-serializers@example.com'
+        )
+        tags = Tag.objects.bulk_create(
+            Tag(user=user, name=f'Tag {i}') for i in range(20)
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(user=user, name=f'Ingredient {i}') for i in range(50)
+        )
+        count = options['recipes']
+        seed_recipes(user, tags, ingredients, count, rng)
+        queryset = Recipie.objects.filter(user=user).order_by('-id')
+        cases = [
+            ('RecipeSerializer', lambda: serialize_instances(
+                queryset, count,
+            )),
+            ('RecipeRowSerializer', lambda: serialize_rows(queryset, count)),
+            ('?fields=id,title,price', lambda: serialize_rows(
+                queryset, count, ['id', 'title', 'price'],
+            )),
+        ]
+
+        self.stdout.write(f'{"case":<26}{"objects/s":>12}{"x base":>8}')
+        baseline = None
+        for name, serialize in cases:
+            elapsed = self.time(serialize, options['repeat'])
+            rate = count / elapsed
+            baseline = baseline or rate
+            self.stdout.write(
+                f'{name:<26}{rate:>12.0f}{rate / baseline:>8.2f}'
+            )
+
+    def time(self, serialize, repeat):
+        """Return the median seconds serialize takes."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        return timings[len(timings) // 2]
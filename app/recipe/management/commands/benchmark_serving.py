@@ -0,0 +1,108 @@
+"""
+Command to compare recipe read throughput over WSGI and ASGI
+"""
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core.loadtest import http_request, load, percentile
+from core.models import Recipie, Tag, Ingredient
+from recipe.seeding import seed_recipes
+
+EMAIL = 'benchmark-serving@example.com'
+
+
+class Command(BaseCommand):
+    """
+    Load the recipe read endpoints on WSGI and ASGI servers side by side
+
+    """
+    help = ('Against running WSGI and ASGI servers that share this '
+            'database, report requests/s and p50/p99 latency of the recipe '
+            'read endpoints at matching concurrency.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--wsgi-url',
+            help='Base URL of the WSGI server, e.g. http://localhost:8001',
+        )
+        parser.add_argument(
+            '--asgi-url',
+            help='Base URL of the ASGI server, e.g. http://localhost:8002',
+        )
+        parser.add_argument(
+            '--concurrency',
+            default='1,8,32',
+            help='Comma separated numbers of clients to measure with.',
+        )
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--recipes', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        servers = [
+            (name, options[f'{name}_url'].rstrip('/'))
+            for name in ('wsgi', 'asgi')
+            if options[f'{name}_url']
+        ]
+        if not servers:
+            raise CommandError('Give --wsgi-url, --asgi-url or both.')
+
+        user = get_user_model().objects.create_user(EMAIL)
+        try:
+            self.run(user, servers, options)
+        finally:
+            user.delete()
+
+    def run(self, user, servers, options):
+        rng = random.Random(options['seed'])
+        token = Token.objects.create(user=user)
+        tags = Tag.objects.bulk_create(
+            Tag(user=user, name=f'Tag {i}') for i in range(20)
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(user=user, name=f'Ingredient {i}') for i in range(50)
+        )
+        seed_recipes(user, tags, ingredients, options['recipes'], rng)
+        recipe = Recipie.objects.filter(user=user).first()
+        cases = [
+            ('recipes', reverse('recipe:recipie-list')),
+            ('recipe', reverse('recipe:recipie-detail', args=[recipe.id])),
+            ('tags', reverse('recipe:tag-list')),
+        ]
+        headers = {'Authorization': f'Token {token.key}'}
+        concurrencies = [
+            int(value) for value in options['concurrency'].split(',')
+        ]
+
+        self.stdout.write(
+            f'{"case":<10}{"server":<8}{"clients":>8}{"req/s":>10}'
+            f'{"p50 ms":>9}{"p99 ms":>9}'
+        )
+        for case, path in cases:
+            for concurrency in concurrencies:
+                for server, base_url in servers:
+                    url = base_url + path
+
+                    def fetch():
+                        status = http_request(url, headers=headers)
+                        if status != 200:
+                            raise CommandError(
+                                f'GET {url} failed with {status}'
+                            )
+
+                    timings, elapsed = load(
+                        fetch,
+                        concurrency,
+                        options['duration'],
+                    )
+                    timings.sort()
+                    self.stdout.write(
+                        f'{case:<10}{server:<8}{concurrency:>8}'
+                        f'{len(timings) / elapsed:>10.1f}'
+                        f'{percentile(timings, 0.5) * 1000:>9.1f}'
+                        f'{percentile(timings, 0.99) * 1000:>9.1f}'
+                    )
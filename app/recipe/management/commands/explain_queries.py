@@ -0,0 +1,183 @@
+"""
+Command to EXPLAIN ANALYZE the recipie API querysets
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from core.models import Recipie, Tag, Ingredient
+from recipe.seeding import Rollback
+from recipe.views import RecipeiViewSet, TagViewSet, IngredientViewSet
+
+VIEWSETS = (RecipeiViewSet, TagViewSet, IngredientViewSet)
+
+
+def get_view(viewset_class, user, action, params=None):
+    """Return a viewset instance set up for a GET request."""
+    request = Request(RequestFactory().get('/', params))
+    request.user = user
+    return viewset_class(
+        request=request,
+        action=action,
+        args=(),
+        kwargs={},
+        format_kwarg=None,
+    )
+
+
+def get_list_queryset(viewset_class, user, params=None):
+    """Return the queryset one page of the list action runs."""
+    view = get_view(viewset_class, user, 'list', params)
+    paginator = view.paginator
+    ordering = paginator.ordering
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    return view.get_queryset().order_by(*ordering)[:paginator.page_size + 1]
+
+
+def seed_user(count):
+    """Create a user with count recipies, tags and ingredients."""
+    user = get_user_model().objects.create_user(
+        email='explain-queries@example.com'
+    )
+    tags = Tag.objects.bulk_create(
+        Tag(user=user, name=f'Tag {i}') for i in range(count)
+    )
+    ingredients = Ingredient.objects.bulk_create(
+        Ingredient(user=user, name=f'Ingredient {i}') for i in range(count)
+    )
+    recipes = Recipie.objects.bulk_create(
+        Recipie(
+            user=user,
+            title=f'Recipe {i}',
+            time_minutes=i % 120,
+            price=Decimal(i % 100),
+        )
+        for i in range(count)
+    )
+    Recipie.tags.through.objects.bulk_create(
+        Recipie.tags.through(recipie_id=recipe.id, tag_id=tag.id)
+        for recipe, tag in zip(recipes, tags)
+    )
+    Recipie.ingredients.through.objects.bulk_create(
+        Recipie.ingredients.through(
+            recipie_id=recipe.id,
+            ingredient_id=ingredient.id,
+        )
+        for recipe, ingredient in zip(recipes, ingredients)
+    )
+    with connection.cursor() as cursor:
+        for model in (Recipie, Tag, Ingredient, Recipie.tags.through,
+                      Recipie.ingredients.through):
+            cursor.execute(f'ANALYZE {model._meta.db_table}')
+    return user
+
+
+class Command(BaseCommand):
+    """
+    Print query plans for each recipie API list queryset
+
+    """
+    help = 'EXPLAIN ANALYZE the list querysets of the recipe API viewsets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email',
+            help='User to explain for, defaults to the one with most recipes.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Explain for a throwaway user with this many recipes.',
+        )
+        parser.add_argument(
+            '--disable-seqscan',
+            action='store_true',
+            help='Penalise sequential scans so any left have no usable index.',
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan',
+            action='store_true',
+            help='Exit with an error if any plan scans a table sequentially.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['disable_seqscan']:
+                    with connection.cursor() as cursor:
+                        cursor.execute('SET LOCAL enable_seqscan = off')
+                seq_scans = self.explain_all(options)
+                if options['seed']:
+                    raise Rollback
+        except Rollback:
+            pass
+
+        if seq_scans and options['fail_on_seq_scan']:
+            raise CommandError(
+                'Sequential scans in: ' + ', '.join(seq_scans)
+            )
+
+    def explain_all(self, options):
+        user = self.get_user(options)
+        querysets = [
+            (viewset.__name__, get_list_queryset(viewset, user))
+            for viewset in VIEWSETS
+        ]
+        recipe_ids = list(
+            Recipie.objects.filter(user=user).values_list('id', flat=True)
+            .order_by('-id')[:100]
+        )
+        tag_id = Tag.objects.filter(user=user).values_list('id', flat=True)
+        querysets += [
+            ('Recipe tags prefetch', Tag.objects.filter(
+                recipie__id__in=recipe_ids
+            )),
+            ('Recipe ingredients prefetch', Ingredient.objects.filter(
+                recipie__id__in=recipe_ids
+            )),
+            ('Recipes by tag', Recipie.tags.through.objects.filter(
+                tag_id=tag_id.first()
+            )),
+        ]
+        querysets += [
+            (f'{viewset.__name__} most used', get_list_queryset(
+                viewset, user, {'ordering': '-recipe_count'}
+            ))
+            for viewset in (TagViewSet, IngredientViewSet)
+        ]
+        querysets += [
+            (f'{viewset.__name__} suggest', get_view(
+                viewset, user, 'suggest'
+            ).get_suggest_queryset('12', viewset.suggest_limit))
+            for viewset in (TagViewSet, IngredientViewSet)
+        ]
+
+        seq_scans = []
+        for name, queryset in querysets:
+            plan = queryset.explain(analyze=True)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            if 'Seq Scan on core_' in plan:
+                seq_scans.append(name)
+                self.stdout.write(self.style.WARNING('Sequential scan!'))
+            self.stdout.write('')
+        return seq_scans
+
+    def get_user(self, options):
+        if options['seed']:
+            return seed_user(options['seed'])
+        users = get_user_model().objects.all()
+        if options['email']:
+            users = users.filter(email=options['email'])
+        user = users.annotate(
+            recipe_count=Count('recipie')
+        ).order_by('-recipe_count').first()
+        if user is None:
+            raise CommandError('No user to explain queries for.')
+        return user
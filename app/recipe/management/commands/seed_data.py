@@ -0,0 +1,86 @@
+"""
+Command to fill the database with realistic recipie data at scale
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from recipe.seeding import seed_users
+
+
+class Command(BaseCommand):
+    """
+    Bulk insert users with recipies, tags and ingredients
+
+    Every user gets the same numbers of tags, ingredients and recipies.
+    Tags follow a Zipf distribution, so a few are on most recipies, as
+    in real data. The same --seed always generates the same data.
+    """
+    help = ('Bulk insert N users with M recipes each, a Zipfian tag '
+            'distribution and ingredients, for benchmark_api to load.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=100,
+            help='Recipes per user.',
+        )
+        parser.add_argument('--tags', type=int, default=30)
+        parser.add_argument('--ingredients', type=int, default=100)
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Exponent of the tag distribution, higher is more skewed.',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--email-prefix',
+            default='seed',
+            help='Users are <prefix>-<n>@example.com.',
+        )
+        parser.add_argument('--password', default='seed-pass-123')
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete users seeded earlier with the prefix first.',
+        )
+
+    def handle(self, *args, **options):
+        if options['tags'] < 1 or options['ingredients'] < 1:
+            raise CommandError('Give at least one tag and ingredient.')
+        existing = get_user_model().objects.filter(
+            email__startswith=f'{options["email_prefix"]}-',
+            email__endswith='@example.com',
+        )
+        start = time.perf_counter()
+        with transaction.atomic():
+            if existing.exists():
+                if not options['clear']:
+                    raise CommandError(
+                        'Seeded users already exist, give --clear to '
+                        'replace them.'
+                    )
+                existing.delete()
+            users = seed_users(
+                options['users'],
+                options['recipes'],
+                options['tags'],
+                options['ingredients'],
+                random.Random(options['seed']),
+                options['email_prefix'],
+                options['password'],
+                options['zipf'],
+            )
+        self.stdout.write(
+            f'Seeded {len(users)} users with '
+            f'{len(users) * options["recipes"]} recipes, '
+            f'{len(users) * options["tags"]} tags and '
+            f'{len(users) * options["ingredients"]} ingredients in '
+            f'{time.perf_counter() - start:.1f} s'
+        )
@@ -0,0 +1,102 @@
+"""
+Pagination for recipie APIs
+"""
+import json
+from base64 import b64decode, b64encode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination over recipies, newest first."""
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset pagination on a key, then id, only linking forwards.
+
+    CursorPagination seeks on the first ordering field only and skips
+    ties with an offset, which degrades when many rows share a key.
+    This seeks on (key, id) instead. Subclasses set ordering to the two
+    fields and key_type to the type of the key. Cursors hold the pair
+    as JSON, so any key text round trips.
+    """
+    key_type = int
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_position(request)
+        if position is not None:
+            queryset = queryset.filter(self.seek(*position))
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        self.has_next = len(results) > self.page_size
+        return self.page
+
+    def seek(self, key, pk):
+        """Return the condition for rows ordered after (key, pk)"""
+        (key_name, key_op), (pk_name, pk_op) = [
+            (field.lstrip('-'), 'lt' if field.startswith('-') else 'gt')
+            for field in self.ordering
+        ]
+        return (
+            Q(**{f'{key_name}__{key_op}': key}) |
+            Q(**{key_name: key, f'{pk_name}__{pk_op}': pk})
+        )
+
+    def decode_position(self, request):
+        """Return the (key, id) encoded in the cursor param, if any"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            key, pk = json.loads(b64decode(encoded.encode()))
+            return self.key_type(key), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        key_name, pk_name = [field.lstrip('-') for field in self.ordering]
+        last = self.page[-1]
+        if isinstance(last, dict):
+            key, pk = last[key_name], last[pk_name]
+        else:
+            key, pk = getattr(last, key_name), getattr(last, pk_name)
+        encoded = b64encode(json.dumps([key, pk]).encode()).decode()
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            encoded,
+        )
+
+    def get_previous_link(self):
+        return None
+
+
+class SearchCursorPagination(KeysetCursorPagination):
+    """Keyset pagination over search results by rank, then newest first."""
+    ordering = ('-rank', '-id')
+    key_type = float
+
+
+class PopularCursorPagination(KeysetCursorPagination):
+    """Keyset pagination over tags and ingredients, most used first."""
+    ordering = ('-recipe_count', 'id')
+
+
+class NameCursorPagination(KeysetCursorPagination):
+    """Keyset pagination over tags and ingredients by name."""
+    ordering = ('-name', 'id')
+    key_type = str
@@ -0,0 +1,32 @@
+"""
+Parsers for recipie APIs
+"""
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse newline delimited JSON lazily, one line at a time.
+
+    Yields (line_number, data) pairs without reading the whole body.
+    A line that isn't valid JSON yields a ParseError as its data so
+    the caller can report it and carry on.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        return self._lines(stream)
+
+    def _lines(self, stream):
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as exc:
+                yield number, ParseError(f'Invalid JSON: {exc}')
@@ -0,0 +1,146 @@
+"""
+Generate recipie data at scale for benchmarks
+"""
+import itertools
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from core.models import Recipie, Tag, Ingredient
+
+BATCH_SIZE = 1000
+
+ADJECTIVES = ('Spicy', 'Creamy', 'Smoky', 'Crispy', 'Quick', 'Rustic',
+              'Zesty', 'Hearty', 'Sticky', 'Herby')
+DISHES = ('lentil soup', 'chicken curry', 'mushroom risotto', 'fish tacos',
+          'vegetable stir fry', 'beef stew', 'tomato pasta', 'bean chilli',
+          'pumpkin pie', 'lemon tart', 'noodle salad', 'flatbread')
+TAG_NAMES = ('Vegan', 'Vegetarian', 'Quick', 'Dinner', 'Lunch', 'Breakfast',
+             'Dessert', 'Spicy', 'Gluten free', 'Italian', 'Mexican',
+             'Indian', 'Thai', 'Comfort food', 'Healthy', 'Baking')
+INGREDIENT_NAMES = ('Salt', 'Pepper', 'Olive oil', 'Garlic', 'Onion',
+                    'Tomato', 'Butter', 'Flour', 'Sugar', 'Egg', 'Milk',
+                    'Lemon', 'Rice', 'Chickpeas', 'Lentils', 'Chicken',
+                    'Beef', 'Cumin', 'Paprika', 'Basil', 'Ginger', 'Chilli',
+                    'Potato', 'Carrot', 'Spinach', 'Cheese', 'Cream')
+
+
+class Rollback(Exception):
+    """Raised inside an atomic block to discard the rows seeded in it."""
+
+
+def names(vocabulary, count):
+    """Return count distinct names, numbering repeats of the vocabulary."""
+    result = []
+    for round_number in itertools.count(1):
+        for name in vocabulary:
+            if len(result) == count:
+                return result
+            result.append(name if round_number == 1 else
+                          f'{name} {round_number}')
+
+
+def zipf_cum_weights(count, exponent):
+    """Return cumulative Zipf weights for ranks 1 to count."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def sample(rng, population, k, cum_weights=None):
+    """Return k distinct items, chosen by cum_weights if given."""
+    if cum_weights is None:
+        return rng.sample(population, k)
+    chosen = {}
+    while len(chosen) < k:
+        item = rng.choices(population, cum_weights=cum_weights)[0]
+        chosen[id(item)] = item
+    return list(chosen.values())
+
+
+def seed_recipes(user, tags, ingredients, count, rng, tags_per_recipe=3,
+                 ingredients_per_recipe=5, tag_weights=None):
+    """
+    Add count recipies to user, each with a few tags and ingredients.
+
+    Tags are picked uniformly, or by tag_weights, cumulative weights
+    as from zipf_cum_weights, so the first tags are the most used.
+    """
+    recipes = Recipie.objects.bulk_create(
+        (
+            Recipie(
+                user=user,
+                title=f'{rng.choice(ADJECTIVES)} {rng.choice(DISHES)} {i}',
+                time_minutes=rng.randint(1, 180),
+                price=Decimal(rng.randint(100, 9999)) / 100,
+            )
+            for i in range(count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Recipie.tags.through.objects.bulk_create(
+        (
+            Recipie.tags.through(recipie_id=recipe.id, tag_id=tag.id)
+            for recipe in recipes
+            for tag in sample(rng, tags, tags_per_recipe, tag_weights)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Recipie.ingredients.through.objects.bulk_create(
+        (
+            Recipie.ingredients.through(
+                recipie_id=recipe.id,
+                ingredient_id=ingredient.id,
+            )
+            for recipe in recipes
+            for ingredient in rng.sample(ingredients, ingredients_per_recipe)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return recipes
+
+
+def seed_email(prefix, number):
+    """Return the email of a seeded user."""
+    return f'{prefix}-{number}@example.com'
+
+
+def seed_users(count, recipes, tags, ingredients, rng, email_prefix,
+               password, exponent):
+    """
+    Create count users, each with recipes recipies and its own tags.
+
+    Each user's tags are used in a Zipf distribution with exponent.
+    All users share password, hashed once.
+    """
+    hashed = make_password(password)
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(
+            email=seed_email(email_prefix, number),
+            name=f'Seed user {number}',
+            password=hashed,
+        )
+        for number in range(count)
+    )
+    tag_weights = zipf_cum_weights(tags, exponent)
+    tag_names = names(TAG_NAMES, tags)
+    ingredient_names = names(INGREDIENT_NAMES, ingredients)
+    for user in users:
+        user_tags = Tag.objects.bulk_create(
+            Tag(user=user, name=name) for name in tag_names
+        )
+        user_ingredients = Ingredient.objects.bulk_create(
+            Ingredient(user=user, name=name) for name in ingredient_names
+        )
+        seed_recipes(
+            user,
+            user_tags,
+            user_ingredients,
+            recipes,
+            rng,
+            tags_per_recipe=min(3, tags),
+            ingredients_per_recipe=min(5, ingredients),
+            tag_weights=tag_weights,
+        )
+    return users
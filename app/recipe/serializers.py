@@ -1,11 +1,12 @@
 """
 Serializers for recipie APIs
 """
+from core.metrics import TimedSerializerMixin, timer
 from core.models import Recipie, Tag, Ingredient
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import DecimalField, ModelSerializer
 
 
-class TagSerializer(ModelSerializer):
+class TagSerializer(TimedSerializerMixin, ModelSerializer):
     """Serializer for Tags"""
 
     class Meta:
@@ -14,7 +15,7 @@ class TagSerializer(ModelSerializer):
         read_only_fields = ['id', ]
 
 
-class IngredientSerializer(ModelSerializer):
+class IngredientSerializer(TimedSerializerMixin, ModelSerializer):
     """Serializer for Ingredient model"""
     class Meta:
         model = Ingredient
@@ -22,38 +23,95 @@ class IngredientSerializer(ModelSerializer):
         read_only_fields = ['id', ]
 
 
-class RecipeSerializer(ModelSerializer):
+class TagCountSerializer(TagSerializer):
+    """Serializer for Tags with the number of recipies using them"""
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ['recipe_count']
+        read_only_fields = ['id', 'recipe_count']
+
+
+class IngredientCountSerializer(IngredientSerializer):
+    """Serializer for Ingredients with the number of recipies using them"""
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ['recipe_count']
+        read_only_fields = ['id', 'recipe_count']
+
+
+def get_or_create_related(user, field_name, recipie_items):
+    """
+    Get or create tags or ingredients by name and add them to recipies.
+
+    recipie_items is a list of (recipie, [{'name': ...}, ...]) pairs.
+    Runs one SELECT of existing names, one bulk INSERT of missing ones
+    and one bulk INSERT into the through table, whatever the count.
+    """
+    field = Recipie._meta.get_field(field_name)
+    model = field.related_model
+    names = {
+        item['name'] for _, items in recipie_items for item in items
+    }
+    if not names:
+        return
+
+    by_name = {}
+    existing = model.objects.filter(user=user, name__in=names).order_by('id')
+    for obj in existing:
+        by_name.setdefault(obj.name, obj)
+    missing = [
+        model(user=user, name=name)
+        for name in sorted(names - by_name.keys())
+    ]
+    for obj in model.objects.bulk_create(missing):
+        by_name[obj.name] = obj
+
+    through = field.remote_field.through
+    links = []
+    for recipie, items in recipie_items:
+        related_ids = {by_name[item['name']].id for item in items}
+        links += [
+            through(**{
+                field.m2m_column_name(): recipie.id,
+                field.m2m_reverse_name(): related_id,
+            })
+            for related_id in sorted(related_ids)
+        ]
+    through.objects.bulk_create(links)
+
+
+class RecipeSerializer(TimedSerializerMixin, ModelSerializer):
     """Serializer for recipies"""
     tags = TagSerializer(many=True, required=False)
+    ingredients = IngredientSerializer(many=True, required=False)
 
     class Meta:
         model = Recipie
-        fields = ('id', 'title', 'time_minutes', 'price', 'link', 'tags')
+        fields = ('id', 'title', 'time_minutes', 'price', 'link', 'tags',
+                  'ingredients')
         read_only_fields = ('id',)
 
-    def _get_or_create_tags(self, tags, recipie):
-        """Handle getting or creating tags"""
+    def _get_or_create_related(self, field_name, items, recipie):
+        """Handle getting or creating tags or ingredients"""
         auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
-            recipie.tags.add(tag_obj)
+        get_or_create_related(auth_user, field_name, [(recipie, items)])
 
     def create(self, validated_data):
         """Create a recipe."""
         tags = validated_data.pop('tags', [])
+        ingredients = validated_data.pop('ingredients', [])
         recipe = Recipie.objects.create(**validated_data)
-        self._get_or_create_tags(tags, recipe)
+        self._get_or_create_related('tags', tags, recipe)
+        self._get_or_create_related('ingredients', ingredients, recipe)
         return recipe
 
     def update(self, instance, validated_data):
         """Update recipe."""
-        tags = validated_data.pop('tags', None)
-        if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+        for field_name in ('tags', 'ingredients'):
+            items = validated_data.pop(field_name, None)
+            if items is not None:
+                getattr(instance, field_name).clear()
+                self._get_or_create_related(field_name, items, instance)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
@@ -65,3 +123,79 @@ class RecipieDetailSerializer(RecipeSerializer):
 
     class Meta(RecipeSerializer.Meta):
         fields = RecipeSerializer.Meta.fields + ('description',)
+
+
+def related_items(field_name, recipie_ids):
+    """Map each recipie id to the id and name of its tags or ingredients."""
+    field = Recipie._meta.get_field(field_name)
+    related = field.m2m_reverse_field_name()
+    rows = field.remote_field.through.objects.filter(
+        **{f'{field.m2m_column_name()}__in': recipie_ids}
+    ).order_by(
+        field.m2m_reverse_name()
+    ).values_list(
+        field.m2m_column_name(),
+        f'{related}__id',
+        f'{related}__name',
+    )
+    items = {}
+    for recipie_id, item_id, name in rows:
+        items.setdefault(recipie_id, []).append({'id': item_id, 'name': name})
+    return items
+
+
+class RecipeRowSerializer:
+    """
+    Read-only serializer for recipie list pages, from .values() rows
+
+    Gives the same output as RecipeSerializer, optionally limited to
+    some of its fields, without building model instances or running
+    each field's machinery per object. Tags and ingredients of a page
+    take one query each, and only when asked for.
+    """
+    related_fields = ('tags', 'ingredients')
+
+    def __init__(self, fields=None):
+        self.fields = fields or RecipeSerializer.Meta.fields
+        self.columns = [
+            name for name in self.fields if name not in self.related_fields
+        ]
+        declared = RecipeSerializer().fields
+        # Decimals render as strings as DecimalField does, the rest as read.
+        self.converters = {
+            name: declared[name].to_representation
+            for name in self.columns
+            if isinstance(declared[name], DecimalField)
+        }
+
+    def get_rows(self, queryset):
+        """Return queryset as rows, keeping ids and annotations to page on."""
+        names = dict.fromkeys(
+            ['id', *queryset.query.annotations, *self.columns]
+        )
+        return queryset.prefetch_related(None).values(*names)
+
+    def serialize(self, rows):
+        """Return the representation of each row in a page."""
+        with timer('serialize'):
+            return self._serialize(rows)
+
+    def _serialize(self, rows):
+        ids = [row['id'] for row in rows]
+        related = {
+            name: related_items(name, ids)
+            for name in self.related_fields
+            if name in self.fields
+        }
+        data = []
+        for row in rows:
+            item = {}
+            for name in self.fields:
+                if name in related:
+                    item[name] = related[name].get(row['id'], [])
+                elif name in self.converters:
+                    item[name] = self.converters[name](row[name])
+                else:
+                    item[name] = row[name]
+            data.append(item)
+        return data
@@ -0,0 +1,190 @@
+"""
+Tests for the async recipe read views served under ASGI
+"""
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core.asgi import get_asgi_application
+from core.models import Recipie, Tag
+from recipe.views import RecipeiViewSet
+
+RECIPES_URL = reverse('recipe:recipie-list')
+TAGS_URL = reverse('recipe:tag-list')
+EXPORT_URL = reverse('recipe:recipie-export')
+IMPORT_URL = reverse('recipe:recipie-import-recipes')
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL"""
+    return reverse('recipe:recipie-detail', args=[recipe_id])
+
+
+@override_settings(ROOT_URLCONF='app.asgi_urls')
+class AsyncRecipeViewTests(TransactionTestCase):
+    """
+    Test recipe reads through the ASGI handler.
+
+    The views query from pool threads with their own connections, so
+    test data must be committed for them to see it.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.recipe = Recipie.objects.create(
+            user=self.user,
+            title='Sample recipe',
+            time_minutes=5,
+            price=Decimal('5.50'),
+        )
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+    def headers(self, **extra):
+        """Return headers authenticating as the user."""
+        # Django 3.2's AsyncClient takes header names, not HTTP_ keys.
+        extra['authorization'] = f'Token {self.token.key}'
+        return {
+            name.replace('_', '-'): value for name, value in extra.items()
+        }
+
+    async def test_list_recipes(self):
+        """Test listing recipes through the async view"""
+        res = await self.async_client.get(RECIPES_URL, **self.headers())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in res.json()['results']],
+            [self.recipe.id],
+        )
+
+    async def test_pool_queries_timed(self):
+        """Test queries run on pool threads count towards Server-Timing"""
+        res = await self.async_client.get(RECIPES_URL, **self.headers())
+
+        db = res['Server-Timing'].split(', ')[0]
+        self.assertNotIn('"0 queries"', db)
+
+    async def test_retrieve_not_modified(self):
+        """Test retrieve answers 304 for a current ETag"""
+        res = await self.async_client.get(
+            detail_url(self.recipe.id),
+            **self.headers(),
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['title'], 'Sample recipe')
+
+        res = await self.async_client.get(
+            detail_url(self.recipe.id),
+            **self.headers(if_none_match=res['ETag']),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_list_tags(self):
+        """Test listing tags through the async view"""
+        res = await self.async_client.get(TAGS_URL, **self.headers())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['results'][0]['name'], 'Vegan')
+
+    async def test_auth_required(self):
+        """Test the async views still require authentication"""
+        res = await self.async_client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_writes_take_sync_path(self):
+        """Test writes on an async route still reach the viewset"""
+        res = await self.async_client.patch(
+            detail_url(self.recipe.id),
+            json.dumps({'title': 'New title'}),
+            content_type='application/json',
+            **self.headers(),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['title'], 'New title')
+
+    async def request(self, method, path, body=b'', headers=()):
+        """Send a request through the ASGI application, return the
+        response start message and the body."""
+        communicator = ApplicationCommunicator(get_asgi_application(), {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': b'',
+            'headers': [
+                (b'authorization', f'Token {self.token.key}'.encode()),
+                (b'content-length', str(len(body)).encode()),
+                *headers,
+            ],
+        })
+        await communicator.send_input({
+            'type': 'http.request',
+            'body': body,
+        })
+        start = await communicator.receive_output(timeout=10)
+        content = b''
+        while True:
+            message = await communicator.receive_output(timeout=10)
+            content += message.get('body', b'')
+            if not message.get('more_body'):
+                return start, content
+
+    async def test_export(self):
+        """Test export streams every row through the ASGI handler"""
+        for number in range(3):
+            await sync_to_async(Recipie.objects.create)(
+                user=self.user,
+                title=f'Recipe {number}',
+                time_minutes=5,
+                price=Decimal('1.00'),
+            )
+
+        with patch.object(RecipeiViewSet, 'export_chunk_size', 2):
+            start, content = await self.request('GET', EXPORT_URL)
+
+        self.assertEqual(start['status'], status.HTTP_200_OK)
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            [row['title'] for row in rows],
+            ['Sample recipe', 'Recipe 0', 'Recipe 1', 'Recipe 2'],
+        )
+        self.assertEqual(rows[0]['tags'], [{'name': 'Vegan'}])
+
+    async def test_import(self):
+        """Test import reaches the viewset's import action"""
+        # The test client's request body can't be read line by line as
+        # NDJSONParser does, so this goes through the ASGI handler.
+        body = json.dumps({'title': 'Imported', 'time_minutes': 5,
+                           'price': '2.00'}).encode()
+        start, content = await self.request(
+            'POST',
+            IMPORT_URL,
+            body,
+            [(b'content-type', b'application/x-ndjson')],
+        )
+
+        self.assertEqual(start['status'], status.HTTP_200_OK)
+        self.assertEqual(json.loads(content)['created'], 1)
+
+    @override_settings(EXECUTORS={'api': {'WORKERS': 1, 'MAX_PENDING': 0}})
+    async def test_sheds_load(self):
+        """Test reads beyond the pending limit are refused with 503"""
+        res = await self.async_client.get(RECIPES_URL, **self.headers())
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,245 @@
+"""
+Tests for recipe management commands
+"""
+import json
+import os
+import random
+import tempfile
+from collections import Counter
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase
+
+from core.models import Recipie, Tag
+from recipe.seeding import sample, zipf_cum_weights
+
+
+class ExplainQueriesCommandTests(TestCase):
+    """Test the explain_queries command"""
+
+    def test_explain_seeded_user(self):
+        """Test a plan is printed per viewset and seeded rows are removed"""
+        out = StringIO()
+
+        call_command('explain_queries', '--seed', '50', stdout=out)
+
+        for name in ('RecipeiViewSet', 'TagViewSet', 'IngredientViewSet'):
+            self.assertIn(name, out.getvalue())
+        self.assertFalse(Recipie.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_list_querysets_have_indexes(self):
+        """Test no list or prefetch query needs a sequential scan"""
+        out = StringIO()
+
+        call_command(
+            'explain_queries',
+            '--seed', '50',
+            '--disable-seqscan',
+            '--fail-on-seq-scan',
+            stdout=out,
+        )
+
+        self.assertNotIn('Sequential scan!', out.getvalue())
+
+    def test_explain_without_users_errors(self):
+        """Test the command errors when there is nobody to explain for"""
+        with self.assertRaises(CommandError):
+            call_command('explain_queries', stdout=StringIO())
+
+
+class BenchmarkFiltersCommandTests(TestCase):
+    """Test the benchmark_filters command"""
+
+    def test_benchmark_reports_each_size(self):
+        """Test a row is printed per case and size and nothing is kept"""
+        out = StringIO()
+
+        call_command(
+            'benchmark_filters',
+            '--sizes', '20,40',
+            '--repeat', '1',
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1 + 4 * 2)
+        self.assertFalse(Recipie.objects.exists())
+
+
+class BenchmarkSerializersCommandTests(TestCase):
+    """Test the benchmark_serializers command"""
+
+    def test_benchmark_reports_each_serializer(self):
+        """Test a row is printed per serializer and nothing is kept"""
+        out = StringIO()
+
+        call_command(
+            'benchmark_serializers',
+            '--recipes', '20',
+            '--repeat', '1',
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1 + 3)
+        self.assertTrue(lines[1].startswith('RecipeSerializer'))
+        self.assertFalse(Recipie.objects.exists())
+
+
+class BenchmarkJSONCommandTests(SimpleTestCase):
+    """Test the benchmark_json command"""
+
+    def test_benchmark_reports_each_case(self):
+        """Test render and parse rows are printed per payload size"""
+        out = StringIO()
+
+        call_command(
+            'benchmark_json',
+            '--recipes', '5,10',
+            '--repeat', '1',
+            stdout=out,
+        )
+
+        cases = [
+            ' '.join(line.split()[:-4])
+            for line in out.getvalue().splitlines()[1:]
+        ]
+        self.assertEqual(cases, [
+            '5 render', '5 parse', '5 raw render',
+            '10 render', '10 parse', '10 raw render',
+        ])
+
+
+class BenchmarkServingCommandTests(LiveServerTestCase):
+    """Test the benchmark_serving command against a live server"""
+
+    def test_benchmark_reports_each_case(self):
+        """Test a row is printed per case and concurrency"""
+        out = StringIO()
+
+        call_command(
+            'benchmark_serving',
+            '--wsgi-url', self.live_server_url,
+            '--concurrency', '1,2',
+            '--duration', '0.1',
+            '--recipes', '10',
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1 + 3 * 2)
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_benchmark_requires_a_server(self):
+        """Test the command errors without a server to load"""
+        with self.assertRaises(CommandError):
+            call_command('benchmark_serving', stdout=StringIO())
+
+
+class SeedDataCommandTests(TestCase):
+    """Test the seed_data command"""
+
+    def seed(self, *args):
+        call_command(
+            'seed_data',
+            '--users', '2',
+            '--recipes', '20',
+            '--tags', '5',
+            '--ingredients', '8',
+            *args,
+            stdout=StringIO(),
+        )
+
+    def test_seeds_users_and_recipes(self):
+        """Test each user gets their recipes, tags and ingredients"""
+        self.seed()
+
+        users = get_user_model().objects.order_by('email')
+        self.assertEqual(
+            [user.email for user in users],
+            ['seed-0@example.com', 'seed-1@example.com'],
+        )
+        self.assertTrue(users[0].check_password('seed-pass-123'))
+        for user in users:
+            self.assertEqual(user.recipie_set.count(), 20)
+            self.assertEqual(user.tag_set.count(), 5)
+            self.assertEqual(user.ingredient_set.count(), 8)
+        self.assertEqual(
+            Recipie.ingredients.through.objects.count(),
+            2 * 20 * 5,
+        )
+
+    def test_zipf_tags(self):
+        """Test the first tags are used the most"""
+        rng = random.Random(1)
+        counts = Counter()
+        for _ in range(2000):
+            counts.update(sample(rng, range(10), 1, zipf_cum_weights(10, 1.1)))
+
+        self.assertGreater(counts[0], 2 * counts[1])
+        self.assertGreater(counts[1], counts[9])
+
+    def test_refuses_to_duplicate(self):
+        """Test seeding twice requires --clear, which replaces the data"""
+        self.seed()
+
+        with self.assertRaises(CommandError):
+            self.seed()
+
+        self.seed('--clear')
+
+        self.assertEqual(get_user_model().objects.count(), 2)
+        self.assertEqual(Tag.objects.count(), 10)
+
+
+class BenchmarkApiCommandTests(LiveServerTestCase):
+    """Test the benchmark_api command against a live server"""
+
+    def test_benchmark_reports_each_case(self):
+        """Test every case is run and written out as JSON"""
+        call_command(
+            'seed_data',
+            '--users', '2',
+            '--recipes', '3',
+            '--tags', '3',
+            '--ingredients', '5',
+            stdout=StringIO(),
+        )
+        out = StringIO()
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        call_command(
+            'benchmark_api',
+            '--url', self.live_server_url,
+            '--concurrency', '1',
+            '--duration', '0.05',
+            '--output', path,
+            stdout=out,
+        )
+
+        with open(path) as file:
+            report = json.load(file)
+        self.assertEqual(
+            list(report['results']),
+            ['list', 'detail', 'create', 'update', 'token'],
+        )
+        self.assertEqual(report['meta']['recipes'], 6)
+        for result in report['results'].values():
+            self.assertGreater(result['requests'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertEqual(len(out.getvalue().splitlines()), 1 + 5)
+        self.assertEqual(Recipie.objects.count(), 6)
+
+    def test_benchmark_requires_seeded_data(self):
+        """Test the command errors before seed_data has run"""
+        with self.assertRaises(CommandError):
+            call_command(
+                'benchmark_api',
+                '--url', self.live_server_url,
+                stdout=StringIO(),
+            )
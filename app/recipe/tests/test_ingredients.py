@@ -1,4 +1,6 @@
 """Test for Ingredients API."""
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.test import TestCase
@@ -6,10 +8,11 @@ from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Ingredient
-from recipe.serializers import IngredientSerializer
+from core.models import Ingredient, Recipie
+from recipe.serializers import IngredientCountSerializer
 
 INGREDIENTS_URL = reverse('recipe:ingredient-list')
+INGREDIENTS_SUGGEST_URL = reverse('recipe:ingredient-suggest')
 
 
 def create_user(email="user@example.com", password="testpass123"):
@@ -47,12 +50,12 @@ class PrivateIngredientsTest(TestCase):
         Ingredient.objects.create(name='second', user=self.user)
 
         ingredients = Ingredient.objects.filter(user=self.user).order_by('-name')
-        serializer = IngredientSerializer(ingredients, many=True)
+        serializer = IngredientCountSerializer(ingredients, many=True)
 
         res = self.client.get(INGREDIENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         Ingredient.objects.create(name='first', user=self.user)
@@ -63,7 +66,7 @@ class PrivateIngredientsTest(TestCase):
         res = self.client.get(INGREDIENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 2)
+        self.assertEqual(len(res.data['results']), 2)
 
     def test_update_ingredients(self):
         ingredient = Ingredient.objects.create(name='first', user=self.user)
@@ -77,4 +80,75 @@ class PrivateIngredientsTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         ingredient.refresh_from_db()
         self.assertEqual(res.data['name'], payload['name'])
-        self.assertEqual(ingredient.name, payload['name'])
\ No newline at end of file
+        self.assertEqual(ingredient.name, payload['name'])
+
+    def test_ingredients_list_not_modified(self):
+        """Test the ingredient list returns 304 until one is deleted"""
+        ingredient = Ingredient.objects.create(name='Salt', user=self.user)
+        Ingredient.objects.create(name='Pepper', user=self.user)
+        etag = self.client.get(INGREDIENTS_URL)['ETag']
+
+        res = self.client.get(INGREDIENTS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.delete(get_ingredient_url(ingredient.id))
+        res = self.client.get(INGREDIENTS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_filter_ingredients_assigned_to_recipes(self):
+        """Test listing only ingredients assigned to recipes"""
+        in1 = Ingredient.objects.create(user=self.user, name='Apples')
+        Ingredient.objects.create(user=self.user, name='Turkey')
+        recipe = Recipie.objects.create(
+            user=self.user,
+            title='Apple Crumble',
+            time_minutes=5,
+            price=Decimal('4.50'),
+        )
+        recipe.ingredients.add(in1)
+
+        res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
+
+        self.assertEqual(
+            [ingredient['id'] for ingredient in res.data['results']],
+            [in1.id],
+        )
+
+    def test_ingredients_most_used_first(self):
+        """Test ingredients can be listed by how many recipes use them"""
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        apples = Ingredient.objects.create(user=self.user, name='Apples')
+        for title in ('Crumble', 'Pie'):
+            recipe = Recipie.objects.create(
+                user=self.user,
+                title=title,
+                time_minutes=5,
+                price=Decimal('4.50'),
+            )
+            recipe.ingredients.add(apples)
+        recipe.ingredients.add(salt)
+
+        res = self.client.get(INGREDIENTS_URL, {'ordering': '-recipe_count'})
+
+        self.assertEqual(
+            [(item['name'], item['recipe_count'])
+             for item in res.data['results']],
+            [('Apples', 2), ('Salt', 1)],
+        )
+
+    def test_suggest_ingredients(self):
+        """Test suggesting ingredients for a partial name"""
+        Ingredient.objects.create(user=self.user, name='Green pepper')
+        Ingredient.objects.create(user=self.user, name='Pepper')
+        Ingredient.objects.create(user=self.user, name='Salt')
+
+        res = self.client.get(INGREDIENTS_SUGGEST_URL, {'q': 'pepp'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [ingredient['name'] for ingredient in res.data],
+            ['Pepper', 'Green pepper'],
+        )
@@ -1,7 +1,13 @@
 """Test Recipe API"""
+import csv
+import io
+import json
 from decimal import Decimal
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from rest_framework import status
@@ -9,15 +15,20 @@ from rest_framework.test import APIClient
 
 from core.models import (
     Recipie,
-    Tag
+    Tag,
+    Ingredient,
 )
+from core.tests.utils import QueryCountMixin, count_queries
 
+from recipe.views import RecipeiViewSet
 from recipe.serializers import (
     RecipeSerializer,
     RecipieDetailSerializer,
 )
 
 RECIPE_URL = reverse('recipe:recipie-list')
+IMPORT_URL = reverse('recipe:recipie-import-recipes')
+EXPORT_URL = reverse('recipe:recipie-export')
 
 
 def detail_url(recipe_id):
@@ -58,7 +69,15 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class PrivateRecipeApiTests(TestCase):
+def ndjson(*lines):
+    """Encode lines as a newline delimited JSON body."""
+    return '\n'.join(
+        line if isinstance(line, str) else json.dumps(line)
+        for line in lines
+    ).encode()
+
+
+class PrivateRecipeApiTests(QueryCountMixin, TestCase):
     """Test authenticated api requests"""
 
     def setUp(self) -> None:
@@ -77,7 +96,7 @@ class PrivateRecipeApiTests(TestCase):
         serializer = RecipeSerializer(recipies, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipie_list_limited_to_user(self):
         """Test limited recipies is limited to authenticated user."""
@@ -89,7 +108,7 @@ class PrivateRecipeApiTests(TestCase):
         recipies = Recipie.objects.filter(user=self.user).order_by('-id')
 
         serializer = RecipeSerializer(recipies, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_recipie_detail(self):
         """Test get recipie detail"""
@@ -101,6 +120,12 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(serializer.data, res.data)
 
+    def test_get_recipie_detail_invalid_id(self):
+        """Test a detail URL whose id isn't a number returns 404"""
+        res = self.client.get(detail_url('abc'))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_create_recipie(self):
         """Test creating a recipie"""
         payload = {
@@ -275,3 +300,563 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(recipe.tags.count(), 0)
 
+    def test_create_tags_in_constant_queries(self):
+        """Test creating a recipe with many tags doesn't add queries."""
+        Tag.objects.create(user=self.user, name='Existing')
+
+        def create(count):
+            payload = {
+                'title': 'Tagged',
+                'time_minutes': 5,
+                'price': Decimal('1.00'),
+                'tags': [{'name': 'Existing'}] + [
+                    {'name': f'Tag {i}'} for i in range(count)
+                ],
+            }
+            res = self.client.post(RECIPE_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(
+            count_queries(lambda: create(1)),
+            count_queries(lambda: create(30)),
+        )
+        self.assertEqual(
+            Tag.objects.filter(user=self.user, name='Existing').count(), 1
+        )
+
+    def test_create_recipie_with_new_ingredients(self):
+        """Test creating a recipe with new ingredients."""
+        payload = {
+            'title': 'Cauliflower Tacos',
+            'time_minutes': 60,
+            'price': Decimal('4.30'),
+            'ingredients': [{'name': 'Cauliflower'}, {'name': 'Salt'}],
+        }
+
+        res = self.client.post(RECIPE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipie.objects.get(user=self.user)
+        self.assertEqual(recipe.ingredients.count(), 2)
+        for ingredient in payload['ingredients']:
+            exists = recipe.ingredients.filter(
+                name=ingredient['name'],
+                user=self.user,
+            ).exists()
+            self.assertTrue(exists)
+
+    def test_create_recipie_with_existing_ingredient(self):
+        """Test creating a recipe reuses an existing ingredient."""
+        ingredient = Ingredient.objects.create(user=self.user, name='Lemon')
+        payload = {
+            'title': 'Vietnamese Soup',
+            'time_minutes': 25,
+            'price': Decimal('2.55'),
+            'ingredients': [
+                {'name': 'Lemon'},
+                {'name': 'Fish Sauce'},
+                {'name': 'Lemon'},
+            ],
+        }
+
+        res = self.client.post(RECIPE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipie.objects.get(user=self.user)
+        self.assertEqual(recipe.ingredients.count(), 2)
+        self.assertIn(ingredient, recipe.ingredients.all())
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user, name='Lemon').count(),
+            1,
+        )
+
+    def test_update_recipe_ingredients(self):
+        """Test replacing a recipe's ingredients on update."""
+        old = Ingredient.objects.create(user=self.user, name='Pepper')
+        recipe = create_recipe(user=self.user)
+        recipe.ingredients.add(old)
+
+        payload = {'ingredients': [{'name': 'Chili'}]}
+        res = self.client.patch(detail_url(recipe.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        new = Ingredient.objects.get(user=self.user, name='Chili')
+        self.assertEqual(list(recipe.ingredients.all()), [new])
+        self.assertEqual(res.data['ingredients'][0]['name'], 'Chili')
+
+    def test_clear_recipe_ingredients(self):
+        """Test clearing a recipe's ingredients."""
+        recipe = create_recipe(user=self.user)
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Garlic')
+        )
+
+        payload = {'ingredients': []}
+        res = self.client.patch(detail_url(recipe.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(recipe.ingredients.count(), 0)
+
+    def test_recipe_list_paginated_by_cursor(self):
+        """Test recipes are paged newest first with a cursor."""
+        recipes = [create_recipe(user=self.user) for _ in range(3)]
+
+        res = self.client.get(RECIPE_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [recipes[2].id, recipes[1].id])
+        self.assertIsNotNone(res.data['next'])
+
+        res = self.client.get(res.data['next'])
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [recipes[0].id])
+        self.assertIsNone(res.data['next'])
+
+    def _create_tagged_recipes(self, count):
+        """Create recipes that each have a tag and an ingredient."""
+        for i in range(count):
+            recipe = create_recipe(user=self.user)
+            recipe.tags.add(
+                Tag.objects.create(user=self.user, name=f'Tag {i}')
+            )
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f'Ing {i}')
+            )
+
+    @override_settings(RECIPE_LIST_CACHE_TIMEOUT=0)
+    def test_list_query_count_is_constant(self):
+        """Test listing recipes doesn't run a query per recipe."""
+        self._create_tagged_recipes(1)
+
+        self.assertConstantQueries(
+            lambda: self.client.get(RECIPE_URL),
+            lambda: self._create_tagged_recipes(5),
+        )
+
+    def test_detail_query_count_is_constant(self):
+        """Test recipe detail doesn't run a query per tag."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='First'))
+        url = detail_url(recipe.id)
+
+        def add_tags():
+            for i in range(5):
+                recipe.tags.add(
+                    Tag.objects.create(user=self.user, name=f'Tag {i}')
+                )
+
+        self.assertConstantQueries(lambda: self.client.get(url), add_tags)
+
+    def test_detail_not_modified(self):
+        """Test recipe detail returns 304 for a current ETag."""
+        recipe = create_recipe(user=self.user)
+        url = detail_url(recipe.id)
+        res = self.client.get(url)
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_if_modified_since(self):
+        """Test recipe detail honours If-Modified-Since."""
+        recipe = create_recipe(user=self.user)
+        url = detail_url(recipe.id)
+        res = self.client.get(url)
+
+        res = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=res['Last-Modified']
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_changes_with_embedded_tags(self):
+        """Test renaming or removing a tag changes the recipe ETag."""
+        recipe = create_recipe(user=self.user)
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('First', 'Second')
+        ]
+        recipe.tags.add(*tags)
+        url = detail_url(recipe.id)
+        etags = [self.client.get(url)['ETag']]
+
+        tags[0].name = 'Renamed'
+        tags[0].save()
+        etags.append(self.client.get(url)['ETag'])
+        tags[0].delete()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etags[-1])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len({*etags, res['ETag']}), 3)
+
+    def test_filter_by_tags(self):
+        """Test filtering recipes by any of several tags."""
+        r1 = create_recipe(user=self.user, title='Thai Curry')
+        r2 = create_recipe(user=self.user, title='Tahini Salad')
+        r3 = create_recipe(user=self.user, title='Fish and Chips')
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Vegetarian')
+        r1.tags.add(tag1, tag2)
+        r2.tags.add(tag2)
+
+        res = self.client.get(RECIPE_URL, {'tags': f'{tag1.id},{tag2.id}'})
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [r2.id, r1.id])
+        self.assertNotIn(r3.id, ids)
+
+    def test_filter_by_tags_and_ingredients(self):
+        """Test tag and ingredient filters must both match."""
+        r1 = create_recipe(user=self.user, title='Posh Beans')
+        r2 = create_recipe(user=self.user, title='Chicken Cacciatore')
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        in1 = Ingredient.objects.create(user=self.user, name='Beans')
+        in2 = Ingredient.objects.create(user=self.user, name='Chicken')
+        r1.tags.add(tag)
+        r2.tags.add(tag)
+        r1.ingredients.add(in1, in2)
+        r2.ingredients.add(in2)
+
+        res = self.client.get(
+            RECIPE_URL,
+            {'tags': str(tag.id), 'ingredients': str(in1.id)},
+        )
+
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']], [r1.id]
+        )
+
+    def test_filter_invalid_ids_error(self):
+        """Test non-numeric filter ids are rejected."""
+        res = self.client.get(RECIPE_URL, {'tags': '1,abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_matches_serializer(self):
+        """Test the list gives RecipeSerializer's output, tags included"""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Salt')
+        )
+        create_recipe(user=self.user, price=Decimal('12.00'))
+
+        res = self.client.get(RECIPE_URL)
+
+        serializer = RecipeSerializer(
+            Recipie.objects.filter(user=self.user).order_by('-id'),
+            many=True,
+        )
+        self.assertEqual(
+            json.loads(json.dumps(res.data['results'])),
+            json.loads(json.dumps(serializer.data)),
+        )
+
+    @override_settings(RECIPE_LIST_CACHE_TIMEOUT=0)
+    def test_list_sparse_fields(self):
+        """Test ?fields= limits recipes to those fields, in that order"""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        queries = count_queries(
+            lambda: self.client.get(RECIPE_URL, {'fields': 'title,id,price'})
+        )
+        res = self.client.get(RECIPE_URL, {'fields': 'title,id,price'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            [{'title': recipe.title, 'id': recipe.id, 'price': '5.50'}],
+        )
+        # No tag or ingredient queries when neither is asked for.
+        self.assertLess(queries, count_queries(
+            lambda: self.client.get(RECIPE_URL)
+        ))
+
+    def test_list_unknown_fields_error(self):
+        """Test ?fields= naming an unknown field is rejected"""
+        res = self.client.get(RECIPE_URL, {'fields': 'id,user'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('user', res.data['fields'])
+
+    def test_search_ranks_title_above_description(self):
+        """Test search matches title and description, titles first."""
+        in_desc = create_recipe(
+            user=self.user,
+            title='Weeknight dinner',
+            description='A quick lentil stew',
+        )
+        in_title = create_recipe(
+            user=self.user,
+            title='Lentil soup',
+            description='Warming',
+        )
+        create_recipe(user=self.user, title='Pancakes', description='Sweet')
+
+        res = self.client.get(RECIPE_URL, {'search': 'lentils'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [in_title.id, in_desc.id],
+        )
+
+    def test_search_follows_edits(self):
+        """Test the search index is kept up to date on save."""
+        recipe = create_recipe(user=self.user, title='Plain toast')
+
+        recipe.title = 'Garlic bread'
+        recipe.save()
+        res = self.client.get(RECIPE_URL, {'search': 'garlic'})
+
+        self.assertEqual(
+            [r['id'] for r in res.data['results']], [recipe.id]
+        )
+        res = self.client.get(RECIPE_URL, {'search': 'toast'})
+        self.assertEqual(res.data['results'], [])
+
+    def test_search_pages_through_equal_ranks(self):
+        """Test search paging by (rank, id) returns every match once."""
+        recipes = [
+            create_recipe(user=self.user, title='Tomato pasta')
+            for _ in range(3)
+        ]
+        tag = Tag.objects.create(user=self.user, name='Veg')
+        for recipe in recipes:
+            recipe.tags.add(tag)
+        create_recipe(user=self.user, title='Tomato salad')
+
+        params = {'search': 'tomato', 'tags': str(tag.id), 'page_size': 1}
+        res = self.client.get(RECIPE_URL, params)
+        ids = [r['id'] for r in res.data['results']]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            ids += [r['id'] for r in res.data['results']]
+
+        self.assertEqual(ids, [r.id for r in reversed(recipes)])
+
+    def test_search_invalid_cursor(self):
+        """Test a garbled search cursor is rejected."""
+        res = self.client.get(RECIPE_URL, {'search': 'x', 'cursor': '!!'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def _import(self, body):
+        return self.client.post(
+            IMPORT_URL,
+            body,
+            content_type='application/x-ndjson',
+        )
+
+    def test_import_recipes(self):
+        """Test importing recipes with nested tags and ingredients."""
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        body = ndjson(
+            {'title': 'Curry', 'time_minutes': 30, 'price': '5.00',
+             'tags': [{'name': 'Dinner'}], 'ingredients': [{'name': 'Rice'}]},
+            {'title': 'Soup', 'time_minutes': 10, 'price': '2.50',
+             'description': 'Hot', 'tags': [{'name': 'Lunch'}]},
+        )
+
+        res = self._import(body)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['errors'], [])
+        curry = Recipie.objects.get(user=self.user, title='Curry')
+        self.assertEqual(list(curry.tags.all()), [tag])
+        self.assertEqual(curry.ingredients.get().name, 'Rice')
+        soup = Recipie.objects.get(user=self.user, title='Soup')
+        self.assertEqual(soup.description, 'Hot')
+        self.assertEqual(soup.tags.get().name, 'Lunch')
+
+    def test_import_reports_line_errors(self):
+        """Test bad lines are reported and good lines still imported."""
+        body = ndjson(
+            {'title': 'Good', 'time_minutes': 5, 'price': '1.00'},
+            '{not json',
+            '',
+            {'title': 'No time', 'price': '1.00'},
+        )
+
+        res = self._import(body)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['error_count'], 2)
+        self.assertEqual(
+            [error['line'] for error in res.data['errors']], [2, 4]
+        )
+        self.assertIn('time_minutes', res.data['errors'][1]['errors'])
+        self.assertTrue(Recipie.objects.filter(title='Good').exists())
+
+    def test_import_in_chunks(self):
+        """Test recipes spanning several chunks are all imported."""
+        body = ndjson(*[
+            {'title': f'Recipe {i}', 'time_minutes': i, 'price': '1.00',
+             'tags': [{'name': 'Shared'}]}
+            for i in range(5)
+        ])
+
+        with patch.object(RecipeiViewSet, 'import_chunk_size', 2):
+            res = self._import(body)
+
+        self.assertEqual(res.data['created'], 5)
+        self.assertEqual(Recipie.objects.filter(user=self.user).count(), 5)
+        tag = Tag.objects.get(user=self.user, name='Shared')
+        self.assertEqual(tag.recipie_set.count(), 5)
+
+    def test_import_caps_reported_errors(self):
+        """Test only the first errors are returned but all are counted."""
+        body = ndjson(*['{bad'] * 5)
+
+        with patch.object(RecipeiViewSet, 'import_max_errors', 3):
+            res = self._import(body)
+
+        self.assertEqual(res.data['created'], 0)
+        self.assertEqual(res.data['error_count'], 5)
+        self.assertEqual(len(res.data['errors']), 3)
+
+    def test_import_requires_ndjson(self):
+        """Test other content types are rejected."""
+        res = self.client.post(IMPORT_URL, [], format='json')
+
+        self.assertEqual(
+            res.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+
+    def _export(self, **params):
+        res = self.client.get(EXPORT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return b''.join(res.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        """Test exporting recipes as NDJSON lines import accepts."""
+        first = create_recipe(user=self.user, title='First')
+        first.tags.add(Tag.objects.create(user=self.user, name='Quick'))
+        first.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Egg')
+        )
+        second = create_recipe(user=self.user, title='Second')
+        other = create_user(email='other@examole.com', password='pass12345')
+        create_recipe(user=other, title='Hidden')
+
+        with patch.object(RecipeiViewSet, 'export_chunk_size', 1):
+            lines = self._export().splitlines()
+
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['id'] for row in rows], [first.id, second.id])
+        self.assertEqual(rows[0]['price'], '5.50')
+        self.assertEqual(rows[0]['tags'], [{'name': 'Quick'}])
+        self.assertEqual(rows[0]['ingredients'], [{'name': 'Egg'}])
+        self.assertEqual(rows[1]['tags'], [])
+
+    def test_export_csv(self):
+        """Test exporting recipes as CSV."""
+        recipe = create_recipe(user=self.user, title='Pie, apple')
+        recipe.tags.add(
+            Tag.objects.create(user=self.user, name='Dessert'),
+            Tag.objects.create(user=self.user, name='Baked'),
+        )
+
+        rows = list(csv.DictReader(io.StringIO(
+            self._export(export_format='csv')
+        )))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['title'], 'Pie, apple')
+        self.assertEqual(rows[0]['price'], '5.50')
+        self.assertEqual(rows[0]['tags'], 'Dessert;Baked')
+        self.assertEqual(rows[0]['ingredients'], '')
+
+    def test_export_unknown_format_error(self):
+        """Test an unknown export format is rejected."""
+        res = self.client.get(EXPORT_URL, {'export_format': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipeListCacheTests(TestCase):
+    """Test caching of recipe list responses"""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email='user@examole.com', password='pass123')
+        self.client.force_authenticate(self.user)
+
+    def test_list_served_from_cache(self):
+        """Test a repeated list doesn't query the database."""
+        create_recipe(user=self.user)
+        first = self.client.get(RECIPE_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPE_URL)
+
+        self.assertEqual(first.data, second.data)
+
+    def test_cache_keyed_by_query_params(self):
+        """Test different pages aren't served from each other's cache."""
+        for _ in range(3):
+            create_recipe(user=self.user)
+
+        self.client.get(RECIPE_URL)
+        res = self.client.get(RECIPE_URL, {'page_size': 1})
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_create_invalidates_list(self):
+        """Test creating a recipe invalidates the cached list."""
+        self.client.get(RECIPE_URL)
+        payload = {'title': 'New', 'time_minutes': 1, 'price': '1.00'}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(RECIPE_URL, payload)
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_tag_rename_invalidates_list(self):
+        """Test renaming an embedded tag invalidates the cached list."""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Old')
+        recipe.tags.add(tag)
+        self.client.get(RECIPE_URL)
+
+        url = reverse('recipe:tag-detail', args=(tag.id,))
+        self.client.patch(url, {'name': 'New'})
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'New')
+
+    def test_conditional_get_not_modified(self):
+        """Test If-None-Match with the current ETag returns 304."""
+        create_recipe(user=self.user)
+        res = self.client.get(RECIPE_URL)
+        etag = res['ETag']
+
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        recipe = Recipie.objects.get(user=self.user)
+        self.client.delete(detail_url(recipe.id))
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.data['results'], [])
+
+    def test_cache_is_per_user(self):
+        """Test one user's cached list isn't served to another."""
+        create_recipe(user=self.user)
+        self.client.get(RECIPE_URL)
+
+        other = create_user(email='other@examole.com', password='pass123')
+        self.client.force_authenticate(other)
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.data['results'], [])
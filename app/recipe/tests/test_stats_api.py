@@ -0,0 +1,126 @@
+"""Tests for the recipe stats API."""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipie, Tag
+
+STATS_URL = reverse('recipe:stats')
+RECIPES_URL = reverse('recipe:recipie-list')
+
+
+def create_user(email='user@example.com', password='testpass123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class PublicStatsApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to read stats."""
+        res = APIClient().get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateStatsApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self) -> None:
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_no_recipes(self):
+        """Test a user without recipes gets zeros."""
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['recipe_count'], 0)
+        self.assertIsNone(res.data['avg_time_minutes'])
+        self.assertEqual(
+            [bucket['count'] for bucket in res.data['price_buckets']],
+            [0] * 5,
+        )
+        self.assertEqual(res.data['top_tags'], [])
+
+    def test_stats_follow_api_changes(self):
+        """Test stats reflect recipes created, updated and deleted."""
+        payloads = [
+            {'title': 'Curry', 'time_minutes': 30, 'price': '12.00',
+             'tags': [{'name': 'Dinner'}, {'name': 'Spicy'}]},
+            {'title': 'Salad', 'time_minutes': 10, 'price': '4.50',
+             'tags': [{'name': 'Dinner'}]},
+            {'title': 'Roast', 'time_minutes': 90, 'price': '60.00'},
+        ]
+        ids = []
+        for payload in payloads:
+            res = self.client.post(RECIPES_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            ids.append(res.data['id'])
+        self.client.patch(
+            reverse('recipe:recipie-detail', args=[ids[0]]),
+            {'time_minutes': 20, 'tags': [{'name': 'Spicy'}]},
+            format='json',
+        )
+        self.client.delete(reverse('recipe:recipie-detail', args=[ids[2]]))
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data['recipe_count'], 2)
+        self.assertEqual(res.data['avg_time_minutes'], 15)
+        self.assertEqual(res.data['price_buckets'][0], {
+            'min': 0, 'max': 5, 'count': 1,
+        })
+        self.assertEqual(res.data['price_buckets'][-1], {
+            'min': 50, 'max': None, 'count': 0,
+        })
+        self.assertEqual(
+            [(tag['name'], tag['recipe_count'])
+             for tag in res.data['top_tags']],
+            [('Dinner', 1), ('Spicy', 1)],
+        )
+
+    def test_limited_to_user(self):
+        """Test only the user's own recipes and tags count."""
+        other = create_user('other@example.com')
+        recipe = Recipie.objects.create(
+            user=other,
+            title='Soup',
+            time_minutes=5,
+            price=Decimal('5.00'),
+        )
+        recipe.tags.add(Tag.objects.create(user=other, name='Vegan'))
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data['recipe_count'], 0)
+        self.assertEqual(res.data['top_tags'], [])
+
+    def test_top_tags_limited(self):
+        """Test only the most used tags are listed, most used first."""
+        recipes = Recipie.objects.bulk_create(
+            Recipie(user=self.user, title=f'R{i}', time_minutes=5, price=5)
+            for i in range(12)
+        )
+        tags = Tag.objects.bulk_create(
+            Tag(user=self.user, name=f'T{i}') for i in range(12)
+        )
+        Recipie.tags.through.objects.bulk_create(
+            Recipie.tags.through(recipie_id=recipe.id, tag_id=tag.id)
+            for i, tag in enumerate(tags)
+            for recipe in recipes[:i + 1]
+        )
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(
+            [tag['recipe_count'] for tag in res.data['top_tags']],
+            list(range(12, 2, -1)),
+        )
@@ -0,0 +1,219 @@
+"""Tests for the delta sync API."""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipie, Tag, Ingredient, TombstoneHorizon
+from recipe.views import SyncView
+
+SYNC_URL = reverse('recipe:sync')
+
+
+def create_user(email='user@example.com', password='testpass123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe title',
+        'time_minutes': 5,
+        'price': Decimal('5.5'),
+    }
+    defaults.update(params)
+    return Recipie.objects.create(user=user, **defaults)
+
+
+class PublicSyncApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to sync."""
+        res = APIClient().get(SYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateSyncApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self) -> None:
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, since=0):
+        res = self.client.get(SYNC_URL, {'since': since})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_initial_sync_returns_everything(self):
+        """Test syncing from zero returns all the user's rows."""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name='Quick')
+        recipe.tags.add(tag)
+        Ingredient.objects.create(user=self.user, name='Salt')
+        create_recipe(create_user(email='other@example.com'))
+
+        data = self.sync()
+
+        self.assertEqual([r['id'] for r in data['recipes']], [recipe.id])
+        self.assertEqual(data['recipes'][0]['tags'][0]['name'], 'Quick')
+        self.assertEqual([t['id'] for t in data['tags']], [tag.id])
+        self.assertEqual(len(data['ingredients']), 1)
+        self.assertFalse(data['has_more'])
+
+    def test_sync_returns_only_changes(self):
+        """Test syncing from a cursor returns only later changes."""
+        first = create_recipe(self.user, title='First')
+        create_recipe(self.user, title='Second')
+        cursor = self.sync()['cursor']
+
+        first.title = 'First, edited'
+        first.save()
+        data = self.sync(cursor)
+
+        self.assertEqual(
+            [r['title'] for r in data['recipes']], ['First, edited']
+        )
+        self.assertGreater(data['cursor'], cursor)
+        self.assertEqual(self.sync(data['cursor'])['recipes'], [])
+
+    def test_sync_reports_deletes(self):
+        """Test deleted rows are returned as tombstones."""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name='Gone')
+        recipe.tags.add(tag)
+        doomed = create_recipe(self.user)
+        cursor = self.sync()['cursor']
+        tag_id, doomed_id = tag.id, doomed.id
+
+        tag.delete()
+        doomed.delete()
+        data = self.sync(cursor)
+
+        self.assertEqual(data['deleted']['tags'], [tag_id])
+        self.assertEqual(data['deleted']['recipes'], [doomed_id])
+        self.assertEqual([r['id'] for r in data['recipes']], [recipe.id])
+        self.assertEqual(data['recipes'][0]['tags'], [])
+
+    def test_sync_expired_cursor_gone(self):
+        """Test a cursor below the pruned tombstones must start over."""
+        create_recipe(self.user)
+        cursor = self.sync()['cursor']
+        TombstoneHorizon.objects.create(user=self.user, change_seq=cursor)
+
+        res = self.client.get(SYNC_URL, {'since': cursor - 1})
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+        self.assertEqual(len(self.sync()['recipes']), 1)
+        self.assertEqual(self.sync(cursor)['recipes'], [])
+
+    def test_full_sync_pages_below_horizon(self):
+        """Test a full sync pages past old rows below the horizon."""
+        recipes = [create_recipe(self.user) for _ in range(3)]
+        horizon = self.sync()['cursor'] + 100
+        TombstoneHorizon.objects.create(user=self.user, change_seq=horizon)
+
+        seen = []
+        cursor = 0
+        with patch.object(SyncView, 'limit', 2):
+            while True:
+                data = self.sync(cursor)
+                seen += [r['id'] for r in data['recipes']]
+                cursor = data['cursor']
+                if not data['has_more']:
+                    break
+                self.assertLess(cursor, 0)
+
+        self.assertEqual(seen, [r.id for r in recipes])
+        self.assertEqual(cursor, horizon)
+        self.assertEqual(self.sync(cursor)['recipes'], [])
+
+    def test_sync_includes_recipes_with_changed_links(self):
+        """Test adding a tag to a recipe marks the recipe changed."""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name='Later')
+        cursor = self.sync()['cursor']
+
+        recipe.tags.add(tag)
+        data = self.sync(cursor)
+
+        self.assertEqual([r['id'] for r in data['recipes']], [recipe.id])
+
+    def test_sync_pages_with_limit(self):
+        """Test a limited sync pages through every change exactly once."""
+        recipes = [create_recipe(self.user) for _ in range(3)]
+        tags = [
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+            for i in range(3)
+        ]
+        deleted_id = recipes[0].id
+        recipes[0].delete()
+
+        seen = []
+        cursor = 0
+        with patch.object(SyncView, 'limit', 2):
+            while True:
+                data = self.sync(cursor)
+                seen += [('recipe', r['id']) for r in data['recipes']]
+                seen += [('tag', t['id']) for t in data['tags']]
+                seen += [('gone', i) for i in data['deleted']['recipes']]
+                cursor = data['cursor']
+                if not data['has_more']:
+                    break
+
+        expected = [('recipe', r.id) for r in recipes[1:]]
+        expected += [('tag', t.id) for t in tags]
+        expected.append(('gone', deleted_id))
+        self.assertCountEqual(seen, expected)
+
+    def test_sync_does_not_repeat_queries(self):
+        """Test tags and ingredients aren't queried per recipe."""
+        for i in range(settings.QUERY_GUARD['MAX_REPEATS'] + 1):
+            recipe = create_recipe(self.user, title=f'Recipe {i}')
+            recipe.tags.add(Tag.objects.create(user=self.user, name=f'{i}'))
+
+        # The test runner's query guard fails the request on an N+1.
+        data = self.sync()
+
+        self.assertEqual(len(data['recipes']), i + 1)
+
+    def test_invalid_cursor_error(self):
+        """Test a non-integer cursor is rejected."""
+        res = self.client.get(SYNC_URL, {'since': 'abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SyncSnapshotTests(TransactionTestCase):
+    """Test sync reads every stream from one snapshot."""
+
+    def test_sync_reads_one_snapshot(self):
+        """Test all streams are read in one repeatable read transaction."""
+        user = create_user()
+        create_recipe(user)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = client.get(SYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(
+            sql[0],
+            'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ',
+        )
+        self.assertEqual(len(sql), 8)
+        self.assertEqual(len(res.data['recipes']), 1)
@@ -1,15 +1,20 @@
 """Tests for tags API."""
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Tag
-from recipe.serializers import TagSerializer
+from core.models import Recipie, Tag
+from recipe.serializers import TagCountSerializer
 
 TAGS_URL = reverse('recipe:tag-list')
+TAGS_SUGGEST_URL = reverse('recipe:tag-suggest')
 
 
 def get_tag_details_url(tag_id):
@@ -49,10 +54,10 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL)
         tags = Tag.objects.all().order_by('-name')
-        serializer = TagSerializer(tags, many=True)
+        serializer = TagCountSerializer(tags, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Test list of tags is limited to """
@@ -63,9 +68,9 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
-        self.assertEqual(res.data[0]['id'], tag.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
+        self.assertEqual(res.data['results'][0]['id'], tag.id)
 
     def test_update_tags(self):
         """Test updating tags"""
@@ -89,4 +94,207 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertFalse(Tag.objects.filter(id=tag.id).exists())
\ No newline at end of file
+        self.assertFalse(Tag.objects.filter(id=tag.id).exists())
+
+    def test_tags_paginated_by_name_then_id(self):
+        """Test paging tags keeps a stable order for equal names."""
+        first = Tag.objects.create(user=self.user, name="Same")
+        second = Tag.objects.create(user=self.user, name="Same")
+        third = Tag.objects.create(user=self.user, name="Apple")
+
+        res = self.client.get(TAGS_URL, {'page_size': 1})
+        ids = [tag['id'] for tag in res.data['results']]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            ids += [tag['id'] for tag in res.data['results']]
+
+        self.assertEqual(ids, [first.id, second.id, third.id])
+
+    def test_tags_pages_seek_on_name_and_id(self):
+        """Test pages seek past names containing colons, no offsets."""
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('b:1', 'a:2', 'a:2', 'a')
+        ]
+
+        res = self.client.get(TAGS_URL, {'page_size': 1})
+        ids = [tag['id'] for tag in res.data['results']]
+        while res.data['next']:
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(res.data['next'])
+            ids += [tag['id'] for tag in res.data['results']]
+            self.assertFalse(any(
+                'OFFSET' in query['sql'] for query in queries
+            ))
+
+        self.assertEqual(ids, [tag.id for tag in tags])
+
+    def test_tags_invalid_cursor(self):
+        """Test a malformed cursor is a 404."""
+        res = self.client.get(TAGS_URL, {'cursor': 'bm90IGpzb24='})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tags_list_not_modified(self):
+        """Test the tag list returns 304 until a tag changes"""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        etag = self.client.get(TAGS_URL)['ETag']
+
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(get_tag_details_url(tag.id), {'name': 'Veggie'})
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['name'], 'Veggie')
+
+    def test_tags_list_modified_after_delete(self):
+        """Test deleting a tag isn't hidden by If-Modified-Since"""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        Tag.objects.create(user=self.user, name="Dessert")
+        res = self.client.get(TAGS_URL)
+        self.assertNotIn('Last-Modified', res)
+
+        self.client.delete(get_tag_details_url(tag.id))
+        res = self.client.get(
+            TAGS_URL,
+            HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_filter_tags_assigned_to_recipes(self):
+        """Test listing only tags assigned to recipes, without duplicates"""
+        tag1 = Tag.objects.create(user=self.user, name="Breakfast")
+        Tag.objects.create(user=self.user, name="Lunch")
+        for title in ('Eggs', 'Toast'):
+            recipe = Recipie.objects.create(
+                user=self.user,
+                title=title,
+                time_minutes=5,
+                price=Decimal('1.00'),
+            )
+            recipe.tags.add(tag1)
+
+        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        self.assertEqual(
+            [tag['id'] for tag in res.data['results']], [tag1.id]
+        )
+
+    def test_tags_most_used_first(self):
+        """Test ordering by recipe count pages through ties by id"""
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('Rare', 'Common', 'Also common', 'Unused')
+        ]
+        for i in range(3):
+            recipe = Recipie.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                time_minutes=5,
+                price=Decimal('1.00'),
+            )
+            recipe.tags.add(tags[1], tags[2])
+            if i == 0:
+                recipe.tags.add(tags[0])
+
+        params = {'ordering': '-recipe_count', 'page_size': 1}
+        res = self.client.get(TAGS_URL, params)
+        results = res.data['results']
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            results += res.data['results']
+
+        self.assertEqual(
+            [(tag['id'], tag['recipe_count']) for tag in results],
+            [(tags[1].id, 3), (tags[2].id, 3), (tags[0].id, 1),
+             (tags[3].id, 0)],
+        )
+
+    def test_filter_unused_tags(self):
+        """Test listing only tags no recipe uses"""
+        used = Tag.objects.create(user=self.user, name="Breakfast")
+        unused = Tag.objects.create(user=self.user, name="Lunch")
+        recipe = Recipie.objects.create(
+            user=self.user,
+            title='Eggs',
+            time_minutes=5,
+            price=Decimal('1.00'),
+        )
+        recipe.tags.add(used)
+
+        res = self.client.get(TAGS_URL, {'unused_only': 1})
+
+        self.assertEqual(
+            [tag['id'] for tag in res.data['results']], [unused.id]
+        )
+
+    def test_ordering_invalid_error(self):
+        """Test only the supported orderings are accepted"""
+        res = self.client.get(TAGS_URL, {'ordering': 'name'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_assigned_only_invalid_error(self):
+        """Test assigned_only must be 0 or 1"""
+        res = self.client.get(TAGS_URL, {'assigned_only': 'yes'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_suggest_prefix_matches_first(self):
+        """Test suggest ranks names starting with the query first"""
+        Tag.objects.create(user=self.user, name='Cherry tomato')
+        Tag.objects.create(user=self.user, name='Tomato')
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.get(TAGS_SUGGEST_URL, {'q': 'toma'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag['name'] for tag in res.data],
+            ['Tomato', 'Cherry tomato'],
+        )
+
+    def test_suggest_prefix_wildcards_literal(self):
+        """Test LIKE wildcards in the query only match themselves"""
+        Tag.objects.create(user=self.user, name='Rye 50%')
+        Tag.objects.create(user=self.user, name='50% rye')
+        Tag.objects.create(user=self.user, name='5000 grains')
+
+        res = self.client.get(TAGS_SUGGEST_URL, {'q': '50%'})
+
+        self.assertEqual(
+            [tag['name'] for tag in res.data][:2],
+            ['50% rye', 'Rye 50%'],
+        )
+
+    def test_suggest_matches_misspelling(self):
+        """Test suggest finds names similar to a misspelt query"""
+        tag = Tag.objects.create(user=self.user, name='Tomato')
+
+        res = self.client.get(TAGS_SUGGEST_URL, {'q': 'tomatoe'})
+
+        self.assertEqual([t['id'] for t in res.data], [tag.id])
+
+    def test_suggest_limited_to_user_and_capped(self):
+        """Test suggest only returns the user's names, up to the limit"""
+        user2 = create_user(email='user2@example.com')
+        Tag.objects.create(user=user2, name='Salty')
+        for name in ('Salt', 'Salsa', 'Salad'):
+            Tag.objects.create(user=self.user, name=name)
+
+        res = self.client.get(TAGS_SUGGEST_URL, {'q': 'sal', 'limit': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+        self.assertNotIn('Salty', [tag['name'] for tag in res.data])
+
+    def test_suggest_requires_query(self):
+        """Test suggest without a query is rejected"""
+        res = self.client.get(TAGS_SUGGEST_URL, {'q': ' '})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
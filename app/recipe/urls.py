@@ -7,7 +7,9 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     RecipeiViewSet,
     TagViewSet,
-    IngredientViewSet
+    IngredientViewSet,
+    StatsView,
+    SyncView,
 )
 
 router = DefaultRouter()
@@ -17,5 +19,7 @@ router.register('ingredient', IngredientViewSet)
 app_name = 'recipe'
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(router.urls)),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('stats/', StatsView.as_view(), name='stats'),
 ]
@@ -1,19 +1,68 @@
 """
 Views for the Recipie APIs
 """
+import re
 
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db import connections, router, transaction
+from django.db.models import (
+    BooleanField,
+    Count,
+    Exists,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Max,
+    OuterRef,
+    Q,
+)
+from django.db.models.functions import Cast
+from django.http import StreamingHttpResponse
 from rest_framework import (
     viewsets,
-    mixins)
-from rest_framework.authentication import TokenAuthentication
+    mixins,
+    status)
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
-from core.models import Recipie, Tag, Ingredient
+from core.models import (
+    Ingredient,
+    Recipie,
+    RecipeStats,
+    Tag,
+    Tombstone,
+    TombstoneHorizon,
+)
+from user.authentication import CachedTokenAuthentication
+from . import cache as recipe_cache
+from .conditional import conditional_response, latest, make_etag
+from .bulk import (
+    chunked,
+    EXPORT_FIELDS,
+    EXPORT_WRITERS,
+    related_names,
+)
+from .pagination import (
+    RecipeCursorPagination,
+    NameCursorPagination,
+    PopularCursorPagination,
+    SearchCursorPagination,
+)
+from .parsers import NDJSONParser
 from .serializers import (
+    get_or_create_related,
+    RecipeRowSerializer,
     RecipeSerializer,
     RecipieDetailSerializer,
-    TagSerializer,
-    IngredientSerializer
+    TagCountSerializer,
+    IngredientCountSerializer,
 )
 
 
@@ -21,12 +70,83 @@ class RecipeiViewSet(viewsets.ModelViewSet):
     """View for manage recipie APIs."""
     serializer_class = RecipieDetailSerializer
     queryset = Recipie.objects.all()
-    authentication_classes = [TokenAuthentication, ]
+    pagination_class = RecipeCursorPagination
+    authentication_classes = [CachedTokenAuthentication, ]
     permission_classes = [IsAuthenticated, ]
+    import_chunk_size = 500
+    import_max_errors = 100
+    export_chunk_size = 1000
+
+    def _params_to_ints(self, name):
+        """Convert a comma separated query param to a list of ints"""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return [int(str_id) for str_id in value.split(',')]
+        except ValueError:
+            raise ValidationError({name: 'Must be comma separated ids.'})
 
     def get_queryset(self):
         """Retrieve recipies for authenticated users"""
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        queryset = self.queryset.filter(user=self.request.user)
+        for field_name in ('tags', 'ingredients'):
+            ids = self._params_to_ints(field_name)
+            if ids is None:
+                continue
+            field = Recipie._meta.get_field(field_name)
+            links = field.remote_field.through.objects.filter(**{
+                field.m2m_column_name(): OuterRef('pk'),
+                f'{field.m2m_reverse_name()}__in': ids,
+            })
+            queryset = queryset.filter(Exists(links))
+
+        search = self.request.query_params.get('search')
+        if search:
+            query = SearchQuery(
+                search,
+                config='english',
+                search_type='websearch',
+            )
+            return queryset.filter(
+                search_vector=query,
+            ).annotate(
+                # ts_rank returns a real; cast so the rank round-trips
+                # through the cursor exactly.
+                rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+            ).prefetch_related(
+                'tags',
+                'ingredients',
+            ).order_by('-rank', '-id')
+
+        return queryset.prefetch_related(
+            'tags',
+            'ingredients',
+        ).order_by('-id')
+
+    def _list_fields(self):
+        """Return the fields asked for with ?fields=, if any"""
+        value = self.request.query_params.get('fields')
+        if not value:
+            return None
+        fields = list(dict.fromkeys(value.split(',')))
+        unknown = [
+            name for name in fields if name not in RecipeSerializer.Meta.fields
+        ]
+        if unknown:
+            raise ValidationError({'fields': (
+                f'Unknown fields {", ".join(unknown)}. Choose from '
+                f'{", ".join(RecipeSerializer.Meta.fields)}.'
+            )})
+        return fields
+
+    @property
+    def paginator(self):
+        """Page search results by rank rather than by id"""
+        if (not hasattr(self, '_paginator') and
+                self.request.query_params.get('search')):
+            self._paginator = SearchCursorPagination()
+        return super().paginator
 
     def get_serializer_class(self):
         """Return serializer class for request"""
@@ -34,36 +154,461 @@ class RecipeiViewSet(viewsets.ModelViewSet):
             return RecipeSerializer
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        """
+        List recipies, cached until the user's recipe data changes
+
+        Lists read from a replica just after a change aren't cached.
+
+        ?fields= limits each recipie to the comma separated fields given.
+        """
+        user_id = request.user.id
+        version = recipe_cache.get_version(user_id)
+        if not recipe_cache.is_settled(user_id):
+            # Possibly stale, so neither cached nor ETagged.
+            return Response(self._list_page())
+
+        def respond():
+            data = recipe_cache.get_list(user_id, version, request)
+            if data is None:
+                data = self._list_page()
+                recipe_cache.set_list(user_id, version, request, data)
+            return Response(data)
+
+        return conditional_response(
+            request,
+            respond,
+            recipe_cache.list_etag(user_id, version, request),
+        )
+
+    def _list_page(self):
+        """Return one page of the list, serialized from .values() rows"""
+        serializer = RecipeRowSerializer(self._list_fields())
+        rows = self.paginate_queryset(
+            serializer.get_rows(self.filter_queryset(self.get_queryset()))
+        )
+        return self.get_paginated_response(serializer.serialize(rows)).data
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a recipie, or 304 if the client's copy is current"""
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            recipes = Recipie.objects.filter(
+                user=request.user,
+                pk=kwargs[lookup],
+            )
+        except (TypeError, ValueError):
+            # Not a pk, get_object answers 404 as for a missing recipie.
+            return super().retrieve(request, *args, **kwargs)
+        state = recipes.annotate(
+            tags_count=Count('tags', distinct=True),
+            tags_updated_at=Max('tags__updated_at'),
+            ingredients_count=Count('ingredients', distinct=True),
+            ingredients_updated_at=Max('ingredients__updated_at'),
+        ).values(
+            'updated_at',
+            'tags_count',
+            'tags_updated_at',
+            'ingredients_count',
+            'ingredients_updated_at',
+        ).first()
+        if state is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        return conditional_response(
+            request,
+            lambda: super(RecipeiViewSet, self).retrieve(
+                request, *args, **kwargs
+            ),
+            make_etag(*state.values()),
+            latest(
+                state['updated_at'],
+                state['tags_updated_at'],
+                state['ingredients_updated_at'],
+            ),
+        )
+
     def perform_create(self, serializer):
         """Create a new recipie"""
         serializer.save(user=self.request.user)
+        recipe_cache.invalidate(self.request.user)
 
+    def perform_update(self, serializer):
+        """Update a recipie"""
+        serializer.save()
+        recipe_cache.invalidate(self.request.user)
 
-class TagViewSet(mixins.UpdateModelMixin,
-                 mixins.ListModelMixin,
-                 mixins.DestroyModelMixin,
-                 viewsets.GenericViewSet):
-    """Manage tags in the database"""
-    serializer_class = TagSerializer
-    queryset = Tag.objects.all()
-    authentication_classes = [TokenAuthentication, ]
+    def perform_destroy(self, instance):
+        """Delete a recipie"""
+        instance.delete()
+        recipe_cache.invalidate(self.request.user)
+
+    @action(
+        methods=['post'],
+        detail=False,
+        url_path='import',
+        parser_classes=[NDJSONParser],
+    )
+    def import_recipes(self, request):
+        """Create recipies in bulk from newline delimited JSON"""
+        created = 0
+        errors = []
+        error_count = 0
+        for chunk in chunked(request.data, self.import_chunk_size):
+            chunk_created, chunk_errors = self._import_chunk(chunk)
+            created += chunk_created
+            error_count += len(chunk_errors)
+            errors += chunk_errors[:self.import_max_errors - len(errors)]
+        if created:
+            recipe_cache.invalidate(request.user)
+
+        return Response(
+            {'created': created, 'error_count': error_count,
+             'errors': errors},
+            status=status.HTTP_200_OK,
+        )
+
+    @action(methods=['get'], detail=False)
+    def export(self, request):
+        """Stream all the user's recipies as NDJSON or CSV"""
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in EXPORT_WRITERS:
+            raise ValidationError({
+                'export_format': f'Choose one of {", ".join(EXPORT_WRITERS)}'
+            })
+        writer, content_type = EXPORT_WRITERS[export_format]
+        response = StreamingHttpResponse(
+            writer(self._export_rows()),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="recipes.{export_format}"'
+        )
+        return response
+
+    def _export_rows(self):
+        """Yield recipie rows read in chunks from a server-side cursor"""
+        queryset = Recipie.objects.filter(
+            user=self.request.user
+        ).order_by('id').values(*EXPORT_FIELDS)
+        size = self.export_chunk_size
+        for chunk in chunked(queryset.iterator(chunk_size=size), size):
+            ids = [row['id'] for row in chunk]
+            tags = related_names('tags', ids)
+            ingredients = related_names('ingredients', ids)
+            for row in chunk:
+                row['tags'] = tags.get(row['id'], [])
+                row['ingredients'] = ingredients.get(row['id'], [])
+                yield row
+
+    def _import_chunk(self, chunk):
+        """Validate and bulk insert one chunk of imported lines"""
+        valid = []
+        errors = []
+        for number, data in chunk:
+            if isinstance(data, ParseError):
+                errors.append({'line': number, 'errors': [data.detail]})
+                continue
+            serializer = self.get_serializer(data=data)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                errors.append({'line': number, 'errors': serializer.errors})
+
+        related = {'tags': [], 'ingredients': []}
+        recipes = []
+        for data in valid:
+            for field_name in related:
+                related[field_name].append(data.pop(field_name, []))
+            recipes.append(Recipie(user=self.request.user, **data))
+
+        with transaction.atomic():
+            recipes = Recipie.objects.bulk_create(recipes)
+            for field_name, items in related.items():
+                get_or_create_related(
+                    self.request.user,
+                    field_name,
+                    list(zip(recipes, items)),
+                )
+        return len(recipes), errors
+
+
+class BaseRecipeAttrViewSet(mixins.UpdateModelMixin,
+                            mixins.ListModelMixin,
+                            mixins.DestroyModelMixin,
+                            viewsets.GenericViewSet):
+    """Base viewset for recipie attributes"""
+    pagination_class = NameCursorPagination
+    authentication_classes = [CachedTokenAuthentication, ]
     permission_classes = [IsAuthenticated, ]
+    orderings = {
+        '-name': ('-name', 'id'),
+        '-recipe_count': ('-recipe_count', 'id'),
+    }
+    suggest_limit = 10
+    max_suggest_limit = 50
+
+    def _flag(self, name):
+        """Return whether the 0 or 1 query param name is set"""
+        value = self.request.query_params.get(name, '0')
+        if value not in ('0', '1'):
+            raise ValidationError({name: 'Must be 0 or 1.'})
+        return value == '1'
+
+    def _ordering(self):
+        """Return the ?ordering= asked for, by name unless given"""
+        ordering = self.request.query_params.get('ordering', '-name')
+        if ordering not in self.orderings:
+            raise ValidationError({'ordering': (
+                f'Must be one of {", ".join(self.orderings)}.'
+            )})
+        return ordering
 
     def get_queryset(self):
-        """Filter queryset to authenticated users"""
-        return self.queryset.filter(user=self.request.user).order_by('-name')
+        """
+        Filter queryset to authenticated users
+
+        Filters and orders on the maintained recipe_count, so assigned
+        or unused only and most used first lists need no join.
+        """
+        queryset = self.queryset.filter(user=self.request.user)
+        if self._flag('assigned_only'):
+            queryset = queryset.filter(recipe_count__gt=0)
+        if self._flag('unused_only'):
+            queryset = queryset.filter(recipe_count=0)
+        return queryset.order_by(*self.orderings[self._ordering()])
+
+    @property
+    def paginator(self):
+        """Page most used first lists by count rather than by name"""
+        if (not hasattr(self, '_paginator') and
+                self._ordering() == '-recipe_count'):
+            self._paginator = PopularCursorPagination()
+        return super().paginator
+
+    def list(self, request, *args, **kwargs):
+        """
+        List, or 304 if nothing changed since the client's copy
+
+        There's no Last-Modified, as deletes and recipe_count changes
+        leave the latest updated_at where it was. The ETag covers them.
+        """
+        state = self.get_queryset().order_by().aggregate(
+            count=Count('id'),
+            updated_at=Max('updated_at'),
+        )
+        return conditional_response(
+            request,
+            lambda: super(BaseRecipeAttrViewSet, self).list(
+                request, *args, **kwargs
+            ),
+            make_etag(
+                state['count'],
+                state['updated_at'],
+                recipe_cache.get_version(request.user.id),
+                recipe_cache.params_hash(request),
+            ),
+        )
+
+    def get_suggest_queryset(self, query, limit):
+        """
+        Return the best limit names containing or resembling query.
+
+        Both conditions are answered by the (user, name) trigram index,
+        containment as a case insensitive regex, which it serves where
+        icontains' UPPER(name) LIKE isn't. Names starting with the query
+        come first, then by similarity.
+        """
+        return self.get_queryset().filter(
+            Q(name__iregex=re.escape(query)) |
+            Q(name__trigram_similar=query)
+        ).annotate(
+            prefix=ExpressionWrapper(
+                Q(name__istartswith=query),
+                output_field=BooleanField(),
+            ),
+            similarity=TrigramSimilarity('name', query),
+        ).order_by('-prefix', '-similarity', 'name', 'id')[:limit]
+
+    @action(methods=['get'], detail=False)
+    def suggest(self, request):
+        """Autocomplete the user's names from a partial or misspelt query"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This query parameter is required.'})
+        try:
+            limit = int(request.query_params.get('limit', self.suggest_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        limit = max(1, min(limit, self.max_suggest_limit))
+
+        serializer = self.get_serializer(
+            self.get_suggest_queryset(query, limit),
+            many=True,
+        )
+        return Response(serializer.data)
+
+    def perform_update(self, serializer):
+        """Update and invalidate recipe lists that embed it"""
+        serializer.save()
+        recipe_cache.invalidate(self.request.user)
+
+    def perform_destroy(self, instance):
+        """Delete and invalidate recipe lists that embed it"""
+        instance.delete()
+        recipe_cache.invalidate(self.request.user)
+
+
+class TagViewSet(BaseRecipeAttrViewSet):
+    """Manage tags in the database"""
+    serializer_class = TagCountSerializer
+    queryset = Tag.objects.all()
 
 
-class IngredientViewSet( mixins.UpdateModelMixin,
-                         mixins.ListModelMixin,
-                         mixins.DestroyModelMixin,
-                         viewsets.GenericViewSet):
+class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage ingredients in the database"""
-    serializer_class = IngredientSerializer
+    serializer_class = IngredientCountSerializer
     queryset = Ingredient.objects.all()
-    authentication_classes = [TokenAuthentication, ]
+
+
+class SyncView(APIView):
+    """Changes to the user's recipies, tags and ingredients since a cursor"""
+    authentication_classes = [CachedTokenAuthentication, ]
     permission_classes = [IsAuthenticated, ]
+    limit = 500
+    deleted_keys = {
+        Tombstone.RECIPE: 'recipes',
+        Tombstone.TAG: 'tags',
+        Tombstone.INGREDIENT: 'ingredients',
+    }
 
-    def get_queryset(self):
-        """Filter queryset to authenticated users"""
-        return self.queryset.filter(user=self.request.user).order_by('-name')
+    def get(self, request):
+        """
+        Return rows changed or deleted after the since cursor
+
+        Pages of a sync from 0 hand out negative cursors, continuing the
+        full sync from their absolute value. That way a full sync isn't
+        refused part way with 410 when its cursor is below the horizon
+        of pruned tombstones.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+        except ValueError:
+            raise ValidationError({'since': 'Must be an integer cursor.'})
+        full_sync = since <= 0
+        since = abs(since)
+
+        changed = {
+            'recipes': Recipie.objects.prefetch_related(
+                'tags',
+                'ingredients',
+            ),
+            'tags': Tag.objects.all(),
+            'ingredients': Ingredient.objects.all(),
+            'deleted': Tombstone.objects.all(),
+        }
+        # All streams are read from one snapshot of one database, so a
+        # write committed between the queries can't land in one stream
+        # and be missed in another below the cursor handed out.
+        db = router.db_for_read(Recipie)
+        snapshot = not connections[db].in_atomic_block
+        with transaction.atomic(using=db):
+            if snapshot:
+                with connections[db].cursor() as cursor:
+                    cursor.execute(
+                        'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ'
+                    )
+            # Tombstones up to the horizon were pruned, so a client that
+            # hasn't seen them must drop its copy and sync from 0.
+            horizon = TombstoneHorizon.objects.using(db).filter(
+                user=request.user,
+            ).values_list('change_seq', flat=True).first()
+            horizon = horizon or 0
+            if not full_sync and since < horizon:
+                return Response(
+                    {'detail': 'Cursor expired, sync again from 0.'},
+                    status=status.HTTP_410_GONE,
+                )
+            for key, queryset in changed.items():
+                changed[key] = list(queryset.using(db).filter(
+                    user=request.user,
+                    change_seq__gt=since,
+                ).order_by('change_seq')[:self.limit])
+
+        # A stream that hit the limit may have more rows after its last
+        # one, so nothing past that point can be returned from any stream.
+        full = [rows[-1].change_seq for rows in changed.values()
+                if len(rows) == self.limit]
+        if full:
+            cursor = min(full)
+        else:
+            cursor = max(
+                (rows[-1].change_seq for rows in changed.values() if rows),
+                default=since,
+            )
+        for key, rows in changed.items():
+            changed[key] = [row for row in rows if row.change_seq <= cursor]
+        if not full:
+            # Every change up to now was returned, and later ones come
+            # after the horizon, so the client is past it.
+            cursor = max(cursor, horizon)
+        elif full_sync:
+            cursor = -cursor
+
+        deleted = {key: [] for key in self.deleted_keys.values()}
+        for tombstone in changed['deleted']:
+            deleted[self.deleted_keys[tombstone.kind]].append(
+                tombstone.object_id
+            )
+        return Response({
+            'cursor': cursor,
+            'has_more': bool(full),
+            'recipes': RecipieDetailSerializer(
+                changed['recipes'], many=True
+            ).data,
+            'tags': TagCountSerializer(changed['tags'], many=True).data,
+            'ingredients': IngredientCountSerializer(
+                changed['ingredients'], many=True
+            ).data,
+            'deleted': deleted,
+        })
+
+
+class StatsView(APIView):
+    """Totals over the user's recipies, for dashboards"""
+    authentication_classes = [CachedTokenAuthentication, ]
+    permission_classes = [IsAuthenticated, ]
+    top_tags = 10
+
+    def get(self, request):
+        """
+        Return the recipie count, mean time, prices and most used tags.
+
+        Read from counters the database keeps up to date as recipies
+        change, so no query scans the user's recipies.
+        """
+        stats = RecipeStats.objects.filter(user=request.user).first()
+        if stats is None:
+            stats = RecipeStats(user=request.user)
+        bounds = (0, *RecipeStats.PRICE_BOUNDS, None)
+        counts = stats.price_buckets or [0] * (len(bounds) - 1)
+        top_tags = Tag.objects.filter(
+            user=request.user,
+            recipe_count__gt=0,
+        ).order_by('-recipe_count', 'id').values(
+            'id',
+            'name',
+            'recipe_count',
+        )[:self.top_tags]
+        return Response({
+            'recipe_count': stats.recipe_count,
+            'avg_time_minutes': (
+                round(stats.time_minutes_total / stats.recipe_count, 1)
+                if stats.recipe_count else None
+            ),
+            'price_buckets': [
+                {'min': low, 'max': high, 'count': count}
+                for low, high, count in zip(bounds, bounds[1:], counts)
+            ],
+            'top_tags': list(top_tags),
+        })
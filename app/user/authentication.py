@@ -0,0 +1,184 @@
+"""
+Token authentication with cached token lookups
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.authtoken.models import Token
+
+
+class LRUCache:
+    """Thread safe, size bounded mapping whose entries expire"""
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout, maxsize):
+        """Store value, evicting the least recently used beyond maxsize"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LRUCache()
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_stats():
+    """Return this process's token lookup hit and miss counts."""
+    with _stats_lock:
+        return {
+            'local_hits': _stats['local_hits'],
+            'shared_hits': _stats['shared_hits'],
+            'misses': _stats['misses'],
+        }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _shared_cache():
+    if not settings.AUTH_TOKEN_CACHE:
+        return None
+    return caches[settings.AUTH_TOKEN_CACHE]
+
+
+def _shared_key(key):
+    # Keep raw tokens out of the cache backend's keyspace.
+    return 'auth:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate(key):
+    """
+    Drop a token from the caches.
+
+    Evict now and again after commit, so a lookup made before the
+    change commits can't put the old token back.
+    """
+    def evict():
+        local_cache.delete(key)
+        shared = _shared_cache()
+        if shared is not None:
+            shared.delete(_shared_key(key))
+
+    evict()
+    transaction.on_commit(evict)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in TokenAuthentication that caches token lookups
+
+    Tokens are looked up in a per-process LRU, then in the shared cache
+    if one is configured, and only then in the database. With a shared
+    cache, local entries are only used while the shared one is there.
+    """
+
+    def authenticate_credentials(self, key):
+        shared = _shared_cache()
+        token = local_cache.get(key)
+        # A change to the token or its user drops the shared entry from
+        # any process, so a local copy without one is stale.
+        if token is not None and (
+                shared is None or _shared_key(key) in shared):
+            _count('local_hits')
+            return self.request_copy(token)
+
+        token = None
+        if shared is not None:
+            token = shared.get(_shared_key(key))
+        if token is not None:
+            _count('shared_hits')
+        else:
+            _count('misses')
+            user, token = super().authenticate_credentials(key)
+            if shared is not None:
+                shared.set(
+                    _shared_key(key),
+                    token,
+                    settings.AUTH_TOKEN_CACHE_TIMEOUT,
+                )
+
+        local_cache.set(
+            key,
+            token,
+            settings.AUTH_TOKEN_LOCAL_TIMEOUT,
+            settings.AUTH_TOKEN_LOCAL_SIZE,
+        )
+        return self.request_copy(token)
+
+    def request_copy(self, token):
+        """
+        Return copies of a cached token and its user for one request
+
+        Requests and threads share the cached instances, so each gets
+        its own to change. The user must still be active.
+        """
+        user = copy.copy(token.user)
+        if not user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        token = copy.copy(token)
+        token.user = user
+        return user, token
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a token as soon as it is deleted"""
+    invalidate(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def evict_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached copies of a user that changed, e.g. was deactivated"""
+    if created:
+        return
+    keys = Token.objects.filter(user_id=instance.pk).values_list(
+        'key',
+        flat=True,
+    )
+    for key in keys:
+        invalidate(key)
@@ -0,0 +1,161 @@
+"""
+Command to benchmark token endpoint logins per password hasher
+"""
+import queue
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.loadtest import percentile
+
+HASHERS = {
+    'argon2': (
+        'core.hashers.Argon2PasswordHasher',
+        {
+            'time_cost': 'ARGON2_TIME_COST',
+            'memory_cost': 'ARGON2_MEMORY_COST',
+            'parallelism': 'ARGON2_PARALLELISM',
+        },
+    ),
+    'pbkdf2_sha256': (
+        'core.hashers.PBKDF2PasswordHasher',
+        {'iterations': 'PBKDF2_ITERATIONS'},
+    ),
+}
+
+DEFAULT_CONFIGS = (
+    'pbkdf2_sha256:iterations=260000',
+    'argon2:time_cost=2,memory_cost=19456,parallelism=1',
+    'argon2:time_cost=3,memory_cost=12288,parallelism=1',
+    'argon2:time_cost=2,memory_cost=102400,parallelism=8',
+)
+
+EMAIL = 'benchmark-login@example.com'
+PASSWORD = 'benchmark-pass-123'
+
+
+def parse_config(spec):
+    """Return the settings for a spec like argon2:time_cost=2,..."""
+    algorithm, _, params = spec.partition(':')
+    if algorithm not in HASHERS:
+        raise CommandError(
+            f'Unknown hasher {algorithm!r}, choose from {", ".join(HASHERS)}'
+        )
+    path, names = HASHERS[algorithm]
+    overrides = {'PASSWORD_HASHERS': [path]}
+    for param in filter(None, params.split(',')):
+        name, _, value = param.partition('=')
+        if name not in names or not value.isdigit():
+            raise CommandError(
+                f'Bad {algorithm} parameter {param!r}, '
+                f'expected one of {", ".join(names)} set to an integer'
+            )
+        overrides[names[name]] = int(value)
+    return overrides
+
+
+class Command(BaseCommand):
+    """
+    Time logins through the token endpoint for each hasher configuration
+
+    """
+    help = ('Log a throwaway user in repeatedly through the token endpoint '
+            'and report latency percentiles per password hasher config.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--config',
+            action='append',
+            help='Hasher config such as '
+                 'argon2:time_cost=2,memory_cost=19456,parallelism=1. '
+                 'Repeat to compare several, defaults to a built-in set.',
+        )
+        parser.add_argument('--logins', type=int, default=50)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Logins in flight at once, as when sizing workers.',
+        )
+
+    def handle(self, *args, **options):
+        configs = [
+            (spec, parse_config(spec))
+            for spec in options['config'] or DEFAULT_CONFIGS
+        ]
+        self.stdout.write(
+            f'{"config":<54}{"p50 ms":>9}{"p99 ms":>9}{"logins/s":>10}'
+        )
+        for spec, overrides in configs:
+            with override_settings(**overrides):
+                timings, elapsed = self.run(options)
+            timings.sort()
+            self.stdout.write(
+                f'{spec:<54}'
+                f'{percentile(timings, 0.5) * 1000:>9.1f}'
+                f'{percentile(timings, 0.99) * 1000:>9.1f}'
+                f'{len(timings) / elapsed:>10.1f}'
+            )
+
+    def run(self, options):
+        """Return per-login seconds and the total seconds they took."""
+        user = get_user_model().objects.create_user(EMAIL, PASSWORD)
+        try:
+            start = time.perf_counter()
+            timings = self.login_many(
+                options['logins'],
+                options['concurrency'],
+            )
+            return timings, time.perf_counter() - start
+        finally:
+            user.delete()
+
+    def login_many(self, logins, concurrency):
+        if concurrency <= 1:
+            return [self.login(Client()) for _ in range(logins)]
+
+        pending = queue.Queue()
+        for _ in range(logins):
+            pending.put(None)
+        timings = []
+        errors = []
+
+        def worker():
+            client = Client()
+            try:
+                while True:
+                    try:
+                        pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    timings.append(self.login(client))
+            except CommandError as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return timings
+
+    def login(self, client):
+        """Log in once and return the seconds it took."""
+        start = time.perf_counter()
+        res = client.post(
+            reverse('user:token'),
+            {'email': EMAIL, 'password': PASSWORD},
+        )
+        elapsed = time.perf_counter() - start
+        if res.status_code != 200:
+            raise CommandError(f'Login failed with {res.status_code}')
+        return elapsed
@@ -0,0 +1,108 @@
+"""
+Command to load test recipe latency during a login flood
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core.loadtest import Flood, http_request, percentile, probe
+from core.models import Recipie
+
+EMAIL = 'loadtest-login@example.com'
+PASSWORD = 'loadtest-pass-123'
+
+TOKEN_URLS = {
+    'sync': 'user:token',
+    'async': 'user:token-async',
+}
+
+
+class Command(BaseCommand):
+    """
+    Time recipe list requests alone, then during a flood of logins
+
+    """
+    help = ('Against a running server, time recipe list requests while '
+            'idle and while threads flood each token endpoint with logins. '
+            'Run the server under ASGI to see the async endpoint help.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            required=True,
+            help='Base URL of the server, e.g. http://localhost:8000',
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            choices=TOKEN_URLS,
+            help='Token endpoint to flood, repeat for both (the default).',
+        )
+        parser.add_argument('--flooders', type=int, default=32)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10.0,
+            help='Seconds to probe the recipe list for in each phase.',
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(EMAIL, PASSWORD)
+        try:
+            token = Token.objects.create(user=user)
+            Recipie.objects.create(
+                user=user,
+                title='Load test recipe',
+                time_minutes=5,
+                price=Decimal('1.00'),
+            )
+            self.run(token, options)
+        finally:
+            user.delete()
+
+    def run(self, token, options):
+        base_url = options['url'].rstrip('/')
+        recipes_url = base_url + reverse('recipe:recipie-list')
+        headers = {'Authorization': f'Token {token.key}'}
+
+        def fetch_recipes():
+            status = http_request(recipes_url, headers=headers)
+            if status != 200:
+                raise CommandError(f'Recipe list failed with {status}')
+
+        self.stdout.write(
+            f'{"phase":<20}{"probes":>8}{"p50 ms":>9}{"p99 ms":>9}'
+            f'{"logins/s":>10}{"rejected":>10}'
+        )
+        self.write_row('idle', probe(fetch_recipes, options['duration']))
+
+        for endpoint in options['endpoint'] or list(TOKEN_URLS):
+            login_url = base_url + reverse(TOKEN_URLS[endpoint])
+
+            def login():
+                return http_request(
+                    login_url,
+                    {'email': EMAIL, 'password': PASSWORD},
+                )
+
+            with Flood(login, options['flooders']) as flood:
+                timings = probe(fetch_recipes, options['duration'])
+            self.write_row(f'{endpoint} login flood', timings, flood)
+
+    def write_row(self, phase, timings, flood=None):
+        timings.sort()
+        row = (
+            f'{phase:<20}{len(timings):>8}'
+            f'{percentile(timings, 0.5) * 1000:>9.1f}'
+            f'{percentile(timings, 0.99) * 1000:>9.1f}'
+        )
+        if flood is not None:
+            logins = flood.statuses.get(200, 0)
+            row += (
+                f'{logins / flood.elapsed:>10.1f}'
+                f'{flood.calls - logins:>10}'
+            )
+        self.stdout.write(row)
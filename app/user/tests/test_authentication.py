@@ -0,0 +1,136 @@
+"""
+Tests for cached token authentication
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from user import authentication
+from user.authentication import CachedTokenAuthentication
+
+
+def create_token(email='user@example.com'):
+    """Create and return a token for a new user"""
+    user = get_user_model().objects.create_user(email, 'testpass123')
+    return Token.objects.create(user=user)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token lookups are cached and invalidated"""
+
+    def setUp(self):
+        authentication.local_cache.clear()
+        authentication.reset_stats()
+        cache.clear()
+        self.token = create_token()
+
+    def authenticate(self):
+        request = APIRequestFactory().get(
+            '/',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}',
+        )
+        return CachedTokenAuthentication().authenticate(request)
+
+    def test_repeat_lookup_skips_database(self):
+        """Test a token is only read from the database once"""
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+
+        self.assertEqual(user, self.token.user)
+        self.assertEqual(token.key, self.token.key)
+        self.assertEqual(
+            authentication.get_stats(),
+            {'local_hits': 1, 'shared_hits': 0, 'misses': 1},
+        )
+
+    @override_settings(AUTH_TOKEN_CACHE='default')
+    def test_shared_cache_used_after_local_miss(self):
+        """Test a token cached by another process needs no query"""
+        self.authenticate()
+        authentication.local_cache.clear()
+
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+        self.assertEqual(authentication.get_stats()['shared_hits'], 1)
+
+    @override_settings(AUTH_TOKEN_LOCAL_TIMEOUT=0)
+    def test_expired_entries_are_reloaded(self):
+        """Test entries older than the local timeout are looked up again"""
+        self.authenticate()
+
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+    @override_settings(AUTH_TOKEN_CACHE='default')
+    def test_deleted_token_rejected(self):
+        """Test a cached token stops working once deleted"""
+        self.authenticate()
+
+        self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    @override_settings(AUTH_TOKEN_CACHE='default')
+    def test_deactivated_user_rejected(self):
+        """Test a cached token stops working once its user is deactivated"""
+        self.authenticate()
+
+        user = self.token.user
+        user.is_active = False
+        user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    @override_settings(AUTH_TOKEN_CACHE='default')
+    def test_deactivated_by_other_process_rejected(self):
+        """Test a local entry isn't used once another process drops the
+        shared one"""
+        self.authenticate()
+
+        # As saving the user in another process would.
+        get_user_model().objects.filter(pk=self.token.user_id).update(
+            is_active=False,
+        )
+        cache.delete(authentication._shared_key(self.token.key))
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_inactive_cached_user_rejected(self):
+        """Test a cached user is checked to be active on every hit"""
+        self.authenticate()
+        authentication.local_cache.get(self.token.key).user.is_active = False
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_each_request_gets_own_user(self):
+        """Test requests don't share the cached user instance"""
+        self.authenticate()
+        first, first_token = self.authenticate()
+        second, second_token = self.authenticate()
+
+        first.email = 'changed@example.com'
+
+        self.assertIsNot(first, second)
+        self.assertIs(first_token.user, first)
+        self.assertIs(second_token.user, second)
+        self.assertEqual(second.email, 'user@example.com')
+
+    @override_settings(AUTH_TOKEN_LOCAL_SIZE=1)
+    def test_least_recently_used_evicted(self):
+        """Test the local cache holds at most the configured tokens"""
+        self.authenticate()
+        other = create_token(email='other@example.com')
+        CachedTokenAuthentication().authenticate_credentials(other.key)
+
+        with self.assertNumQueries(1):
+            self.authenticate()
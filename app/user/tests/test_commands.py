@@ -0,0 +1,62 @@
+"""
+Tests for user management commands
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.test import LiveServerTestCase, TestCase
+
+
+class BenchmarkLoginCommandTests(TestCase):
+    """Test the benchmark_login command"""
+
+    def test_benchmark_reports_each_config(self):
+        """Test a row is printed per hasher config and the user removed"""
+        out = StringIO()
+
+        call_command(
+            'benchmark_login',
+            '--config', 'pbkdf2_sha256:iterations=1000',
+            '--config', 'argon2:time_cost=1,memory_cost=1024',
+            '--logins', '3',
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith('pbkdf2_sha256:'))
+        self.assertTrue(lines[2].startswith('argon2:'))
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_benchmark_rejects_unknown_parameter(self):
+        """Test a config with an unknown parameter is rejected"""
+        with self.assertRaises(CommandError):
+            call_command(
+                'benchmark_login',
+                '--config', 'argon2:rounds=3',
+                stdout=StringIO(),
+            )
+
+
+class LoadtestLoginCommandTests(LiveServerTestCase):
+    """Test the loadtest_login command against a live server"""
+
+    def test_loadtest_reports_each_phase(self):
+        """Test a row is printed for idle and each flood"""
+        out = StringIO()
+
+        call_command(
+            'loadtest_login',
+            '--url', self.live_server_url,
+            '--flooders', '2',
+            '--duration', '0.2',
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(
+            [line.split()[0] for line in lines[1:]],
+            ['idle', 'sync', 'async'],
+        )
+        self.assertFalse(get_user_model().objects.exists())
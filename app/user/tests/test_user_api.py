@@ -1,7 +1,8 @@
 """
 Tests for user api
 """
-from django.test import TestCase
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -11,6 +12,8 @@ from rest_framework import status
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 ME_URL = reverse('user:me')
+CREATE_USER_ASYNC_URL = reverse('user:create-async')
+TOKEN_ASYNC_URL = reverse('user:token-async')
 
 
 def create_user(**params):
@@ -81,6 +84,38 @@ class PublicUserApiTests(TestCase):
         self.assertIn('token', res.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_token_login_upgrades_old_hash(self):
+        """Test logging in rehashes a PBKDF2 password with Argon2"""
+        user = create_user(email='test@example.com')
+        user.password = make_password(
+            'test-pass-123',
+            hasher='pbkdf2_sha256',
+        )
+        user.save()
+
+        res = self.client.post(TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'test-pass-123',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('argon2$'))
+
+    def test_token_login_applies_new_argon2_cost(self):
+        """Test logging in rehashes a password made with other costs"""
+        user = create_user(email='test@example.com', password='pass-123')
+
+        with override_settings(ARGON2_TIME_COST=3):
+            res = self.client.post(TOKEN_URL, {
+                'email': 'test@example.com',
+                'password': 'pass-123',
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertIn('t=3', user.password)
+
     def test_create_token_bad_credentials(self):
         """Test returns error if credentials invalid"""
         create_user(email='test@example.com', password='good_pass')
@@ -108,6 +143,89 @@ class PublicUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class AsyncUserApiTests(TransactionTestCase):
+    """
+    Test the async user endpoints.
+
+    Their work runs on pool threads with their own database connections,
+    so test data must be committed for them to see it.
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+
+    def test_create_user_async(self):
+        """Test creating a user through the async endpoint"""
+        payload = {
+            'email': 'test@example.com',
+            'password': 'testpass123',
+            'name': 'Test name',
+        }
+
+        res = self.client.post(CREATE_USER_ASYNC_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('password', res.json())
+        user = get_user_model().objects.get(email=payload['email'])
+        self.assertTrue(user.check_password(payload['password']))
+
+    def test_create_user_async_invalid(self):
+        """Test the async endpoint validates like the sync one"""
+        res = self.client.post(CREATE_USER_ASYNC_URL, {
+            'email': 'test@example.com',
+            'password': 'pw',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', res.json())
+
+    def test_create_token_async(self):
+        """Test the async token endpoint returns the user's token"""
+        create_user(email='test@example.com', password='test-pass-123')
+
+        res = self.client.post(TOKEN_ASYNC_URL, {
+            'email': 'test@example.com',
+            'password': 'test-pass-123',
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json()['token'],
+            get_user_model().objects.get().auth_token.key,
+        )
+
+    def test_create_token_async_bad_credentials(self):
+        """Test the async token endpoint rejects a wrong password"""
+        create_user(email='test@example.com', password='good_pass')
+
+        res = self.client.post(TOKEN_ASYNC_URL, {
+            'email': 'test@example.com',
+            'password': 'bad_pass',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('token', res.json())
+
+    def test_async_endpoint_requires_post(self):
+        """Test the async endpoints only accept POST"""
+        res = self.client.get(TOKEN_ASYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    @override_settings(EXECUTORS={
+        'hashing': {'WORKERS': 1, 'MAX_PENDING': 0},
+    })
+    def test_async_endpoint_sheds_load(self):
+        """Test requests beyond the pending limit are refused with 503"""
+        res = self.client.post(TOKEN_ASYNC_URL, {
+            'email': 'test@example.com',
+            'password': 'test-pass-123',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '1')
+
+
 class PrivateUserApiTests(TestCase):
     """Test Api requests that required authentication."""
 
@@ -9,6 +9,8 @@ app_name = 'user'
 
 urlpatterns =[
     path('create/', views.CreateUserView().as_view(), name='create'),
+    path('create/async/', views.create_user_async, name='create-async'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
+    path('token/async/', views.create_token_async, name='token-async'),
     path('me/', views.ManageUserView.as_view(), name='me')
 ]
\ No newline at end of file
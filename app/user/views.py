@@ -1,10 +1,16 @@
 """
 Views for the user API.
 """
+import json
 
-from rest_framework import generics, authentication, permissions
+from django.http import JsonResponse
+from rest_framework import generics, permissions
+from rest_framework.authtoken.models import Token
 from rest_framework.settings import api_settings
 from rest_framework.authtoken.views import ObtainAuthToken
+
+from core.executors import ExecutorBusy, busy_response, run_in_executor
+from .authentication import CachedTokenAuthentication
 from .serializers import (
     UserSerializer,
     AuthTokenSerializer
@@ -25,10 +31,75 @@ class CreateTokenView(ObtainAuthToken):
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication, ]
+    authentication_classes = [CachedTokenAuthentication, ]
     permission_classes = [permissions.IsAuthenticated, ]
 
     def get_object(self):
         """Retrieve and return the authenticated user"""
         return self.request.user
-    
\ No newline at end of file
+
+
+def hashing_view(handle):
+    """
+    Make handle(request, data) an async POST view run in the hashing pool
+
+    The event loop stays free while passwords hash, so a burst of logins
+    waits on the pool instead of holding server workers. Django 3.2's
+    csrf_exempt and require_POST don't support async views, so both
+    are done here.
+    """
+    async def view(request):
+        if request.method != 'POST':
+            response = JsonResponse(
+                {'detail': f'Method "{request.method}" not allowed.'},
+                status=405,
+            )
+            response['Allow'] = 'POST'
+            return response
+
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                return JsonResponse(
+                    {'detail': 'JSON parse error.'},
+                    status=400,
+                )
+        else:
+            data = request.POST
+
+        try:
+            return await run_in_executor('hashing', handle, request, data)
+        except ExecutorBusy:
+            return busy_response()
+
+    view.csrf_exempt = True
+    view.__doc__ = handle.__doc__
+    return view
+
+
+@hashing_view
+def create_user_async(request, data):
+    """Create a new user, like CreateUserView"""
+    serializer = UserSerializer(data=data, context={'request': request})
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    serializer.save()
+    return JsonResponse(serializer.data, status=201)
+
+
+@hashing_view
+def create_token_async(request, data):
+    """Create a new auth token for user, like CreateTokenView"""
+    serializer = AuthTokenSerializer(
+        data=data,
+        context={'request': request},
+    )
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    token, created = Token.objects.get_or_create(
+        user=serializer.validated_data['user']
+    )
+    return JsonResponse({'token': token.key})